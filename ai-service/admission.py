@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_WAIT_SECONDS = metrics.REGISTRY.histogram(
+    "resume_match_admission_wait_seconds", "Time requests waited for an in-flight slot", ["route"]
+)
+ADMISSION_REJECTIONS = metrics.REGISTRY.counter(
+    "resume_match_admission_rejections_total", "Requests turned away before reaching a handler", ["route", "reason"]
+)
+
+
+def parse_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """Parses ``"/analyze=16:64,/rank=4:16"`` into ``{path: (max_in_flight, max_queued)}``."""
+    limits = {}
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            path, limit = entry.rsplit("=", 1)
+            in_flight, _, queued = limit.partition(":")
+            limits[path.strip()] = (int(in_flight), int(queued or 0))
+        except ValueError:
+            raise ValueError(f"Invalid admission limit '{entry}', expected <path>=<max_in_flight>:<max_queued>")
+    return limits
+
+
+class RouteLimiter:
+    """
+    In-flight limit with a bounded FIFO wait queue for one route.
+
+    Up to ``max_in_flight`` requests run at once and up to ``max_queued`` more wait
+    for a slot, for at most ``queue_timeout`` seconds. Anything beyond that is
+    turned away immediately, with a Retry-After estimated from recent request
+    durations, instead of piling onto a worker that is already behind.
+    """
+
+    def __init__(self, route: str, max_in_flight: int, max_queued: int, queue_timeout: float):
+        self.route = route
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.avg_seconds: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def retry_after(self) -> float:
+        # Time for the requests ahead to drain through the slots
+        average = self.avg_seconds if self.avg_seconds is not None else 1.0
+        return average * (len(self._waiters) + 1) / self.max_in_flight
+
+    async def acquire(self) -> Optional[float]:
+        """Takes a slot, waiting if needed. Returns None once admitted, else the Retry-After in seconds."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+        if len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            return self.retry_after()
+
+        # release() hands its slot straight to the first waiter, so in_flight is not bumped here
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.cancelled():
+                # The slot arrived as the timeout fired
+                self.admitted += 1
+                return None
+            self._discard(waiter)
+            self.timeouts += 1
+            return self.retry_after()
+        except asyncio.CancelledError:
+            # Client disconnected while queued
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start, route=self.route)
+        self.admitted += 1
+        return None
+
+    def release(self, duration: Optional[float] = None) -> None:
+        if duration is not None:
+            self.avg_seconds = duration if self.avg_seconds is None else 0.8 * self.avg_seconds + 0.2 * duration
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "avg_seconds": round(self.avg_seconds, 3) if self.avg_seconds is not None else None,
+        }
+
+
+class RateLimiter:
+    """
+    Token bucket per client: ``per_minute`` tokens refill continuously up to
+    ``burst``, and each request takes one. Buckets of the least recently seen
+    clients are dropped beyond ``max_clients``; those clients start full again.
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_clients = max(1, max_clients)
+        self.allowed = 0
+        self.rejected = 0
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def check(self, client: str) -> Optional[float]:
+        """Takes a token for ``client``. Returns None if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        wait = None
+        if tokens >= 1.0:
+            tokens -= 1.0
+            self.allowed += 1
+        else:
+            wait = (1.0 - tokens) / self.rate
+            self.rejected += 1
+        self._buckets[client] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "per_minute": round(self.rate * 60, 3),
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that applies per-client rate limits to POST requests and
+    per-route in-flight limits before a request reaches its handler.
+
+    It wraps the whole response, so a streamed ``/analyze`` keeps its slot until
+    the last byte is sent. Rejections are JSON ``{"detail": ...}`` bodies like
+    ``HTTPException`` responses: 429 for rate limits, 503 for overload, both with
+    ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiters: Dict[str, RouteLimiter],
+        rate_limiter: Optional[RateLimiter] = None,
+        key_header: str = "X-API-Key",
+    ):
+        self.app = app
+        self.limiters = limiters
+        self.rate_limiter = rate_limiter
+        self.key_header = key_header.lower().encode("latin-1")
+
+    def client_key(self, scope) -> str:
+        for name, value in scope.get("headers", []):
+            if name == self.key_header and value:
+                return "key:" + value.decode("latin-1")
+        # Behind a proxy run uvicorn with --proxy-headers so this is the real client address
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        limiter = self.limiters.get(path)
+        route = path if limiter is not None else "other"
+
+        if self.rate_limiter is not None and scope["method"] == "POST":
+            wait = self.rate_limiter.check(self.client_key(scope))
+            if wait is not None:
+                ADMISSION_REJECTIONS.inc(route=route, reason="rate_limited")
+                await self._reject(scope, receive, send, 429, "Rate limit exceeded. Please retry later.", wait)
+                return
+
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await limiter.acquire()
+        if retry_after is not None:
+            ADMISSION_REJECTIONS.inc(route=route, reason="overloaded")
+            logger.warning(f"Shedding {path}: {limiter.in_flight} in flight, {len(limiter._waiters)} queued")
+            await self._reject(
+                scope, receive, send, 503, "Service is at capacity. Please retry shortly.", retry_after
+            )
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
+
+    @staticmethod
+    async def _reject(scope, receive, send, status_code: int, detail: str, retry_after: float) -> None:
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
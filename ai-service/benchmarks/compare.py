@@ -0,0 +1,71 @@
+"""
+Compares two benchmark result files and flags regressions.
+
+    python -m benchmarks.compare baseline.json results.json --threshold 10
+
+Exits with status 1 when any latency grew, or any throughput dropped, by more
+than the threshold percentage.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+# Metric name -> (value, higher_is_better)
+Metrics = Dict[str, Tuple[float, bool]]
+
+
+def flatten(results: Dict[str, Any], statistic: str) -> Metrics:
+    metrics: Metrics = {}
+    for function, sizes in results.get("micro", {}).items():
+        if not isinstance(sizes, dict):
+            continue
+        for size, summary in sizes.items():
+            if statistic in summary:
+                metrics[f"micro.{function}.{size}.{statistic}"] = (summary[statistic], False)
+    for run in results.get("e2e", []):
+        prefix = f"e2e.c{run['concurrency']}"
+        metrics[f"{prefix}.rps"] = (run["rps"], True)
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if key in run["latency"]:
+                metrics[f"{prefix}.{key}"] = (run["latency"][key], False)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+    parser.add_argument("--statistic", default="p50_ms", help="Summary statistic compared for function benchmarks")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = flatten(json.load(f), args.statistic)
+    with open(args.current, encoding="utf-8") as f:
+        current = flatten(json.load(f), args.statistic)
+
+    regressions = 0
+    width = max((len(name) for name in current), default=10)
+    print(f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for name, (value, higher_is_better) in current.items():
+        if name not in baseline:
+            continue
+        before = baseline[name][0]
+        change = (value - before) / before * 100 if before else 0.0
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > args.threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        elif worse < -args.threshold:
+            flag = "  improved"
+        print(f"{name:<{width}}  {before:>12.3f}  {value:>12.3f}  {change:>+7.1f}%{flag}")
+
+    if regressions:
+        print(f"\n{regressions} metric(s) regressed by more than {args.threshold:g}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
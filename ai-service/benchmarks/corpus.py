@@ -0,0 +1,203 @@
+"""
+Deterministic synthetic resumes (PDF and DOCX) and job descriptions for benchmarks.
+
+The same seed always produces byte-identical files, so results from different
+runs are comparable. PDFs are written directly (Helvetica text, one content
+stream per page) to avoid a PDF-writing dependency.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import random
+import zipfile
+from typing import Dict, List, Sequence
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINES_PER_PAGE = 55
+LINE_WIDTH = 90
+_FIXED_TIME = datetime.datetime(2024, 1, 1)
+
+_ROLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Full Stack Developer",
+          "Machine Learning Engineer", "DevOps Engineer", "Frontend Developer", "Platform Engineer"]
+_COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Vandelay Industries",
+              "Stark Industries", "Wayne Enterprises", "Soylent Systems", "Cyberdyne"]
+_VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Maintained", "Automated", "Scaled",
+          "Refactored", "Delivered", "Implemented", "Owned"]
+_OBJECTS = ["a payments service", "the data pipeline", "an internal analytics dashboard", "the search backend",
+            "a recommendation engine", "customer onboarding flows", "the CI pipeline", "a reporting API",
+            "event ingestion", "the mobile backend", "an ML feature store", "the billing platform"]
+_OUTCOMES = ["reducing latency by {n}%", "cutting infrastructure costs by {n}%", "serving {n}k daily users",
+             "improving test coverage to {n}%", "handling {n}M events per day", "shortening release cycles by {n}%"]
+_FILLER = ["Collaborated with product and design teams on quarterly planning.",
+           "Mentored junior engineers and ran code reviews.",
+           "Wrote technical documentation and runbooks for on-call engineers.",
+           "Participated in architecture reviews and incident postmortems.",
+           "Presented project results to stakeholders across the organization."]
+
+
+def _skills() -> List[str]:
+    with open(os.path.join(SERVICE_DIR, "skills_taxonomy.json"), encoding="utf-8") as f:
+        return list(json.load(f))
+
+
+def resume_lines(rng: random.Random, pages: int, skills: List[str]) -> List[str]:
+    """Plain-text resume, already wrapped, that fills exactly ``pages`` PDF pages."""
+    own_skills = rng.sample(skills, min(len(skills), 12 + 2 * pages))
+    lines = _wrap([
+        f"Candidate {rng.randint(1000, 9999)}",
+        rng.choice(_ROLES),
+        "",
+        "SUMMARY",
+        f"{rng.choice(_ROLES)} with {rng.randint(2, 15)} years of experience in "
+        f"{', '.join(own_skills[:3])} and {own_skills[3]}.",
+        "",
+        "SKILLS",
+        ", ".join(own_skills),
+        "",
+        "EXPERIENCE",
+    ])
+    education = ["EDUCATION", f"B.S. Computer Science, State University ({rng.randint(2000, 2020)})"]
+    limit = pages * LINES_PER_PAGE - len(education)
+    while True:
+        block = [f"{rng.choice(_ROLES)} - {rng.choice(_COMPANIES)} ({rng.randint(2008, 2024)})"]
+        for _ in range(rng.randint(3, 6)):
+            outcome = rng.choice(_OUTCOMES).format(n=rng.randint(5, 90))
+            block.append(f"- {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} using {rng.choice(own_skills)}, {outcome}.")
+        block += [f"- {rng.choice(_FILLER)}", ""]
+        block = _wrap(block)
+        if len(lines) + len(block) > limit:
+            break
+        lines += block
+    # Pad so the PDF has exactly the requested number of pages
+    lines += [""] * (limit - len(lines)) + education
+    return lines
+
+
+def job_description(rng: random.Random, skills: List[str]) -> str:
+    required = rng.sample(skills, 8)
+    return (
+        f"We are hiring a {rng.choice(_ROLES)} at {rng.choice(_COMPANIES)}. "
+        f"Required skills: {', '.join(required[:5])}. "
+        f"Nice to have: {', '.join(required[5:])}. "
+        f"You will own {rng.choice(_OBJECTS)} and {rng.choice(_OBJECTS)}, "
+        f"working with a cross-functional team. {rng.choice(_FILLER)}"
+    )
+
+
+def _wrap(lines: List[str]) -> List[str]:
+    wrapped = []
+    for line in lines:
+        while len(line) > LINE_WIDTH:
+            cut = line.rfind(" ", 0, LINE_WIDTH)
+            cut = cut if cut > 0 else LINE_WIDTH
+            wrapped.append(line[:cut])
+            line = line[cut:].lstrip()
+        wrapped.append(line)
+    return wrapped
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    lines = _wrap(lines)
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and a content stream per page
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        text = "".join(f"({_pdf_escape(line)}) Tj T* " for line in page_lines)
+        stream = f"BT /F1 10 Tf 13 TL 50 790 Td {text}ET".encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(lines: List[str]) -> bytes:
+    from docx import Document
+    document = Document()
+    document.core_properties.created = _FIXED_TIME
+    document.core_properties.modified = _FIXED_TIME
+    for line in lines:
+        document.add_paragraph(line)
+    saved = io.BytesIO()
+    document.save(saved)
+    # Rewrite the archive with fixed entry timestamps so the bytes only depend on the seed
+    out = io.BytesIO()
+    with zipfile.ZipFile(saved) as source, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            target.writestr(zipfile.ZipInfo(info.filename, date_time=_FIXED_TIME.timetuple()[:6]), source.read(info))
+    return out.getvalue()
+
+
+def build_corpus(
+    seed: int = 42,
+    page_counts: Sequence[int] = (1, 2, 5, 10),
+    per_size: int = 3,
+    job_count: int = 5,
+) -> Dict[str, List[dict]]:
+    """
+    Returns ``{"resumes": [...], "jobs": [...]}``. Each resume has ``name``,
+    ``format`` (pdf/docx), ``pages``, ``content`` (file bytes) and ``content_type``.
+    """
+    rng = random.Random(seed)
+    skills = _skills()
+    resumes = []
+    for pages in page_counts:
+        for i in range(per_size):
+            lines = resume_lines(rng, pages, skills)
+            resumes.append({
+                "name": f"resume_{pages}p_{i}.pdf", "format": "pdf", "pages": pages,
+                "content": make_pdf(lines), "content_type": "application/pdf",
+            })
+            resumes.append({
+                "name": f"resume_{pages}p_{i}.docx", "format": "docx", "pages": pages,
+                "content": make_docx(lines),
+                "content_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            })
+    jobs = [job_description(rng, skills) for _ in range(job_count)]
+    return {"resumes": resumes, "jobs": jobs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the synthetic benchmark corpus to a directory")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = build_corpus(seed=args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    for resume in corpus["resumes"]:
+        with open(os.path.join(args.out, resume["name"]), "wb") as f:
+            f.write(resume["content"])
+    with open(os.path.join(args.out, "jobs.json"), "w", encoding="utf-8") as f:
+        json.dump(corpus["jobs"], f, indent=2)
+    print(f"Wrote {len(corpus['resumes'])} resumes and {len(corpus['jobs'])} job descriptions to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
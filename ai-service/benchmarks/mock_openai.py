@@ -0,0 +1,130 @@
+"""
+Offline stand-in for the OpenAI embeddings and chat completions endpoints.
+
+Point the service at it with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``.
+Embeddings are feature-hashed bag-of-words vectors, so similar texts still get
+similar scores, and every response waits a configurable latency to stand in for
+the network and model time of the real API.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+import uuid
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_providers import hashing_embed  # noqa: E402
+
+COMPLETION_CONTENT = json.dumps({
+    "suggestions": [
+        "Quantify the impact of your most recent projects",
+        "Move the skills that match the job description to the top of the resume"
+    ],
+    "actionable_items": ["Add metrics to each role", "List cloud platforms explicitly"],
+    "keywords_to_add": ["Docker", "AWS", "Kubernetes"],
+    "score_impact": "Expected +10-15% improvement",
+    "summary": "Experienced engineer with a backend and data focus.",
+    "key_skills": ["Python", "SQL", "AWS"]
+})
+
+app = FastAPI(title="Mock OpenAI")
+app.state.embedding_latency = 0.05
+app.state.completion_latency = 0.3
+app.state.stream_chunks = 20
+app.state.dim = 1536
+app.state.requests = {"embeddings": 0, "chat.completions": 0}
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    app.state.requests["embeddings"] += 1
+    await asyncio.sleep(app.state.embedding_latency)
+    vectors = np.asarray(hashing_embed(inputs, app.state.dim), dtype=np.float32)
+    # The OpenAI client asks for base64 unless an encoding format is given
+    if body.get("encoding_format", "float") == "base64":
+        encoded = [base64.b64encode(vector.tobytes()).decode("ascii") for vector in vectors]
+    else:
+        encoded = vectors.tolist()
+    tokens = sum(len(text.split()) for text in inputs)
+    return {
+        "object": "list",
+        "data": [{"object": "embedding", "index": i, "embedding": e} for i, e in enumerate(encoded)],
+        "model": body.get("model", "mock"),
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    app.state.requests["chat.completions"] += 1
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model", "mock")
+
+    if not body.get("stream"):
+        await asyncio.sleep(app.state.completion_latency)
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": COMPLETION_CONTENT},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 500, "completion_tokens": 100, "total_tokens": 600},
+        })
+
+    async def events():
+        chunk_count = max(1, app.state.stream_chunks)
+        size = -(-len(COMPLETION_CONTENT) // chunk_count)
+        for start in range(0, len(COMPLETION_CONTENT), size):
+            await asyncio.sleep(app.state.completion_latency / chunk_count)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": COMPLETION_CONTENT[start:start + size]}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def stats():
+    return app.state.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI embeddings/completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--embedding-latency-ms", type=float, default=50.0)
+    parser.add_argument("--completion-latency-ms", type=float, default=300.0)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    app.state.embedding_latency = args.embedding_latency_ms / 1000.0
+    app.state.completion_latency = args.completion_latency_ms / 1000.0
+    app.state.dim = args.dim
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
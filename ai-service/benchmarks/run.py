@@ -0,0 +1,342 @@
+"""
+Offline benchmarks for the resume matching pipeline.
+
+    cd ai-service
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.compare baseline.json results.json
+
+Starts the mock OpenAI server, times the hot functions in-process on the
+synthetic corpus, then starts the service with uvicorn and drives /analyze at
+each requested concurrency level. Results are printed and written as JSON.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.corpus import build_corpus
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_STAGE_SAMPLE = re.compile(r'^resume_match_stage_duration_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"count": 0}
+    values = np.asarray(samples_ms)
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p90_ms": round(float(p90), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "min_ms": round(float(values.min()), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def time_calls(fn: Callable[[], Any], iterations: int, warmup: int = 2) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def time_async_calls(fn: Callable[[], Any], iterations: int, warmup: int = 2) -> Dict[str, float]:
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def start_process(args: List[str], env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    # Logs go to a file: the service logs every request and would block on a full pipe
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen(args, cwd=SERVICE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    process.log_path = log_path
+    return process
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            with open(process.log_path, encoding="utf-8", errors="replace") as log:
+                raise RuntimeError(f"{url} exited during startup:\n{log.read()[-2000:]}")
+        try:
+            if httpx.get(url, timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout:g}s")
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def by_pages(corpus: Dict[str, List[dict]], fmt: str) -> Dict[int, List[dict]]:
+    groups: Dict[int, List[dict]] = defaultdict(list)
+    for resume in corpus["resumes"]:
+        if resume["format"] == fmt:
+            groups[resume["pages"]].append(resume)
+    return dict(sorted(groups.items()))
+
+
+async def run_micro(corpus: Dict[str, List[dict]], iterations: int) -> Dict[str, Any]:
+    # Imported here so the environment prepared in main() is what settings reads
+    import keyword_extraction
+    import resume_match_service as service
+    from text_extraction import extract_text_from_docx, extract_text_from_pdf
+
+    await service.startup_event()
+    try:
+        await service.warmup_task
+        # Functions below run in this process, so load the model here too
+        keyword_extraction.warm_up(service.settings.SPACY_AUTO_DOWNLOAD)
+        results: Dict[str, Any] = {"spacy_model_loaded": keyword_extraction.is_model_loaded()}
+        job = corpus["jobs"][0]
+        pdfs, docxs = by_pages(corpus, "pdf"), by_pages(corpus, "docx")
+        texts = {pages: extract_text_from_docx(group[0]["content"]) for pages, group in docxs.items()}
+
+        # One document per call, cycling through the documents of each size
+        results["extract_text_from_pdf"] = {
+            f"{pages}p": time_calls(lambda g=itertools.cycle(group): extract_text_from_pdf(next(g)["content"]), iterations)
+            for pages, group in pdfs.items()
+        }
+        results["extract_text_from_docx"] = {
+            f"{pages}p": time_calls(lambda g=itertools.cycle(group): extract_text_from_docx(next(g)["content"]), iterations)
+            for pages, group in docxs.items()
+        }
+        results["extract_keywords"] = {
+            f"{pages}p": time_calls(lambda t=text: keyword_extraction.extract_keywords(t, 10), iterations)
+            for pages, text in texts.items()
+        }
+        job_keywords = keyword_extraction.extract_keywords(job, 50)
+        results["find_matched_and_missing_keywords"] = {}
+        for pages, text in texts.items():
+            resume_keywords = keyword_extraction.extract_keywords(text, 50)
+            results["find_matched_and_missing_keywords"][f"{pages}p"] = time_calls(
+                lambda r=resume_keywords: service.find_matched_and_missing_keywords(r, job_keywords), iterations
+            )
+        # The embedding cache is disabled, so every call reaches the mock embedding endpoint
+        results["compute_similarity"] = {
+            f"{pages}p": await time_async_calls(lambda t=text: service.compute_similarity(job, t), iterations)
+            for pages, text in texts.items()
+        }
+        return results
+    finally:
+        await service.shutdown_event()
+
+
+def stage_totals(metrics_text: str) -> Dict[str, List[float]]:
+    totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+    for line in metrics_text.splitlines():
+        match = _STAGE_SAMPLE.match(line)
+        if match:
+            kind, stage, value = match.groups()
+            totals[stage][0 if kind == "sum" else 1] = float(value)
+    return totals
+
+
+async def run_load(
+    base_url: str, corpus: Dict[str, List[dict]], requests: int, concurrency: int, warmup: int
+) -> Dict[str, Any]:
+    resumes, jobs = corpus["resumes"], corpus["jobs"]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0, limits=limits) as client:
+        async def analyze(i: int):
+            resume = resumes[i % len(resumes)]
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/analyze",
+                    data={"job_description": jobs[i % len(jobs)]},
+                    files={"resume_file": (resume["name"], resume["content"], resume["content_type"])},
+                )
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            return status, (time.perf_counter() - start) * 1000
+
+        for i in range(warmup):
+            await analyze(i)
+
+        before = stage_totals((await client.get("/metrics")).text)
+        next_index = 0
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+
+        async def worker():
+            nonlocal next_index
+            while next_index < requests:
+                i = next_index
+                next_index += 1
+                status, elapsed = await analyze(i)
+                statuses[status] += 1
+                if status == "200":
+                    latencies.append(elapsed)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+        after = stage_totals((await client.get("/metrics")).text)
+
+    # Server-side mean per stage over this run (from the worker that answered /metrics)
+    stages = {}
+    for stage, (total, count) in after.items():
+        prev_total, prev_count = before.get(stage, (0.0, 0.0))
+        if count > prev_count:
+            stages[stage] = round((total - prev_total) / (count - prev_count) * 1000, 3)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "wall_seconds": round(wall, 3),
+        "rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "latency": summarize(latencies),
+        "status_counts": dict(statuses),
+        "stage_mean_ms": stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the resume matching service")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus seed")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed calls per function and document size")
+    parser.add_argument("--requests", type=int, default=200, help="/analyze requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed /analyze requests before each level")
+    parser.add_argument("--service-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--embedding-latency-ms", type=float, default=50.0)
+    parser.add_argument("--completion-latency-ms", type=float, default=300.0)
+    parser.add_argument("--warm-caches", action="store_true",
+                        help="Keep the service caches enabled (repeated documents become cache hits)")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-e2e", action="store_true")
+    args = parser.parse_args()
+
+    corpus = build_corpus(seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="resume-match-bench-")
+    print(f"Working directory (logs, caches): {workdir}", file=sys.stderr)
+    mock_port = free_port()
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="benchmark",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{mock_port}/v1",
+        EMBEDDING_PROVIDERS="openai",
+        CACHE_DIR=os.path.join(workdir, "cache"),
+        VECTOR_INDEX_DIR=os.path.join(workdir, "vector_index"),
+        JOB_QUEUE_WORKERS="0",
+    )
+    if not args.warm_caches:
+        env.update(
+            EMBEDDING_CACHE_MEMORY_ITEMS="0",
+            EMBEDDING_CACHE_PATH="",
+            PARSED_RESUME_CACHE_ITEMS="0",
+            PARSED_RESUME_CACHE_PATH="",
+            LLM_CACHE_TTL_SECONDS="0",
+        )
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus": {
+                "seed": args.seed,
+                "resumes": len(corpus["resumes"]),
+                "jobs": len(corpus["jobs"]),
+                "pages": sorted({r["pages"] for r in corpus["resumes"]}),
+            },
+            "args": vars(args),
+            "cpu_pool_mode": env.get("CPU_POOL_MODE", "process"),
+        }
+    }
+
+    mock = start_process([
+        sys.executable, "-m", "benchmarks.mock_openai", "--port", str(mock_port),
+        "--embedding-latency-ms", str(args.embedding_latency_ms),
+        "--completion-latency-ms", str(args.completion_latency_ms),
+    ], env, os.path.join(workdir, "mock_openai.log"))
+    try:
+        wait_until_up(f"http://127.0.0.1:{mock_port}/stats", mock, timeout=60)
+
+        if not args.skip_micro:
+            print("Running function benchmarks...", file=sys.stderr)
+            os.environ.update(env)
+            results["micro"] = asyncio.run(run_micro(corpus, args.iterations))
+
+        if not args.skip_e2e:
+            service_port = free_port()
+            service = start_process([
+                sys.executable, "-m", "uvicorn", "resume_match_service:app", "--host", "127.0.0.1",
+                "--port", str(service_port), "--workers", str(args.service_workers), "--log-level", "warning",
+            ], env, os.path.join(workdir, "service.log"))
+            try:
+                base_url = f"http://127.0.0.1:{service_port}"
+                wait_until_up(f"{base_url}/health/ready", service, timeout=300)
+                results["e2e"] = []
+                for level in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+                    print(f"Running /analyze at concurrency {level}...", file=sys.stderr)
+                    results["e2e"].append(asyncio.run(run_load(base_url, corpus, args.requests, level, args.warmup)))
+            finally:
+                stop_process(service)
+    finally:
+        stop_process(mock)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,787 @@
+import asyncio
+import base64
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import vectors
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Thread-safe in-process LRU map bounded by item count."""
+
+    def __init__(self, max_items: int):
+        self.max_items = max(0, max_items)
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_items == 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._items),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def content_key(text: str, model: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by a hash of the normalized text and model name.
+
+    Lookups hit the in-process LRU first and fall back to an on-disk SQLite table,
+    which survives restarts and is shared by every worker on the host. Disk rows are
+    evicted least-recently-used once ``max_disk_items`` is exceeded.
+
+    Both tiers hold vectors packed by ``vectors.encode`` (float32, or int8 with
+    ``dtype="int8"``) and return normalized float32 arrays. Rows written as JSON
+    lists by older versions are still read.
+
+    SQLite calls block, so the disk tier runs on a dedicated thread. Read hits are
+    not written back one by one: their access times are collected and flushed in
+    batches. The row count used for eviction is kept in memory and re-read from
+    the table every ``COUNT_SYNC_SECONDS``, since other workers write to it too.
+    """
+
+    TOUCH_BATCH = 256
+    TOUCH_FLUSH_SECONDS = 30.0
+    COUNT_SYNC_SECONDS = 60.0
+
+    def __init__(
+        self,
+        max_memory_items: int,
+        db_path: Optional[str] = None,
+        max_disk_items: int = 100000,
+        dtype: str = vectors.FLOAT32,
+    ):
+        if dtype not in vectors.STORAGE_DTYPES:
+            raise ValueError(f"Unsupported embedding storage dtype: {dtype}")
+        self.memory = LRUCache(max_memory_items)
+        self.db_path = db_path or None
+        self.max_disk_items = max_disk_items
+        self.dtype = dtype
+        self.disk_hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Pending last_access updates of read hits, flushed in batches
+        self._touched: Dict[str, float] = {}
+        self._touched_at = time.monotonic()
+        self._disk_count = 0
+        self._counted_at = time.monotonic()
+        if self.db_path:
+            self._open_db()
+
+    def _open_db(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+            self._db.commit()
+            self._disk_count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-cache-db")
+            logger.info(f"Embedding disk cache opened at {self.db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open embedding disk cache, continuing with memory only: {str(e)}")
+            self._db = None
+
+    async def _db_call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def get_many(self, texts: Sequence[str], model: str) -> List[Optional[np.ndarray]]:
+        keys = [content_key(text, model) for text in texts]
+        packed: List[Optional[bytes]] = [self.memory.get(key) for key in keys]
+
+        missing = [i for i, value in enumerate(packed) if value is None]
+        if missing and self._db is not None:
+            found = await self._db_call(self._disk_get, [keys[i] for i in missing])
+            for i in missing:
+                value = found.get(keys[i])
+                if value is not None:
+                    packed[i] = value
+                    self.memory.set(keys[i], value)
+                    self.disk_hits += 1
+
+        self.misses += sum(1 for value in packed if value is None)
+        return [vectors.decode(value) if value is not None else None for value in packed]
+
+    async def set_many(self, texts: Sequence[str], matrix: Sequence[np.ndarray], model: str) -> None:
+        """Stores normalized vectors, one per text."""
+        rows = []
+        now = time.time()
+        for text, vector in zip(texts, matrix):
+            key = content_key(text, model)
+            value = vectors.encode(vector, self.dtype)
+            self.memory.set(key, value)
+            rows.append((key, model, value, now))
+        if rows and self._db is not None:
+            await self._db_call(self._disk_put, rows)
+
+    async def get(self, text: str, model: str) -> Optional[np.ndarray]:
+        return (await self.get_many([text], model))[0]
+
+    async def set(self, text: str, vector: np.ndarray, model: str) -> None:
+        await self.set_many([text], [vector], model)
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, bytes]:
+        placeholders = ",".join("?" * len(keys))
+        try:
+            with self._db_lock:
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+                ).fetchall()
+                now = time.time()
+                for key, _ in rows:
+                    self._touched[key] = now
+                if len(self._touched) >= self.TOUCH_BATCH or (
+                    self._touched and time.monotonic() - self._touched_at >= self.TOUCH_FLUSH_SECONDS
+                ):
+                    self._flush_touched()
+                    self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding disk cache read failed: {str(e)}")
+            return {}
+        found = {}
+        for key, value in rows:
+            if isinstance(value, str):
+                # JSON list written before vectors were stored packed
+                value = vectors.encode(vectors.normalize(json.loads(value)), self.dtype)
+            found[key] = value
+        return found
+
+    def _flush_touched(self) -> None:
+        # Called with the lock held; the caller commits
+        if self._touched:
+            self._db.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                [(now, key) for key, now in self._touched.items()]
+            )
+            self._touched.clear()
+        self._touched_at = time.monotonic()
+
+    def _disk_put(self, rows: List[tuple]) -> None:
+        try:
+            with self._db_lock:
+                added = self._db.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, model, vector, last_access) VALUES (?, ?, ?, ?)",
+                    rows
+                ).rowcount
+                if added < len(rows):
+                    # Some keys were already stored, e.g. by another worker
+                    self._db.executemany(
+                        "UPDATE embeddings SET model = ?, vector = ?, last_access = ? WHERE key = ?",
+                        [(model, value, now, key) for key, model, value, now in rows]
+                    )
+                self._disk_count += added
+                if time.monotonic() - self._counted_at >= self.COUNT_SYNC_SECONDS:
+                    self._disk_count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                    self._counted_at = time.monotonic()
+                overflow = self._disk_count - self.max_disk_items
+                if overflow > 0:
+                    # Eviction goes by last_access, so pending read hits are written first
+                    self._flush_touched()
+                    self._disk_count -= self._db.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                        (overflow,)
+                    ).rowcount
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding disk cache write failed: {str(e)}")
+
+    def disk_items(self) -> int:
+        return self._disk_count if self._db is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        memory_stats = self.memory.stats()
+        hits = memory_stats["hits"] + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": memory_stats["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_items": memory_stats["items"],
+            "memory_evictions": memory_stats["evictions"],
+            "disk_items": self.disk_items(),
+            "disk_enabled": self._db is not None,
+            "dtype": self.dtype,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._executor.shutdown(wait=True)
+            with self._db_lock:
+                try:
+                    self._flush_touched()
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding disk cache flush failed: {str(e)}")
+                self._db.close()
+            self._db = None
+
+
+class SQLiteKV:
+    """
+    Small on-disk JSON key/value table with least-recently-used eviction (none when ``max_items`` is None).
+
+    The methods block; async callers run them on the table's own thread with ``call``.
+    """
+
+    def __init__(self, db_path: str, table: str, max_items: Optional[int]):
+        self.db_path = db_path
+        self.table = table
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{table}-db")
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_access ON {table}(last_access)")
+        self._db.commit()
+
+    async def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._db.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, last_access) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            overflow = 0
+            if self.max_items is not None:
+                overflow = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_items
+            if overflow > 0:
+                self._db.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+            self._db.commit()
+
+    def update(self, key: str, fn: Callable[[Optional[Any]], Optional[Any]]) -> Tuple[Optional[Any], bool]:
+        """
+        Replaces the value with ``fn(value)`` (``value`` is None if missing) in one
+        write transaction, so concurrent writers, in this or another process, cannot
+        interleave. Nothing is written when ``fn`` returns None. Returns the stored
+        value afterwards and whether it was written.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                current = json.loads(row[0]) if row is not None else None
+                value = fn(current)
+                if value is not None:
+                    self._db.execute(
+                        f"INSERT OR REPLACE INTO {self.table} (key, value, last_access) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), time.time())
+                    )
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+        return (value, True) if value is not None else (current, False)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            deleted = self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,)).rowcount
+            self._db.commit()
+        return deleted > 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._db.close()
+
+
+def keywords_key(max_keywords: int, version: Optional[str]) -> str:
+    # ``version`` identifies the skill taxonomy the keywords were extracted with
+    return f"{max_keywords}@{version}" if version else str(max_keywords)
+
+
+class ParsedResumeCache:
+    """
+    Parsed artifacts of uploaded resumes keyed by the SHA-256 of the file bytes.
+
+    Holds the extracted text and the keyword list for each ``max_keywords`` so a
+    resume uploaded against many jobs is parsed and run through spaCy only once.
+    Embeddings are not duplicated here: they are served by the content-addressed
+    ``EmbeddingCache`` keyed on the extracted text. Entries live in an LRU and,
+    when ``db_path`` is set, in an on-disk table that survives restarts.
+    """
+
+    def __init__(self, max_items: int, db_path: Optional[str] = None, max_disk_items: int = 10000):
+        self.memory = LRUCache(max_items)
+        self.disk: Optional[SQLiteKV] = None
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            try:
+                self.disk = SQLiteKV(db_path, "parsed_resumes", max_disk_items)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open parsed resume cache on disk, continuing with memory only: {str(e)}")
+
+    async def get(self, resume_id: str) -> Optional[Dict[str, Any]]:
+        entry = self.memory.get(resume_id)
+        if entry is None and self.disk is not None:
+            try:
+                entry = await self.disk.call(self.disk.get, resume_id)
+            except sqlite3.Error as e:
+                logger.warning(f"Parsed resume cache read failed: {str(e)}")
+            if entry is not None:
+                self.disk_hits += 1
+                self.memory.set(resume_id, entry)
+        if entry is None:
+            self.misses += 1
+        return entry
+
+    async def set(
+        self, resume_id: str, text: str, filename: Optional[str], limits: Optional[List[int]] = None
+    ) -> Dict[str, Any]:
+        entry = {"text": text, "filename": filename, "limits": limits, "keywords": {}}
+        self.memory.set(resume_id, entry)
+        if self.disk is not None:
+            try:
+                await self.disk.call(self.disk.set, resume_id, entry)
+            except sqlite3.Error as e:
+                logger.warning(f"Parsed resume cache write failed: {str(e)}")
+        return entry
+
+    async def get_keywords(
+        self, resume_id: str, max_keywords: int, version: Optional[str] = None
+    ) -> Optional[List[str]]:
+        entry = await self.get(resume_id)
+        if entry is None:
+            return None
+        return entry["keywords"].get(keywords_key(max_keywords, version))
+
+    async def set_keywords(
+        self, resume_id: str, max_keywords: int, keywords: List[str], version: Optional[str] = None
+    ) -> None:
+        entry = await self.get(resume_id)
+        if entry is None:
+            return
+        key = keywords_key(max_keywords, version)
+        entry["keywords"][key] = keywords
+        self.memory.set(resume_id, entry)
+        if self.disk is not None:
+            def merge(stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+                # Other workers may have stored keyword lists for other limits meanwhile
+                if stored is None or stored.get("limits") != entry["limits"]:
+                    return entry
+                stored["keywords"][key] = keywords
+                return stored
+
+            try:
+                await self.disk.call(self.disk.update, resume_id, merge)
+            except sqlite3.Error as e:
+                logger.warning(f"Parsed resume cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        memory_stats = self.memory.stats()
+        hits = memory_stats["hits"] + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": memory_stats["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_items": memory_stats["items"],
+            "memory_evictions": memory_stats["evictions"],
+            "disk_items": len(self.disk) if self.disk is not None else 0,
+            "disk_enabled": self.disk is not None,
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+
+class JobArtifactStore:
+    """
+    Job-side work precomputed when a job is posted or edited, keyed by job ID.
+
+    Each record holds the job text and the SHA-256 of its normalized form, the
+    chunk embeddings (with the model and chunking they were made with), keyword
+    lists per ``max_keywords`` and taxonomy version, and the LLM summary. Storing
+    a different text bumps ``version`` and drops everything derived from the old
+    text; storing the same text again keeps it. Artifact writes name the content
+    hash they were computed from and are skipped if the job changed meanwhile.
+
+    Records are never evicted and every lookup reads SQLite, so all workers see a
+    re-indexed job immediately. Each write reads and replaces the record in one
+    transaction, so artifacts computed concurrently do not overwrite each other.
+    SQLite runs on the table's own thread, off the event loop.
+    """
+
+    def __init__(self, db_path: str):
+        self.kv = SQLiteKV(db_path, "job_artifacts", max_items=None)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = await self.kv.call(self.kv.get, job_id)
+        if record is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return record
+
+    async def put_text(self, job_id: str, text: str) -> Tuple[Dict[str, Any], bool]:
+        """Stores the job text; returns the record and whether the content changed."""
+        digest = self.content_hash(text)
+
+        def replace(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            if record is not None and record["content_hash"] == digest:
+                return None
+            return {
+                "job_id": job_id,
+                "text": text,
+                "content_hash": digest,
+                "version": record["version"] + 1 if record is not None else 1,
+                "updated_at": time.time(),
+                "embedding": None,
+                "keywords": {},
+                "summary": None,
+            }
+
+        return await self.kv.call(self.kv.update, job_id, replace)
+
+    async def _update(self, record: Dict[str, Any], field: str, change: Callable[[Any], Any]) -> None:
+        """Sets ``field`` to ``change(stored value)`` unless the job text changed since ``record`` was read."""
+        def apply(current: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            if current is None or current["content_hash"] != record["content_hash"]:
+                return None
+            current[field] = change(current[field])
+            return current
+
+        current, written = await self.kv.call(self.kv.update, record["job_id"], apply)
+        if written:
+            record[field] = current[field]
+
+    @staticmethod
+    def get_embedding(
+        record: Dict[str, Any], model: Optional[str], chunking: str
+    ) -> Optional[Tuple[str, List[Dict[str, Any]], np.ndarray]]:
+        """``(model, chunks, matrix)`` if stored under ``chunking`` (and ``model``, unless None)."""
+        embedding = record.get("embedding")
+        if embedding is None or embedding["chunking"] != chunking:
+            return None
+        if model is not None and embedding["model"] != model:
+            return None
+        matrix = np.frombuffer(base64.b64decode(embedding["vectors"]), dtype=np.float32)
+        return embedding["model"], embedding["chunks"], matrix.reshape(len(embedding["chunks"]), -1)
+
+    async def set_embedding(
+        self, record: Dict[str, Any], model: str, chunking: str, chunks: List[Dict[str, Any]], matrix: np.ndarray
+    ) -> None:
+        embedding = {
+            "model": model,
+            "chunking": chunking,
+            "chunks": chunks,
+            "vectors": base64.b64encode(np.asarray(matrix, dtype=np.float32).tobytes()).decode("ascii"),
+        }
+        await self._update(record, "embedding", lambda _: embedding)
+
+    @staticmethod
+    def get_keywords(record: Dict[str, Any], max_keywords: int, version: Optional[str] = None) -> Optional[List[str]]:
+        return record["keywords"].get(keywords_key(max_keywords, version))
+
+    async def set_keywords(
+        self, record: Dict[str, Any], max_keywords: int, keywords: List[str], version: Optional[str] = None
+    ) -> None:
+        # Merged into the stored lists, which may have gained other limits since ``record`` was read
+        key = keywords_key(max_keywords, version)
+        await self._update(record, "keywords", lambda stored: {**stored, key: keywords})
+
+    async def set_summary(self, record: Dict[str, Any], summary: Dict[str, Any]) -> None:
+        await self._update(record, "summary", lambda _: summary)
+
+    async def delete(self, job_id: str) -> bool:
+        return await self.kv.call(self.kv.delete, job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"jobs": len(self.kv), "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        self.kv.close()
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    TTL cache for LLM completions keyed by a hash of the full request (model, messages,
+    sampling parameters), with coalescing of identical in-flight requests.
+
+    Concurrent callers with the same request share one upstream call, streamed or not;
+    only successful responses that pass the caller's ``cacheable`` check are cached, so
+    a failure or a malformed completion is seen by the callers waiting on it and the
+    next request retries. Entries live in an LRU and, when ``db_path`` is set, in an
+    on-disk table shared by all workers on the host.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        ttl_seconds: float,
+        db_path: Optional[str] = None,
+        max_disk_items: int = 10000,
+    ):
+        self.memory = LRUCache(max_items)
+        self.ttl_seconds = ttl_seconds
+        self.disk: Optional[SQLiteKV] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.expired = 0
+        if db_path:
+            try:
+                self.disk = SQLiteKV(db_path, "llm_responses", max_disk_items)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open LLM response cache on disk, continuing with memory only: {str(e)}")
+
+    async def _get(self, key: str) -> Optional[Any]:
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            try:
+                entry = await self.disk.call(self.disk.get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache read failed: {str(e)}")
+            if entry is not None:
+                self.disk_hits += 1
+                self.memory.set(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry["expires_at"] < time.time():
+            self.expired += 1
+            self.misses += 1
+            self.memory.pop(key)
+            return None
+        return entry["value"]
+
+    async def _set(self, key: str, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        entry = {"expires_at": time.time() + self.ttl_seconds, "value": value}
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            try:
+                await self.disk.call(self.disk.set, key, entry)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache write failed: {str(e)}")
+
+    def _start(
+        self, key: str, create: Callable[[], Awaitable[Any]], cacheable: Optional[Callable[[Any], bool]]
+    ) -> asyncio.Future:
+        # The upstream call runs as its own task so a cancelled caller does not cancel it for the others
+        task = asyncio.ensure_future(self._create(key, create, cacheable))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    async def get_or_create(
+        self,
+        request: Dict[str, Any],
+        create: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        key = request_key(request)
+        value = await self._get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, create, cacheable)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def get_or_stream(
+        self,
+        request: Dict[str, Any],
+        stream: Callable[[], AsyncIterator[str]],
+        cacheable: Optional[Callable[[str], bool]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yields a text completion in pieces. The first caller consumes ``stream`` in a
+        task of its own and gets each piece as it arrives; a cached completion, or one
+        that an identical request is already producing, arrives as one piece once done.
+        """
+        key = request_key(request)
+        value = await self._get(key)
+        if value is not None:
+            yield value
+            return
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            yield await asyncio.shield(task)
+            return
+
+        pieces: asyncio.Queue = asyncio.Queue()
+
+        async def create() -> str:
+            parts = []
+            try:
+                async for piece in stream():
+                    parts.append(piece)
+                    pieces.put_nowait(piece)
+            finally:
+                pieces.put_nowait(None)
+            return "".join(parts)
+
+        task = self._start(key, create, cacheable)
+        while True:
+            piece = await pieces.get()
+            if piece is None:
+                break
+            yield piece
+        # Raises the upstream error, if any
+        await asyncio.shield(task)
+
+    async def _create(
+        self, key: str, create: Callable[[], Awaitable[Any]], cacheable: Optional[Callable[[Any], bool]]
+    ) -> Any:
+        self.upstream_calls += 1
+        value = await create()
+        if cacheable is None or cacheable(value):
+            await self._set(key, value)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller has gone away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        memory_stats = self.memory.stats()
+        # An expired entry was found in memory or on disk but is counted as a miss
+        hits = memory_stats["hits"] + self.disk_hits - self.expired
+        lookups = hits + self.misses
+        return {
+            "memory_hits": memory_stats["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "memory_items": memory_stats["items"],
+            "disk_items": len(self.disk) if self.disk is not None else 0,
+            "inflight": len(self._inflight),
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
@@ -0,0 +1,231 @@
+import logging
+import math
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import tiktoken
+except ImportError:  # Optional: token counts are estimated without it
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Word runs and single punctuation marks; the unit of the token estimate
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?;])\s+")
+
+# Lowercased headings that start a new section in resumes and job descriptions
+SECTION_HEADINGS = frozenset({
+    'summary', 'professional summary', 'profile', 'objective', 'about me', 'experience',
+    'work experience', 'professional experience', 'employment', 'employment history', 'work history',
+    'education', 'skills', 'technical skills', 'core competencies', 'projects', 'certifications',
+    'publications', 'awards', 'languages', 'interests', 'volunteer experience', 'references',
+    'responsibilities', 'requirements', 'qualifications', 'minimum qualifications',
+    'preferred qualifications', 'nice to have', 'about us', 'about the role', 'the role',
+    "what you'll do", 'what you will do', 'who you are', 'benefits',
+})
+_MAX_HEADING_CHARS = 40
+_MAX_HEADING_WORDS = 4
+
+POOLING_MODES = ("mean", "max_sim")
+
+
+def _estimate(piece: str) -> int:
+    # BPE averages about four characters per token for ASCII words; other scripts
+    # often take a token or more per character, so count those per character
+    if piece.isascii():
+        return max(1, math.ceil(len(piece) / 4))
+    return len(piece)
+
+
+class TokenCounter:
+    """
+    Counts and cuts text in embedding-model tokens.
+
+    Uses tiktoken when it is installed and the model's encoding can be loaded,
+    otherwise a character-based estimate that errs high, so chunks and inputs
+    stay under the model limit either way.
+    """
+
+    def __init__(self, model: str):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                try:
+                    self.encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    self.encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"tiktoken encoding unavailable, estimating token counts: {str(e)}")
+        self.exact = self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return sum(_estimate(match.group()) for match in _PIECE_PATTERN.finditer(text))
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """Cuts ``text`` into consecutive pieces of at most ``max_tokens`` tokens."""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return [
+                self.encoding.decode(tokens[i:i + max_tokens]).strip()
+                for i in range(0, len(tokens), max_tokens)
+            ]
+
+        pieces = []
+        start = used = 0
+        for match in _PIECE_PATTERN.finditer(text):
+            cost = _estimate(match.group())
+            if used and used + cost > max_tokens:
+                pieces.append(text[start:match.start()].strip())
+                start, used = match.start(), 0
+            if cost > max_tokens:
+                # A single run longer than the limit (e.g. an encoded blob) is cut by characters
+                step = max_tokens * 4 if match.group().isascii() else max_tokens
+                offset = match.start()
+                while match.end() - offset > step:
+                    pieces.append(text[offset:offset + step])
+                    offset += step
+                start = offset
+                cost = _estimate(text[offset:match.end()])
+            used += cost
+        tail = text[start:].strip()
+        if tail:
+            pieces.append(tail)
+        return pieces
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self.count(text) <= max_tokens:
+            return text
+        return self.split(text, max_tokens)[0]
+
+
+class Chunk:
+    __slots__ = ("text", "tokens", "section")
+
+    def __init__(self, text: str, tokens: int, section: Optional[str] = None):
+        self.text = text
+        self.tokens = tokens
+        self.section = section
+
+
+def is_heading(line: str) -> bool:
+    name = line.rstrip(":").strip()
+    if not name or len(name) > _MAX_HEADING_CHARS or len(name.split()) > _MAX_HEADING_WORDS:
+        return False
+    if name.lower() in SECTION_HEADINGS:
+        return True
+    # Short all-caps lines ("WORK HISTORY") are headings in most resume layouts
+    return name.isupper() and sum(char.isalpha() for char in name) >= 3
+
+
+def split_sections(text: str) -> List[Tuple[Optional[str], List[str]]]:
+    """Groups the non-empty lines of ``text`` under the heading that precedes them."""
+    sections: List[Tuple[Optional[str], List[str]]] = [(None, [])]
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if is_heading(line):
+            sections.append((line.rstrip(":").strip(), []))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, lines) for heading, lines in sections if lines]
+
+
+def _units(lines: List[str], counter: TokenCounter, budget: int) -> List[Tuple[str, int]]:
+    # Lines that fit are kept whole; longer ones are split at sentence ends, then by tokens
+    units = []
+    for line in lines:
+        tokens = counter.count(line)
+        if tokens <= budget:
+            units.append((line, tokens))
+            continue
+        for sentence in _SENTENCE_END_PATTERN.split(line):
+            tokens = counter.count(sentence)
+            if tokens <= budget:
+                units.append((sentence, tokens))
+            else:
+                units.extend((piece, counter.count(piece)) for piece in counter.split(sentence, budget))
+    return units
+
+
+def chunk_text(text: str, counter: TokenCounter, max_tokens: int) -> List[Chunk]:
+    """
+    Splits ``text`` into chunks of at most ``max_tokens`` tokens.
+
+    A text that fits is returned whole, unchanged, so short documents embed (and
+    hit the cache) exactly as before. Longer texts are split per section and
+    lines are packed greedily within a section, with the section heading repeated
+    at the top of each chunk. Chunk boundaries depend only on the section's own
+    lines, so an edit re-embeds the chunks of the edited section and keeps the
+    cached vectors of the rest.
+    """
+    total = counter.count(text)
+    if total <= max_tokens:
+        return [Chunk(text, total)]
+
+    chunks = []
+    for heading, lines in split_sections(text):
+        prefix = f"{heading}\n" if heading else ""
+        budget = max_tokens - (counter.count(prefix) + 1 if prefix else 0)
+        if budget < max_tokens // 2:
+            prefix, budget = "", max_tokens
+
+        current: List[str] = []
+        used = 0
+        for unit, tokens in _units(lines, counter, budget):
+            # One token for the newline joining it to the previous unit
+            if current and used + tokens + 1 > budget:
+                chunks.append(_make_chunk(prefix, current, counter, heading))
+                current, used = [], 0
+            current.append(unit)
+            used += tokens + (1 if len(current) > 1 else 0)
+        if current:
+            chunks.append(_make_chunk(prefix, current, counter, heading))
+    return chunks or [Chunk(text, total)]
+
+
+def _make_chunk(prefix: str, units: List[str], counter: TokenCounter, heading: Optional[str]) -> Chunk:
+    text = prefix + "\n".join(units)
+    return Chunk(text, counter.count(text), heading)
+
+
+def mean_pool(vectors: np.ndarray, weights: Sequence[float]) -> np.ndarray:
+    """Token-weighted mean of normalized chunk vectors, normalized again."""
+    weights = np.asarray(weights, dtype=np.float32)
+    if weights.sum() <= 0:
+        weights = np.ones(len(vectors), dtype=np.float32)
+    pooled = weights @ vectors
+    norm = np.linalg.norm(pooled)
+    return pooled / norm if norm else pooled
+
+
+def max_sim(query: np.ndarray, query_weights: Sequence[float], document: np.ndarray) -> float:
+    """
+    For each query chunk, its best cosine against any document chunk, averaged
+    over the query chunks by token count: how well the document covers the query.
+    Both matrices hold normalized rows.
+    """
+    best = (query @ document.T).max(axis=1)
+    weights = np.asarray(query_weights, dtype=np.float32)
+    if weights.sum() <= 0:
+        return float(best.mean())
+    return float(best @ weights / weights.sum())
+
+
+def pooled_similarity(
+    query: np.ndarray,
+    query_chunks: List[Chunk],
+    document: np.ndarray,
+    document_chunks: List[Chunk],
+    pooling: str = "mean",
+) -> float:
+    query_weights = [chunk.tokens for chunk in query_chunks]
+    if pooling == "max_sim":
+        return max_sim(query, query_weights, document)
+    document_weights = [chunk.tokens for chunk in document_chunks]
+    return float(mean_pool(query, query_weights) @ mean_pool(document, document_weights))
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CPUPoolSaturated(Exception):
+    """Raised when the pool and its wait queue are both full."""
+
+
+class CPUTaskTimeout(Exception):
+    """Raised when a task runs longer than the per-task timeout."""
+
+
+class CPUPool:
+    """
+    Bounded executor for CPU-bound work (document parsing, spaCy).
+
+    At most ``max_workers`` tasks execute at once and at most ``max_pending`` more
+    wait for a slot; anything beyond that is rejected with ``CPUPoolSaturated`` so
+    callers can shed load. In process mode a task that exceeds its timeout has its
+    worker processes terminated and the pool replaced, so a pathological document
+    cannot hold a core indefinitely. Tasks that were running on the recycled pool
+    are retried once on the new one.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int = 64,
+        task_timeout: float = 30.0,
+        mode: str = "process",
+        start_method: str = "spawn",
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Unsupported CPU pool mode: {mode}")
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self.task_timeout = task_timeout
+        self.mode = mode
+        self.start_method = start_method
+        self.initializer = initializer
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._executor = self._new_executor()
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.recycles = 0
+
+    def _new_executor(self) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu")
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=self.initializer
+        )
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        if self._slots.locked() and self.waiting >= self.max_pending:
+            self.rejected += 1
+            raise CPUPoolSaturated(
+                f"CPU pool is saturated ({self.running} running, {self.waiting} waiting)"
+            )
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            return await self._execute(fn, args, timeout if timeout is not None else self.task_timeout)
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    async def _execute(self, fn: Callable[..., Any], args: tuple, timeout: float) -> Any:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._executor
+            future = loop.run_in_executor(executor, fn, *args)
+            try:
+                result = await asyncio.wait_for(future, timeout)
+                self.completed += 1
+                return result
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                logger.error(f"CPU task {fn.__name__} exceeded {timeout}s timeout")
+                self._recycle(executor)
+                raise CPUTaskTimeout(f"{fn.__name__} exceeded the {timeout:g}s processing limit")
+            except BrokenProcessPool:
+                # Replaced either way, so later tasks do not fail on the broken pool
+                self._recycle(executor)
+                if attempt:
+                    raise
+                logger.warning(f"CPU pool broke while running {fn.__name__}, retrying on a fresh pool")
+
+    def _recycle(self, executor: Executor) -> None:
+        if executor is not self._executor or self.mode == "thread":
+            # Threads cannot be killed; the timed out task finishes in the background
+            return
+        self.recycles += 1
+        self._executor = self._new_executor()
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "recycles": self.recycles,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,170 @@
+import logging
+import math
+import re
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from embedding_batcher import EmbeddingBatcher
+from keyword_extraction import COMMON_STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+# Runs a picklable function with positional args, e.g. on the CPU pool
+Runner = Callable[..., Awaitable[Any]]
+
+_HASHING_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+_spacy_vector_models: Dict[str, Any] = {}
+
+
+async def run_inline(fn: Callable[..., Any], *args: Any) -> Any:
+    return fn(*args)
+
+
+def hashing_embed(texts: Sequence[str], dim: int) -> List[List[float]]:
+    """Signed feature hashing of unigrams and bigrams with sublinear term frequency."""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = [t for t in _HASHING_TOKEN_PATTERN.findall(text.lower()) if t not in COMMON_STOP_WORDS]
+        counts = Counter(tokens)
+        counts.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        for term, count in counts.items():
+            h = zlib.crc32(term.encode("utf-8"))
+            sign = -1.0 if h & 0x80000000 else 1.0
+            vectors[row, h % dim] += sign * (1.0 + math.log(count))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).tolist()
+
+
+def spacy_vectors_embed(texts: Sequence[str], model_name: str) -> List[List[float]]:
+    nlp = _spacy_vector_models.get(model_name)
+    if nlp is None:
+        import spacy
+        # Only the static word vectors are needed
+        nlp = spacy.load(model_name, exclude=["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"])
+        if nlp.vocab.vectors.shape[0] == 0:
+            raise ValueError(f"spaCy model '{model_name}' has no word vectors")
+        _spacy_vector_models[model_name] = nlp
+    return [doc.vector.tolist() for doc in nlp.pipe(texts)]
+
+
+class EmbeddingProvider(ABC):
+    """
+    Produces embeddings for a list of texts.
+
+    ``name`` identifies the vector space (provider and model) and is used as the
+    cache and vector index key, so vectors from different providers never mix.
+    """
+
+    kind = "base"
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        ...
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "available": self.available(), "calls": self.calls, "failures": self.failures}
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    kind = "openai"
+
+    def __init__(self, get_client: Callable[[], Any], model: str, batch_size: int = 64, batch_window_ms: float = 5.0):
+        super().__init__()
+        self.get_client = get_client
+        self.model = model
+        self.batcher = EmbeddingBatcher(self._embed_batch, max_batch_size=batch_size, max_wait_ms=batch_window_ms)
+
+    @property
+    def name(self) -> str:
+        # Bare model name keeps cache entries and indexes written before providers existed valid
+        return self.model
+
+    def available(self) -> bool:
+        return self.get_client() is not None
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        response = await self.get_client().create_embeddings(model=self.model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        return await self.batcher.embed(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "batcher": self.batcher.stats()}
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    kind = "hashing"
+
+    def __init__(self, dim: int = 1024, runner: Runner = run_inline):
+        super().__init__()
+        self.dim = dim
+        self.runner = runner
+
+    @property
+    def name(self) -> str:
+        return f"hashing-{self.dim}"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        return await self.runner(hashing_embed, list(texts), self.dim)
+
+
+class SpacyVectorEmbeddingProvider(EmbeddingProvider):
+    kind = "spacy"
+
+    def __init__(self, model_name: str = "en_core_web_md", runner: Runner = run_inline):
+        super().__init__()
+        self.model_name = model_name
+        self.runner = runner
+
+    @property
+    def name(self) -> str:
+        return f"spacy-{self.model_name}"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        return await self.runner(spacy_vectors_embed, list(texts), self.model_name)
+
+
+def build_providers(
+    names: Sequence[str],
+    get_openai_client: Callable[[], Any],
+    openai_model: str,
+    batch_size: int,
+    batch_window_ms: float,
+    hashing_dim: int,
+    spacy_model: str,
+    runner: Optional[Runner] = None,
+) -> List[EmbeddingProvider]:
+    runner = runner or run_inline
+    providers: List[EmbeddingProvider] = []
+    for name in names:
+        if name == "openai":
+            providers.append(OpenAIEmbeddingProvider(get_openai_client, openai_model, batch_size, batch_window_ms))
+        elif name == "hashing":
+            providers.append(HashingEmbeddingProvider(hashing_dim, runner))
+        elif name == "spacy":
+            providers.append(SpacyVectorEmbeddingProvider(spacy_model, runner))
+        else:
+            raise ValueError(f"Unknown embedding provider: {name}")
+    return providers
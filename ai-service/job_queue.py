@@ -0,0 +1,560 @@
+import asyncio
+import functools
+import hashlib
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+JobHandler = Callable[[Dict[str, Any], Optional[bytes]], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    """Raised when ``max_queued`` jobs are already waiting."""
+
+
+class JobRetry(Exception):
+    """Raised by a handler to put the job back in the queue, e.g. while a downstream pool is saturated."""
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail the job with a client-facing detail and status code."""
+
+    def __init__(self, detail: str, status_code: int = 500):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class CallbackNotAllowed(Exception):
+    """Raised when a ``callback_url`` is not an allowed destination for webhooks."""
+
+
+def _host_allowed(host: str, allowed_hosts: Sequence[str]) -> bool:
+    # "*" allows any host, ".example.com" a domain and its subdomains, anything else one host
+    for allowed in allowed_hosts:
+        allowed = allowed.lower()
+        if allowed == "*" or host == allowed:
+            return True
+        if allowed.startswith(".") and (host.endswith(allowed) or host == allowed[1:]):
+            return True
+    return False
+
+
+async def check_callback_url(url: str, allowed_hosts: Sequence[str], allow_private: bool = False) -> None:
+    """
+    Raises ``CallbackNotAllowed`` unless ``url`` is http(s), its host is allow-listed
+    and, unless ``allow_private``, every address it resolves to is public. Keeps
+    callers from making the service send requests to internal hosts.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise CallbackNotAllowed("callback_url must be an http or https URL")
+    host = parts.hostname.lower()
+    if not _host_allowed(host, allowed_hosts):
+        raise CallbackNotAllowed(f"callback_url host {host} is not allowed")
+    if allow_private:
+        return
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, ValueError) as e:
+        raise CallbackNotAllowed(f"callback_url host {host} cannot be resolved: {str(e)}")
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if not address.is_global:
+            raise CallbackNotAllowed(f"callback_url host {host} resolves to a non-public address")
+
+
+class JobQueue:
+    """
+    Persistent priority queue of background jobs executed by a bounded set of workers.
+
+    Jobs are stored in a SQLite table, so queued work survives restarts and every
+    service worker pointed at the same file shares one queue. Higher ``priority``
+    runs first, then oldest first. A submission identical to a queued, running or
+    still-retained completed job (same kind, payload and attachment) returns that
+    job instead of creating a new one. Workers claim a job by taking a lease, which
+    they renew while the handler runs; a job whose lease runs out (its worker died
+    or stalled) is claimed again, up to ``max_attempts`` times. A claim is identified
+    by the job's attempt number, so a worker whose job was claimed again cannot
+    finish or requeue it, and its result is dropped. Finished jobs are kept for ``retention_seconds`` and can optionally be
+    POSTed to a callback URL on one of ``webhook_allowed_hosts``.
+
+    SQLite calls can wait up to the busy timeout for another process's write lock,
+    so the async methods run them on a dedicated thread instead of the event loop.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str],
+        workers: int = 4,
+        max_queued: int = 1000,
+        retention_seconds: float = 3600.0,
+        max_attempts: int = 3,
+        retry_delay: float = 2.0,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+        webhook_timeout: float = 10.0,
+        webhook_allowed_hosts: Sequence[str] = (),
+        webhook_allow_private: bool = False,
+    ):
+        self.db_path = db_path or None
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self.retention_seconds = retention_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.webhook_timeout = webhook_timeout
+        self.webhook_allowed_hosts = list(webhook_allowed_hosts)
+        self.webhook_allow_private = webhook_allow_private
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        # Attempt number of each job this process is running, which identifies its claim
+        self._active: Dict[str, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._swept_at = 0.0
+        self._closing = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-queue-db")
+        self._counts: Dict[str, int] = {}
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.retries = 0
+        self.stale_completions = 0
+        self.webhooks_sent = 0
+        self.webhook_failures = 0
+
+        if self.db_path:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # Autocommit mode; claims take an explicit write lock so concurrent processes never share a job
+        self._db = sqlite3.connect(self.db_path or ":memory:", check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                dedup_key TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                attachment BLOB,
+                callback_url TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                available_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                lease_expires_at REAL,
+                expires_at REAL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, priority DESC, created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs(dedup_key)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_expires ON jobs(expires_at)")
+        if not self.db_path:
+            logger.warning("Job queue is in memory only; queued jobs are lost on restart")
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    async def _db_call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def start(self) -> None:
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._http = httpx.AsyncClient(timeout=self.webhook_timeout)
+        self._tasks = [asyncio.ensure_future(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Job queue started with {self.workers} workers ({self.db_path or 'in memory'})")
+
+    async def stop(self) -> None:
+        # The flag stops workers even if wait_for swallows the cancellation of a wakeup that just fired
+        self._closing = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._active:
+            # Interrupted jobs go back to the queue without using up an attempt
+            await self._db_call(self._release, list(self._active.items()))
+            self._active.clear()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        await self._db_call(self._close)
+        self._executor.shutdown(wait=False)
+
+    def _release(self, claims: List[Tuple[str, int]]) -> None:
+        with self._lock:
+            self._db.executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, lease_expires_at = NULL "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                [(QUEUED, job_id, RUNNING, attempts) for job_id, attempts in claims]
+            )
+
+    def _close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _dedup_key(kind: str, payload: Dict[str, Any], attachment: Optional[bytes]) -> str:
+        digest = hashlib.sha256()
+        digest.update(kind.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(hashlib.sha256(attachment or b"").digest())
+        return digest.hexdigest()
+
+    async def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        attachment: Optional[bytes] = None,
+        priority: int = 0,
+        callback_url: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queues a job. Returns ``(job, deduplicated)``; raises ``JobQueueFull`` when the
+        queue is at capacity and ``CallbackNotAllowed`` for a disallowed ``callback_url``.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if callback_url:
+            if not self.webhook_allowed_hosts:
+                raise CallbackNotAllowed("callback_url is not enabled on this service")
+            await check_callback_url(callback_url, self.webhook_allowed_hosts, self.webhook_allow_private)
+        job, deduplicated = await self._db_call(self._submit, kind, payload, attachment, priority, callback_url)
+        if not deduplicated and self._wakeup is not None:
+            self._wakeup.set()
+        return job, deduplicated
+
+    def _submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        attachment: Optional[bytes],
+        priority: int,
+        callback_url: Optional[str],
+    ) -> Tuple[Dict[str, Any], bool]:
+        dedup_key = self._dedup_key(kind, payload, attachment)
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT id, status FROM jobs WHERE dedup_key = ? AND status != ? "
+                    "AND (expires_at IS NULL OR expires_at > ?) ORDER BY created_at DESC LIMIT 1",
+                    (dedup_key, FAILED, now)
+                ).fetchone()
+                if row is not None:
+                    job_id, status = row
+                    if status == QUEUED:
+                        # A more urgent duplicate promotes the waiting job
+                        self._db.execute(
+                            "UPDATE jobs SET priority = MAX(priority, ?) WHERE id = ?", (priority, job_id)
+                        )
+                    self._db.execute("COMMIT")
+                    self.deduplicated += 1
+                    return self._get_locked(job_id), True
+
+                queued = self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+                if queued >= self.max_queued:
+                    self._db.execute("ROLLBACK")
+                    self.rejected += 1
+                    raise JobQueueFull(f"Job queue is full ({queued} jobs waiting)")
+
+                job_id = uuid.uuid4().hex
+                self._db.execute(
+                    "INSERT INTO jobs (id, kind, dedup_key, priority, status, payload, attachment, callback_url, "
+                    "created_at, available_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, dedup_key, priority, QUEUED, json.dumps(payload), attachment, callback_url, now, now)
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+            job = self._get_locked(job_id)
+        self.submitted += 1
+        return job, False
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._db_call(self._get, job_id)
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._get_locked(job_id)
+
+    def _get_locked(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute(
+            "SELECT id, kind, status, priority, attempts, created_at, started_at, finished_at, result, error, "
+            "expires_at FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        (job_id, kind, status, priority, attempts, created_at, started_at, finished_at, result, error,
+         expires_at) = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": status,
+            "priority": priority,
+            "attempts": attempts,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+        }
+        if status == QUEUED:
+            job["queue_position"] = self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority > ? OR (priority = ? AND created_at < ?))",
+                (QUEUED, priority, priority, created_at)
+            ).fetchone()[0] + 1
+        if result is not None:
+            job["result"] = json.loads(result)
+        if error is not None:
+            job["error"] = json.loads(error)
+        return job
+
+    def _claim(self) -> Optional[Tuple[str, str, Dict[str, Any], Optional[bytes], int]]:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT id, kind, payload, attachment, attempts FROM jobs "
+                    "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?) "
+                    "ORDER BY priority DESC, created_at ASC LIMIT 1",
+                    (QUEUED, now, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                job_id, kind, payload, attachment, attempts = row
+                attempts += 1
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, attempts = ?, started_at = ?, lease_expires_at = ? WHERE id = ?",
+                    (RUNNING, attempts, now, now + self.lease_seconds, job_id)
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+        return job_id, kind, json.loads(payload), attachment, attempts
+
+    def _renew(self, job_id: str, attempts: int) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (time.time() + self.lease_seconds, job_id, RUNNING, attempts)
+            ).rowcount > 0
+
+    def _finish(
+        self, job_id: str, attempts: int, status: str, result: Any = None, error: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Records the outcome of claim ``attempts``; False if the job has been claimed again since."""
+        now = time.time()
+        with self._lock:
+            # The attachment is only needed to run the job, so it is dropped once the job is done
+            return self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ?, "
+                "lease_expires_at = NULL, attachment = NULL WHERE id = ? AND status = ? AND attempts = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    json.dumps(error) if error is not None else None,
+                    now,
+                    now + self.retention_seconds,
+                    job_id,
+                    RUNNING,
+                    attempts,
+                )
+            ).rowcount > 0
+
+    def _requeue(self, job_id: str, attempts: int, delay: float) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                (QUEUED, time.time() + delay, job_id, RUNNING, attempts)
+            ).rowcount > 0
+
+    def _sweep(self) -> None:
+        now = time.time()
+        if now - self._swept_at < 60:
+            return
+        self._swept_at = now
+        with self._lock:
+            deleted = self._db.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            ).rowcount
+        if deleted:
+            logger.info(f"Removed {deleted} expired jobs")
+
+    async def _worker(self, index: int) -> None:
+        while not self._closing:
+            try:
+                self._wakeup.clear()
+                claimed = await self._db_call(self._claim)
+                if claimed is None:
+                    await self._db_call(self._sweep)
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run(*claimed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {index} error: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _keep_lease(self, job_id: str, attempts: int) -> None:
+        # Renewed three times per lease period, so one slow or failed renewal does not lose the job
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                renewed = await self._db_call(self._renew, job_id, attempts)
+            except sqlite3.Error as e:
+                logger.warning(f"Lease renewal for job {job_id} failed: {str(e)}")
+                continue
+            if not renewed:
+                logger.warning(f"Job {job_id} lost its lease (attempt {attempts}); its outcome will be dropped")
+                return
+
+    async def _complete(
+        self, job_id: str, attempts: int, status: str, result: Any = None, error: Optional[Dict[str, Any]] = None
+    ) -> None:
+        try:
+            finished = await self._db_call(self._finish, job_id, attempts, status, result, error)
+        finally:
+            self._active.pop(job_id, None)
+        if finished:
+            await self._notify(job_id)
+        else:
+            self._drop_stale(job_id, attempts)
+
+    def _drop_stale(self, job_id: str, attempts: int) -> None:
+        self.stale_completions += 1
+        logger.warning(f"Job {job_id} was claimed again while attempt {attempts} ran; dropping that attempt's outcome")
+
+    async def _run(self, job_id: str, kind: str, payload: Dict[str, Any], attachment: Optional[bytes], attempts: int) -> None:
+        handler = self._handlers.get(kind)
+        if handler is None:
+            await self._complete(job_id, attempts, FAILED, None, {"status_code": 500, "detail": f"Unknown job kind: {kind}"})
+            return
+        if attempts > self.max_attempts:
+            logger.error(f"Job {job_id} abandoned after {attempts - 1} attempts")
+            await self._complete(
+                job_id, attempts, FAILED, None, {"status_code": 500, "detail": "Job was interrupted too many times"}
+            )
+            return
+
+        self._active[job_id] = attempts
+        lease = asyncio.ensure_future(self._keep_lease(job_id, attempts))
+        status, result, error = COMPLETED, None, None
+        try:
+            try:
+                result = await handler(payload, attachment)
+            finally:
+                lease.cancel()
+        except JobRetry as e:
+            if attempts < self.max_attempts:
+                self.retries += 1
+                logger.warning(f"Job {job_id} will be retried (attempt {attempts}): {str(e)}")
+                try:
+                    requeued = await self._db_call(self._requeue, job_id, attempts, self.retry_delay * attempts)
+                finally:
+                    self._active.pop(job_id, None)
+                if not requeued:
+                    self._drop_stale(job_id, attempts)
+                return
+            status, error = FAILED, {"status_code": 503, "detail": str(e)}
+        except JobFailed as e:
+            status, error = FAILED, {"status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            status, error = FAILED, {"status_code": 500, "detail": str(e)}
+        await self._complete(job_id, attempts, status, result, error)
+
+    def _callback_url(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT callback_url FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    async def _notify(self, job_id: str) -> None:
+        callback_url = await self._db_call(self._callback_url, job_id)
+        if not callback_url:
+            return
+        try:
+            # Checked again at delivery: the host may resolve differently than at submission
+            await check_callback_url(callback_url, self.webhook_allowed_hosts, self.webhook_allow_private)
+        except CallbackNotAllowed as e:
+            self.webhook_failures += 1
+            logger.warning(f"Callback for job {job_id} skipped: {str(e)}")
+            return
+        try:
+            response = await self._http.post(callback_url, json=await self.get(job_id))
+            response.raise_for_status()
+            self.webhooks_sent += 1
+        except httpx.HTTPError as e:
+            self.webhook_failures += 1
+            logger.warning(f"Callback for job {job_id} failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        # Called on the event loop, so it never waits for the DB thread: while that thread
+        # holds the connection (possibly waiting on another process), the last counts are reported
+        if self._lock.acquire(blocking=False):
+            try:
+                self._counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            except sqlite3.Error as e:
+                logger.warning(f"Job queue stats read failed: {str(e)}")
+            finally:
+                self._lock.release()
+        counts = self._counts
+        return {
+            "workers": self.workers,
+            "active": len(self._active),
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "completed": counts.get(COMPLETED, 0),
+            "failed": counts.get(FAILED, 0),
+            "max_queued": self.max_queued,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "stale_completions": self.stale_completions,
+            "webhooks_sent": self.webhooks_sent,
+            "webhook_failures": self.webhook_failures,
+            "persistent": self.db_path is not None,
+        }
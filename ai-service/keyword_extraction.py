@@ -0,0 +1,324 @@
+import logging
+import re
+import threading
+from typing import List, Optional
+
+import spacy
+from spacy.attrs import IS_PUNCT, IS_SPACE, IS_STOP, LIKE_NUM, POS
+from spacy.symbols import ADJ, NOUN, PROPN, VERB
+from spacy.tokens import Doc
+
+from skill_taxonomy import SkillTaxonomy
+
+logger = logging.getLogger(__name__)
+
+nlp = None
+taxonomy: Optional[SkillTaxonomy] = None
+_model_lock = threading.Lock()
+_model_load_failed = False
+
+SPACY_MODEL = "en_core_web_sm"
+# Keyword scoring reads POS tags, noun chunks and entities; lemmas are never used
+SPACY_EXCLUDE = ["lemmatizer"]
+# Run once after loading so the first real request does not pay for lazy pipeline initialization
+WARMUP_TEXT = (
+    "Senior Software Engineer with 6 years of experience building REST APIs in Python and FastAPI, "
+    "deploying services with Docker and Kubernetes on AWS, and leading a team of four engineers."
+)
+
+# Lowercased technology names recognized by the fallback extractor even when not capitalized;
+# names that are also common English words (go, swift, rest) are left out
+TECH_TERMS = frozenset({
+    'python', 'java', 'javascript', 'typescript', 'golang', 'rust', 'ruby', 'php', 'perl', 'scala',
+    'kotlin', 'c++', 'c#', 'matlab', 'bash', 'sql', 'nosql', 'graphql', 'html', 'html5', 'css',
+    'css3', 'sass', 'react', 'angular', 'vue', 'svelte', 'jquery', 'redux', 'node', 'node.js',
+    'next.js', 'django', 'flask', 'fastapi', 'laravel', '.net', 'asp.net', 'dotnet', 'aws', 'azure',
+    'gcp', 'docker', 'kubernetes', 'k8s', 'terraform', 'ansible', 'jenkins', 'git', 'github',
+    'gitlab', 'linux', 'unix', 'nginx', 'postgresql', 'postgres', 'mysql', 'sqlite', 'mongodb',
+    'redis', 'elasticsearch', 'kafka', 'rabbitmq', 'spark', 'hadoop', 'airflow', 'snowflake',
+    'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras', 'spacy', 'nlp', 'ml', 'ai',
+    'llm', 'etl', 'api', 'apis', 'grpc', 'microservices', 'devops', 'agile', 'scrum', 'jira',
+    'figma', 'tableau', 'salesforce', 'sap',
+})
+
+
+# Fallback extractor patterns. Tech tokens leave out trailing '.' and '-' so sentence
+# punctuation does not stick to a name ("Docker." is "Docker"); the shape pattern starts
+# with a lookahead so plain words are rejected before any of the name shapes is tried
+_CAPITALIZED_PATTERN = re.compile(r'\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b')
+_PHRASE_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2}\b')
+_TECH_TOKEN_PATTERN = re.compile(r'\.?[A-Za-z][\w+#]*(?:[.-]+[\w+#]+)*')
+_TECH_SHAPE_PATTERN = re.compile(
+    r'(?=[\w-]*[.+#])(?:[A-Za-z]+\.(?:js|py|java|ts|jsx|tsx|net|core)'
+    r'|[A-Z][a-z]+(?:\.[A-Z][a-z]+)+'
+    r'|[A-Za-z]+(?:\+{1,2}|#))'
+)
+
+_TOKEN_ATTRS = [IS_STOP, IS_PUNCT, IS_SPACE, LIKE_NUM, POS]
+_FALLBACK_POS = {NOUN, PROPN, VERB}
+
+
+# Common stop words to filter out (expanded list)
+COMMON_STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'from', 'as', 'is', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might', 'must',
+    'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'my', 'your', 'his', 'her', 'its', 'our', 'their', 'me', 'him', 'us', 'them',
+    'what', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how', 'all', 'each',
+    'every', 'both', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
+    'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will', 'just',
+    'don', 'should', 'now', 'd', 'll', 'm', 'o', 're', 've', 'y', 'ain', 'aren', 'couldn',
+    'didn', 'doesn', 'hadn', 'hasn', 'haven', 'isn', 'ma', 'mightn', 'mustn', 'needn',
+    'shan', 'shouldn', 'wasn', 'weren', 'won', 'wouldn'
+}
+
+
+def load_spacy_model(auto_download: bool = False):
+    """
+    Loads the spaCy model into this process. Does nothing if it is already loaded,
+    e.g. inherited from a parent that preloaded it before forking. A missing model
+    is only downloaded when ``auto_download`` is set, since that needs network
+    access and makes startup slow.
+    """
+    global nlp
+    with _model_lock:
+        if nlp is not None:
+            return
+        try:
+            logger.info(f"Loading spaCy model: {SPACY_MODEL} (excluding {', '.join(SPACY_EXCLUDE)})")
+            nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+            logger.info(f"spaCy model loaded successfully with pipes: {', '.join(nlp.pipe_names)}")
+        except OSError:
+            if not auto_download:
+                logger.error(
+                    f"spaCy model '{SPACY_MODEL}' not found. Run: python -m spacy download {SPACY_MODEL} "
+                    f"(or set SPACY_AUTO_DOWNLOAD=true)"
+                )
+                raise
+            logger.warning(f"spaCy model '{SPACY_MODEL}' not found. Attempting to download...")
+            import subprocess
+            import sys
+            try:
+                subprocess.check_call([sys.executable, "-m", "spacy", "download", SPACY_MODEL])
+                nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+                logger.info("spaCy model downloaded and loaded successfully")
+            except Exception as e:
+                logger.error(f"Failed to download spaCy model: {str(e)}")
+                logger.error(f"Please run: python -m spacy download {SPACY_MODEL}")
+                raise
+        except Exception as e:
+            logger.error(f"Error loading spaCy model: {str(e)}")
+            raise
+
+
+def warm_up(auto_download: bool = False) -> bool:
+    """
+    Loads the spaCy model if this process has not tried yet and runs one
+    extraction. Returns whether spaCy is in use; on failure the fallback
+    extractor serves all requests and loading is not retried.
+    """
+    global _model_load_failed
+    if nlp is None and not _model_load_failed:
+        try:
+            load_spacy_model(auto_download)
+        except Exception as e:
+            _model_load_failed = True
+            logger.error(f"spaCy unavailable, using fallback keyword extraction: {str(e)}")
+    extract_keywords(WARMUP_TEXT)
+    return is_model_loaded()
+
+
+def load_taxonomy(path: Optional[str], check_interval: float = 5.0) -> Optional[SkillTaxonomy]:
+    global taxonomy
+    if not path:
+        taxonomy = None
+        return None
+    try:
+        taxonomy = SkillTaxonomy(path, check_interval)
+    except Exception as e:
+        logger.error(f"Failed to load skill taxonomy from {path}, continuing without it: {str(e)}")
+        taxonomy = None
+    return taxonomy
+
+
+def init_worker(
+    taxonomy_path: Optional[str] = None,
+    taxonomy_check_interval: float = 5.0,
+    auto_download: bool = False
+):
+    # Runs once in each CPU pool worker; spawned processes start without logging config
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if taxonomy_path:
+        load_taxonomy(taxonomy_path, taxonomy_check_interval)
+    warm_up(auto_download)
+
+
+def apply_taxonomy(text: str, keywords: List[str], max_keywords: int) -> List[str]:
+    """Puts taxonomy skills found in the text first and maps aliases among ``keywords`` to canonical names."""
+    if taxonomy is None:
+        return keywords
+    taxonomy.maybe_reload()
+    merged = taxonomy.find_skills(text)[:max_keywords]
+    seen = {skill.lower() for skill in merged}
+    for keyword in keywords:
+        if len(merged) >= max_keywords:
+            break
+        keyword = taxonomy.canonicalize(keyword) or keyword
+        if keyword.lower() not in seen:
+            merged.append(keyword)
+            seen.add(keyword.lower())
+    return merged
+
+
+def is_model_loaded() -> bool:
+    return nlp is not None
+
+
+def keywords_from_doc(doc: Doc, max_keywords: int = 10) -> List[str]:
+    keyword_scores = {}
+    seen = set()
+    
+    for chunk in doc.noun_chunks:
+        chunk_text = chunk.text.strip().lower()
+        if (len(chunk_text) >= 3 and 
+            chunk_text not in seen and
+            not any(char.isdigit() for char in chunk_text) and
+            len(chunk_text.split()) <= 4 and  
+            chunk_text not in COMMON_STOP_WORDS):
+            original_text = chunk.text.strip()
+            keyword_scores[original_text] = keyword_scores.get(original_text, 0) + 3
+            seen.add(chunk_text)
+    
+    # Single pass over the tokens: lexical flags and POS come from one array read,
+    # and tokens eligible for the top-up below are collected as we go
+    fill_candidates = []
+    for token, (is_stop, is_punct, is_space, like_num, pos) in zip(doc, doc.to_array(_TOKEN_ATTRS).tolist()):
+        token_text = token.text.strip()
+        if (len(token_text) < 2 or
+            is_stop or
+            is_punct or
+            like_num):
+            continue
+        token_lower = token_text.lower()
+        if token_lower in COMMON_STOP_WORDS:
+            continue
+        if pos in _FALLBACK_POS:
+            fill_candidates.append((token_text, token_lower))
+        if is_space or token_lower in seen:
+            continue
+        
+        if pos == PROPN:
+            keyword_scores[token_text] = keyword_scores.get(token_text, 0) + 5
+            seen.add(token_lower)
+        elif pos == NOUN:
+            keyword_scores[token_text] = keyword_scores.get(token_text, 0) + 3
+            seen.add(token_lower)
+        elif pos == ADJ and len(token_text) >= 3:
+            keyword_scores[token_text] = keyword_scores.get(token_text, 0) + 1
+            seen.add(token_lower)
+    
+    for ent in doc.ents:
+        ent_text = ent.text.strip()
+        ent_lower = ent.text.lower().strip()
+        if (len(ent_text) >= 2 and 
+            ent_lower not in seen and
+            ent.label_ in ['ORG', 'PRODUCT', 'TECHNOLOGY']):
+            keyword_scores[ent_text] = keyword_scores.get(ent_text, 0) + 4
+            seen.add(ent_lower)
+    
+    sorted_keywords = sorted(keyword_scores.items(), key=lambda x: x[1], reverse=True)
+    keywords = [kw for kw, score in sorted_keywords[:max_keywords]]
+    
+    for token_text, token_lower in fill_candidates:
+        if len(keywords) >= max_keywords:
+            break
+        if token_lower not in seen:
+            keywords.append(token_text)
+            seen.add(token_lower)
+    
+    return keywords[:max_keywords]
+
+
+def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
+    if nlp is None:
+        logger.warning("spaCy model not loaded, using fallback keyword extraction")
+        return apply_taxonomy(text, extract_keywords_fallback(text, max_keywords), max_keywords)
+    
+    try:
+        keywords = apply_taxonomy(text, keywords_from_doc(nlp(text), max_keywords), max_keywords)
+        logger.info(f"Extracted {len(keywords)} keywords dynamically from text")
+        return keywords
+        
+    except Exception as e:
+        logger.error(f"Error extracting keywords with spaCy: {str(e)}")
+        return apply_taxonomy(text, extract_keywords_fallback(text, max_keywords), max_keywords)
+
+
+def extract_keywords_batch(
+    texts: List[str],
+    max_keywords: int = 10,
+    batch_size: int = 32,
+    n_process: int = 1
+) -> List[List[str]]:
+    """Extracts keywords for many texts with one ``nlp.pipe`` run instead of a call per text."""
+    if nlp is None:
+        logger.warning("spaCy model not loaded, using fallback keyword extraction")
+        return [apply_taxonomy(text, extract_keywords_fallback(text, max_keywords), max_keywords) for text in texts]
+    
+    try:
+        results = [
+            apply_taxonomy(text, keywords_from_doc(doc, max_keywords), max_keywords)
+            for text, doc in zip(texts, nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
+        ]
+        logger.info(f"Extracted keywords for {len(texts)} texts in one batch")
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error extracting keywords with spaCy: {str(e)}")
+        return [apply_taxonomy(text, extract_keywords_fallback(text, max_keywords), max_keywords) for text in texts]
+
+
+def _add_fallback_keyword(keywords: List[str], seen: set, keyword: str) -> bool:
+    keyword_lower = keyword.lower()
+    if keyword_lower in seen:
+        return False
+    keywords.append(keyword)
+    seen.add(keyword_lower)
+    return True
+
+
+def extract_keywords_fallback(text: str, max_keywords: int = 10) -> List[str]:
+    # Capitalized words and phrases are scanned lazily and stop once enough keywords are found
+    keywords = []
+    seen = set()
+    
+    for match in _CAPITALIZED_PATTERN.finditer(text):
+        word = match.group()
+        if len(word) >= 2 and word.lower() not in COMMON_STOP_WORDS:
+            _add_fallback_keyword(keywords, seen, word)
+            if len(keywords) >= max_keywords:
+                return keywords
+    
+    # Tech names: the lexicon and the dotted / C++ / C# shapes are checked against the
+    # distinct tokens at once, then the hits are added in the order they first appear
+    tokens = list(dict.fromkeys(_TECH_TOKEN_PATTERN.findall(text)))
+    lowered = list(map(str.lower, tokens))
+    found = set(map(str.lower, filter(_TECH_SHAPE_PATTERN.fullmatch, tokens)))
+    found.update(TECH_TERMS.intersection(lowered))
+    for index in sorted(map(lowered.index, found)):
+        _add_fallback_keyword(keywords, seen, tokens[index])
+        if len(keywords) >= max_keywords:
+            return keywords
+    
+    for match in _PHRASE_PATTERN.finditer(text):
+        phrase = match.group()
+        if phrase.lower() not in COMMON_STOP_WORDS:
+            _add_fallback_keyword(keywords, seen, phrase)
+            if len(keywords) >= max_keywords:
+                return keywords
+    
+    return keywords
@@ -0,0 +1,209 @@
+import bisect
+import logging
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from skill_taxonomy import SkillTaxonomy
+
+logger = logging.getLogger(__name__)
+
+# Provenance rules, in the order they are tried when two resume keywords tie
+RULE_EXACT = "exact"
+RULE_TAXONOMY = "taxonomy"
+RULE_JOB_IN_RESUME = "job_in_resume"
+RULE_RESUME_IN_JOB = "resume_in_job"
+RULE_JOB_TOKEN = "job_token"
+RULE_RESUME_TOKEN = "resume_token"
+_RULE_ORDER = [RULE_JOB_IN_RESUME, RULE_RESUME_IN_JOB, RULE_JOB_TOKEN, RULE_RESUME_TOKEN]
+
+
+def normalize_keyword(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton reporting every occurrence of a set of patterns in one pass."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                child = self._goto[node].get(ch)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][ch] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = child
+            self._out[node].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yields ``(end_position, pattern_index)`` for every occurrence."""
+        node = 0
+        for position, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for index in self._out[node]:
+                yield position, index
+
+
+class KeywordMatcher:
+    """
+    Matches job keywords against a fixed resume vocabulary.
+
+    A job keyword matches when it equals a resume keyword (case-insensitive), when
+    either keyword is a substring of the other, or when the first token of either
+    appears among the tokens of the other. Each job keyword is credited to the
+    earliest resume keyword that satisfies any rule, as the original pairwise
+    loop did, but the work is done with precomputed normalized forms, token
+    indexes and Aho-Corasick scans, so it scales to vocabularies and skill lists
+    of thousands of entries.
+
+    With a ``taxonomy``, keywords that resolve to the same canonical skill match
+    ("JS" and "JavaScript"). A job keyword that is a known skill only matches
+    through the taxonomy, so "Java" no longer matches "JavaScript" by substring.
+    It still matches resume keywords that mention the skill as whole tokens:
+    "Python" matches "Python Developer" through the skills found in each resume
+    keyword with the taxonomy's alias trie.
+    """
+
+    def __init__(self, resume_keywords: Sequence[str], taxonomy: Optional[SkillTaxonomy] = None):
+        self.taxonomy = taxonomy
+        self._canonical_index: Dict[str, int] = {}
+        self._contained_canonical_index: Dict[str, int] = {}
+        self.resume_keywords: List[str] = []
+        self._norms: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._token_index: Dict[str, int] = {}
+        self._first_token_index: Dict[str, int] = {}
+        for keyword in resume_keywords:
+            norm = normalize_keyword(keyword)
+            if not norm or norm in self._exact:
+                continue
+            index = len(self._norms)
+            self.resume_keywords.append(keyword)
+            self._norms.append(norm)
+            self._exact[norm] = index
+            tokens = norm.split()
+            for token in tokens:
+                self._token_index.setdefault(token, index)
+            self._first_token_index.setdefault(tokens[0], index)
+            canonical = taxonomy.canonicalize(keyword) if taxonomy is not None else None
+            if canonical is not None:
+                self._canonical_index.setdefault(canonical, index)
+            if taxonomy is not None:
+                for skill in taxonomy.find_skills(keyword):
+                    self._contained_canonical_index.setdefault(skill, index)
+
+        self._automaton = AhoCorasick(self._norms)
+        self._corpus = "\n".join(self._norms)
+        self._starts: List[int] = []
+        offset = 0
+        for norm in self._norms:
+            self._starts.append(offset)
+            offset += len(norm) + 1
+
+    def _resume_keywords_containing(self, job_norms: List[str]) -> List[Optional[int]]:
+        # One pass over the whole resume vocabulary finds every job keyword inside any resume keyword
+        earliest: List[Optional[int]] = [None] * len(job_norms)
+        for end, job_index in AhoCorasick(job_norms).iter_matches(self._corpus):
+            resume_index = bisect.bisect_right(self._starts, end) - 1
+            current = earliest[job_index]
+            if current is None or resume_index < current:
+                earliest[job_index] = resume_index
+        return earliest
+
+    def _resume_keywords_within(self, job_norm: str) -> Optional[int]:
+        earliest = None
+        for _, resume_index in self._automaton.iter_matches(job_norm):
+            if earliest is None or resume_index < earliest:
+                earliest = resume_index
+        return earliest
+
+    def _best_match(self, job_norm: str, containing: Optional[int]) -> Optional[Tuple[int, str]]:
+        exact = self._exact.get(job_norm)
+        if exact is not None:
+            return exact, RULE_EXACT
+
+        if self.taxonomy is not None:
+            canonical = self.taxonomy.canonicalize(job_norm)
+            if canonical is not None:
+                best = None
+                index = self._contained_canonical_index.get(canonical)
+                if index is not None:
+                    best = (index, RULE_JOB_IN_RESUME)
+                index = self._canonical_index.get(canonical)
+                if index is not None and (best is None or index <= best[0]):
+                    best = (index, RULE_TAXONOMY)
+                return best
+
+        tokens = job_norm.split()
+        resume_token = None
+        for token in tokens:
+            index = self._first_token_index.get(token)
+            if index is not None and (resume_token is None or index < resume_token):
+                resume_token = index
+        candidates = {
+            RULE_JOB_IN_RESUME: containing,
+            RULE_RESUME_IN_JOB: self._resume_keywords_within(job_norm),
+            RULE_JOB_TOKEN: self._token_index.get(tokens[0]),
+            RULE_RESUME_TOKEN: resume_token,
+        }
+        best = None
+        for rule in _RULE_ORDER:
+            index = candidates[rule]
+            if index is not None and (best is None or index < best[0]):
+                best = (index, rule)
+        return best
+
+    def match(
+        self,
+        job_keywords: Sequence[str],
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], List[str], Dict[str, Dict[str, str]]]:
+        """
+        Returns ``(matched, missing, provenance)``. Both lists keep job keyword order
+        and are de-duplicated case-insensitively; ``provenance`` maps each matched
+        job keyword to the resume keyword and rule that matched it.
+        """
+        unique: List[Tuple[str, str]] = []
+        seen = set()
+        for keyword in job_keywords:
+            norm = normalize_keyword(keyword)
+            if norm and norm not in seen:
+                seen.add(norm)
+                unique.append((keyword, norm))
+
+        containing = self._resume_keywords_containing([norm for _, norm in unique]) if self._norms else []
+        matched: List[str] = []
+        missing: List[str] = []
+        provenance: Dict[str, Dict[str, str]] = {}
+        for position, (keyword, norm) in enumerate(unique):
+            best = self._best_match(norm, containing[position]) if self._norms else None
+            if best is None:
+                missing.append(keyword)
+            else:
+                matched.append(keyword)
+                provenance[keyword] = {"resume_keyword": self.resume_keywords[best[0]], "rule": best[1]}
+
+        if limit:
+            matched, missing = matched[:limit], missing[:limit]
+            provenance = {keyword: provenance[keyword] for keyword in matched}
+        return matched, missing, provenance
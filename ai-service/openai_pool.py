@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, RateLimitError
+
+from metrics import UPSTREAM_ERRORS, UPSTREAM_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# APITimeoutError is a subclass of APIConnectionError
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+
+class OpenAIPool:
+    """
+    Non-blocking OpenAI client shared by all requests on a worker.
+
+    Wraps ``AsyncOpenAI`` over a pooled ``httpx.AsyncClient``, caps the number of
+    upstream calls in flight with a semaphore and retries transient failures with
+    jittered exponential backoff (honouring ``Retry-After`` on rate limits).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = 32,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        max_connections: int = 64,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=timeout
+        )
+        # Retries are handled here so they also respect the concurrency limit
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0,
+            http_client=self._http_client
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def create_embeddings(self, **kwargs: Any) -> Any:
+        return await self._call("embeddings", self.client.embeddings.create, **kwargs)
+
+    async def create_chat_completion(self, **kwargs: Any) -> Any:
+        return await self._call("chat.completions", self.client.chat.completions.create, **kwargs)
+
+    async def stream_chat_completion(self, **kwargs: Any) -> AsyncIterator[str]:
+        """Yields content deltas of a streamed completion. Retries cover opening the stream only."""
+        stream = await self._call("chat.completions", self.client.chat.completions.create, stream=True, **kwargs)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _call(self, operation: str, fn: Callable[..., Awaitable[Any]], **kwargs: Any) -> Any:
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                self.in_flight += 1
+                start = time.perf_counter()
+                try:
+                    return await fn(**kwargs)
+                except RETRYABLE_ERRORS as e:
+                    error = e
+                    UPSTREAM_ERRORS.inc(upstream="openai", operation=operation, error=type(e).__name__)
+                except Exception as e:
+                    self.failures += 1
+                    UPSTREAM_ERRORS.inc(upstream="openai", operation=operation, error=type(e).__name__)
+                    raise
+                finally:
+                    self.in_flight -= 1
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - start, upstream="openai", operation=operation)
+
+            if attempt >= self.max_retries:
+                self.failures += 1
+                raise error
+
+            delay = self._backoff_delay(attempt, error)
+            attempt += 1
+            self.retries += 1
+            logger.warning(
+                f"OpenAI {operation} call failed ({type(error).__name__}), "
+                f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        value = response.headers.get("retry-after")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+    async def aclose(self) -> None:
+        await self.client.close()
@@ -0,0 +1,85 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable[..., Any], depends_on: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.depends_on = list(depends_on)
+
+
+class StagePipeline:
+    """
+    Runs a DAG of async stages, starting each one as soon as its dependencies finish.
+
+    A stage function receives the results of its dependencies as keyword arguments
+    named after those stages and may be sync or async. Wall-clock time spent in each
+    stage (excluding time waiting on dependencies) is recorded in ``timings``.
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], depends_on: Sequence[str] = ()) -> "StagePipeline":
+        if name in self.stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        self.stages[name] = Stage(name, fn, depends_on)
+        return self
+
+    def _execution_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle detected in pipeline at stage: {name}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline stage dependency: {name}")
+            state[name] = 1
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def _run_stage(self, stage: Stage, tasks: Dict[str, asyncio.Task]) -> Any:
+        dep_results = {dep: await tasks[dep] for dep in stage.depends_on}
+        start = time.perf_counter()
+        try:
+            result = stage.fn(**dep_results)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            self.timings[stage.name] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def run(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        for name in self._execution_order():
+            tasks[name] = asyncio.ensure_future(self._run_stage(self.stages[name], tasks))
+
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        self.timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"{self.name} stage timings (ms): {self.timings}")
+        return dict(zip(tasks.keys(), results))
@@ -1,20 +1,35 @@
 
+import asyncio
+import functools
+import hashlib
 import logging
-import io
 import os
 import json
-from typing import Annotated, List, Set, Tuple
-from fastapi import FastAPI, File, Form, UploadFile, HTTPException
+import time
+from typing import Annotated, AsyncIterator, Dict, List, Literal, Optional, Set, Tuple
+from fastapi import FastAPI, File, Form, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sklearn.metrics.pairwise import cosine_similarity
-import pdfplumber
-from docx import Document
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import numpy as np
-import spacy
 from collections import Counter
-import re
 from dotenv import load_dotenv
-from openai import OpenAI
+
+import settings
+import vectors
+import keyword_extraction
+import metrics
+import chunking
+from admission import AdmissionMiddleware, RateLimiter, RouteLimiter, parse_limits
+from caching import EmbeddingCache, JobArtifactStore, LLMResponseCache, LRUCache, ParsedResumeCache, content_key
+from cpu_pool import CPUPool, CPUPoolSaturated, CPUTaskTimeout
+from embedding_providers import EmbeddingProvider, build_providers
+from job_queue import CallbackNotAllowed, JobFailed, JobQueue, JobQueueFull, JobRetry
+from openai_pool import OpenAIPool
+from keyword_extraction import extract_keywords, extract_keywords_batch
+from keyword_matcher import KeywordMatcher
+from pipeline import StagePipeline
+from text_extraction import TextExtractionError, extract_text_from_docx, extract_text_from_pdf
+from vector_index import VectorIndex
 
 load_dotenv()
 
@@ -30,6 +45,24 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Built here rather than in startup: Starlette assembles the middleware stack before startup runs
+admission_limiters = {
+    path: RouteLimiter(path, max_in_flight, max_queued, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+    for path, (max_in_flight, max_queued) in parse_limits(settings.ADMISSION_LIMITS).items()
+}
+rate_limiter = (
+    RateLimiter(settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_BURST, settings.RATE_LIMIT_MAX_CLIENTS)
+    if settings.RATE_LIMIT_PER_MINUTE > 0 else None
+)
+# Added first, so it runs inside CORS (rejections still carry CORS headers) and inside the
+# metrics middleware (request latency includes time spent queued here)
+app.add_middleware(
+    AdmissionMiddleware,
+    limiters=admission_limiters,
+    rate_limiter=rate_limiter,
+    key_header=settings.RATE_LIMIT_KEY_HEADER,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  
@@ -38,261 +71,399 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+HTTP_REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    "resume_match_http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+HTTP_IN_FLIGHT = metrics.REGISTRY.gauge(
+    "resume_match_http_requests_in_flight", "HTTP requests currently being handled"
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    timings = metrics.begin_request_timings()
+    HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        HTTP_IN_FLIGHT.dec()
+        # Route templates keep IDs in paths from creating a series per item
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            elapsed, method=request.method, route=getattr(route, "path", "unmatched"), status=str(status)
+        )
+    if settings.SERVER_TIMING_ENABLED:
+        # Streamed responses only include the stages that ran before the first byte
+        response.headers["Server-Timing"] = metrics.server_timing_header(timings, elapsed * 1000)
+    return response
+
 
 openai_client = None
-nlp = None
-
-
-# Common stop words to filter out (expanded list)
-COMMON_STOP_WORDS = {
-    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-    'by', 'from', 'as', 'is', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-    'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might', 'must',
-    'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
-    'my', 'your', 'his', 'her', 'its', 'our', 'their', 'me', 'him', 'us', 'them',
-    'what', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how', 'all', 'each',
-    'every', 'both', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
-    'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will', 'just',
-    'don', 'should', 'now', 'd', 'll', 'm', 'o', 're', 've', 'y', 'ain', 'aren', 'couldn',
-    'didn', 'doesn', 'hadn', 'hasn', 'haven', 'isn', 'ma', 'mightn', 'mustn', 'needn',
-    'shan', 'shouldn', 'wasn', 'weren', 'won', 'wouldn'
-}
+nlp_ready = False
+# Set once models are loaded and warmed up; cleared again when shutdown starts
+ready = False
+warmup_task: Optional[asyncio.Task] = None
+warmup_seconds: Optional[float] = None
+warmup_error: Optional[str] = None
+embedding_cache = None
+embedding_providers: List[EmbeddingProvider] = []
+token_counter: Optional[chunking.TokenCounter] = None
+cpu_pool = None
+spacy_n_process = 1
+parsed_resume_cache = None
+llm_cache = None
+job_queue = None
+vector_indexes = {}
+job_artifacts: Optional[JobArtifactStore] = None
+job_keyword_cache: Optional[LRUCache] = None
+
+
+def preload_models():
+    # Import time, before any fork: gunicorn --preload workers and fork-started CPU
+    # pool workers inherit the loaded model instead of loading their own copy
+    if settings.PRELOAD_MODELS:
+        keyword_extraction.warm_up(settings.SPACY_AUTO_DOWNLOAD)
+
+
+preload_models()
 
 
 def init_openai_client():
     global openai_client
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        logger.error("OPENAI_API_KEY not found in environment variables. Please set it in .env file.")
-        raise ValueError("OPENAI_API_KEY is required. Please set it in your .env file.")
+        if settings.EMBEDDING_PROVIDERS == ["openai"]:
+            logger.error("OPENAI_API_KEY not found in environment variables. Please set it in .env file.")
+            raise ValueError("OPENAI_API_KEY is required. Please set it in your .env file.")
+        logger.warning(
+            "OPENAI_API_KEY not set; using local embedding providers and skipping LLM suggestions and summaries"
+        )
+        return
     
     try:
-        openai_client = OpenAI(api_key=api_key)
+        openai_client = OpenAIPool(
+            api_key=api_key,
+            max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            backoff_base=settings.OPENAI_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.OPENAI_BACKOFF_MAX_SECONDS,
+            max_connections=settings.OPENAI_MAX_CONNECTIONS
+        )
         logger.info("OpenAI client initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize OpenAI client: {str(e)}")
         raise
 
 
-def load_spacy_model():
+def init_embedding_cache():
+    global embedding_cache
+    embedding_cache = EmbeddingCache(
+        max_memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+        db_path=settings.EMBEDDING_CACHE_PATH,
+        max_disk_items=settings.EMBEDDING_CACHE_DISK_ITEMS,
+        dtype=settings.EMBEDDING_CACHE_DTYPE
+    )
+
+
+def init_parsed_resume_cache():
+    global parsed_resume_cache
+    parsed_resume_cache = ParsedResumeCache(
+        max_items=settings.PARSED_RESUME_CACHE_ITEMS,
+        db_path=settings.PARSED_RESUME_CACHE_PATH,
+        max_disk_items=settings.PARSED_RESUME_CACHE_DISK_ITEMS
+    )
+
+
+def init_llm_cache():
+    global llm_cache
+    llm_cache = LLMResponseCache(
+        max_items=settings.LLM_CACHE_ITEMS,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        db_path=settings.LLM_CACHE_PATH,
+        max_disk_items=settings.LLM_CACHE_DISK_ITEMS
+    )
+
+
+def init_embedding_providers():
+    global embedding_providers
+    embedding_providers = build_providers(
+        settings.EMBEDDING_PROVIDERS,
+        get_openai_client=lambda: openai_client,
+        openai_model=settings.EMBEDDING_MODEL,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        batch_window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+        hashing_dim=settings.HASHING_EMBEDDING_DIM,
+        spacy_model=settings.SPACY_VECTORS_MODEL,
+        runner=run_in_cpu_pool
+    )
+    logger.info(f"Embedding providers (in fallback order): {', '.join(p.name for p in embedding_providers)}")
+
+
+def init_chunking():
+    global token_counter
+    if settings.SIMILARITY_POOLING not in chunking.POOLING_MODES:
+        raise ValueError(
+            f"SIMILARITY_POOLING must be one of {', '.join(chunking.POOLING_MODES)}, got {settings.SIMILARITY_POOLING}"
+        )
+    # Built at startup so a tiktoken encoding download never lands on a request
+    token_counter = chunking.TokenCounter(settings.EMBEDDING_MODEL)
+    logger.info(
+        f"Embedding inputs chunked at {settings.CHUNK_MAX_TOKENS} tokens with {settings.SIMILARITY_POOLING} pooling "
+        f"({'tiktoken' if token_counter.exact else 'estimated'} token counts)"
+    )
+
+
+def init_skill_taxonomy():
+    # Loaded in this process for keyword matching; process pool workers load their own copy
+    taxonomy = keyword_extraction.load_taxonomy(
+        settings.SKILL_TAXONOMY_PATH, settings.SKILL_TAXONOMY_CHECK_SECONDS
+    )
+    if taxonomy is None:
+        logger.info("Skill taxonomy disabled")
+
 
-    global nlp
+def taxonomy_version() -> Optional[str]:
+    taxonomy = keyword_extraction.taxonomy
+    if taxonomy is None:
+        return None
+    taxonomy.maybe_reload()
+    return taxonomy.version
+
+
+def init_cpu_pool():
+    global cpu_pool, spacy_n_process
+    spacy_n_process = max(1, settings.SPACY_N_PROCESS)
+    if settings.CPU_POOL_MODE == "thread":
+        # Threads share this process's spaCy model and taxonomy; warm_up_models loads the model once
+        initializer = None
+    else:
+        if spacy_n_process > 1:
+            # Process pool workers are daemonic and cannot start nlp.pipe's own worker processes
+            logger.warning(
+                f"SPACY_N_PROCESS={settings.SPACY_N_PROCESS} needs CPU_POOL_MODE=thread, using 1 "
+                f"(batches already run in parallel across the {settings.CPU_POOL_MODE} pool)"
+            )
+            spacy_n_process = 1
+        initializer = functools.partial(
+            keyword_extraction.init_worker,
+            keyword_extraction.taxonomy.path if keyword_extraction.taxonomy is not None else None,
+            settings.SKILL_TAXONOMY_CHECK_SECONDS,
+            settings.SPACY_AUTO_DOWNLOAD
+        )
+    cpu_pool = CPUPool(
+        max_workers=settings.CPU_POOL_WORKERS,
+        max_pending=settings.CPU_POOL_MAX_PENDING,
+        task_timeout=settings.CPU_TASK_TIMEOUT_SECONDS,
+        mode=settings.CPU_POOL_MODE,
+        start_method=settings.CPU_POOL_START_METHOD,
+        initializer=initializer
+    )
+    logger.info(f"CPU pool started in {settings.CPU_POOL_MODE} mode with {cpu_pool.max_workers} workers")
+
+
+async def warm_up_models():
+    """
+    Starts every CPU pool worker, which loads spaCy and runs one extraction, then
+    makes one embedding call so the first request finds the provider connection
+    open and any local vector model loaded. Marks the service ready when done;
+    failures are logged and the service serves without the warm-up.
+    """
+    global nlp_ready, ready, warmup_seconds, warmup_error
+    start = time.perf_counter()
     try:
-        logger.info("Loading spaCy model: en_core_web_sm")
-        nlp = spacy.load("en_core_web_sm")
-        logger.info("spaCy model loaded successfully")
-    except OSError:
-        logger.warning("spaCy model 'en_core_web_sm' not found. Attempting to download...")
-        import subprocess
-        import sys
+        # One task per worker so the pool starts all of its processes now instead of on first use
+        loaded = await asyncio.gather(*(
+            cpu_pool.run(
+                keyword_extraction.warm_up, settings.SPACY_AUTO_DOWNLOAD, timeout=settings.MODEL_LOAD_TIMEOUT_SECONDS
+            )
+            for _ in range(cpu_pool.max_workers)
+        ))
+        nlp_ready = all(loaded)
+    except Exception as e:
+        warmup_error = f"CPU pool warm-up failed: {str(e)}"
+        logger.error(warmup_error)
+
+    if settings.WARMUP_EMBEDDINGS and embedding_providers:
         try:
-            subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-            nlp = spacy.load("en_core_web_sm")
-            logger.info("spaCy model downloaded and loaded successfully")
+            await get_embeddings([keyword_extraction.WARMUP_TEXT])
         except Exception as e:
-            logger.error(f"Failed to download spaCy model: {str(e)}")
-            logger.error("Please run: python -m spacy download en_core_web_sm")
-            raise
+            warmup_error = f"Embedding warm-up failed: {str(e)}"
+            logger.error(warmup_error)
+
+    warmup_seconds = time.perf_counter() - start
+    ready = True
+    logger.info(f"Warm-up finished in {warmup_seconds:.2f}s (spaCy loaded: {nlp_ready}); service is ready")
+
+
+async def init_job_queue():
+    global job_queue
+    if settings.JOB_QUEUE_WORKERS <= 0:
+        logger.info("Job queue disabled")
+        return
+    job_queue = JobQueue(
+        settings.JOB_QUEUE_PATH,
+        workers=settings.JOB_QUEUE_WORKERS,
+        max_queued=settings.JOB_QUEUE_MAX_QUEUED,
+        retention_seconds=settings.JOB_RESULT_TTL_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        retry_delay=settings.JOB_RETRY_DELAY_SECONDS,
+        lease_seconds=settings.JOB_LEASE_SECONDS,
+        poll_interval=settings.JOB_POLL_SECONDS,
+        webhook_timeout=settings.JOB_WEBHOOK_TIMEOUT_SECONDS,
+        webhook_allowed_hosts=settings.JOB_WEBHOOK_ALLOWED_HOSTS,
+        webhook_allow_private=settings.JOB_WEBHOOK_ALLOW_PRIVATE
+    )
+    job_queue.register("analyze", run_analysis_job)
+    await job_queue.start()
+
+
+def init_vector_indexes():
+    for kind in ("resumes", "jobs"):
+        vector_indexes[kind] = VectorIndex(
+            settings.VECTOR_INDEX_DIR,
+            kind,
+            ivf_lists=settings.VECTOR_INDEX_IVF_LISTS,
+            ivf_probes=settings.VECTOR_INDEX_IVF_PROBES,
+            ivf_min_rows=settings.VECTOR_INDEX_IVF_MIN_ROWS
+        )
+        logger.info(f"Vector index '{kind}' loaded with {len(vector_indexes[kind])} items")
+
+
+def init_job_store():
+    global job_artifacts, job_keyword_cache
+    job_keyword_cache = LRUCache(settings.JOB_KEYWORD_CACHE_ITEMS)
+    if not settings.JOB_ARTIFACT_STORE_PATH:
+        return
+    try:
+        # Not a cache: every indexed job keeps its text and artifacts until it is removed
+        job_artifacts = JobArtifactStore(settings.JOB_ARTIFACT_STORE_PATH)
+        logger.info(f"Job artifact store loaded with {len(job_artifacts.kv)} jobs")
     except Exception as e:
-        logger.error(f"Error loading spaCy model: {str(e)}")
-        raise
+        logger.error(f"Failed to open job artifact store, match requests cannot use job IDs: {str(e)}")
 
 
 @app.on_event("startup")
 async def startup_event():
+    global warmup_task
     init_openai_client()
-    load_spacy_model()
+    init_embedding_cache()
+    init_parsed_resume_cache()
+    init_llm_cache()
+    init_embedding_providers()
+    init_chunking()
+    init_vector_indexes()
+    init_job_store()
+    init_skill_taxonomy()
+    init_cpu_pool()
+    await init_job_queue()
+    # Model loading runs in the background so the server starts accepting
+    # connections (and answering /health/live) immediately
+    warmup_task = asyncio.create_task(warm_up_models())
 
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    try:
-        text = ""
-        with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text.strip()
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF: {str(e)}")
-        raise HTTPException(
-            status_code=400,
-            detail=f"Failed to extract text from PDF: {str(e)}"
-        )
+@app.on_event("shutdown")
+async def shutdown_event():
+    global ready
+    ready = False
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    if job_queue is not None:
+        await job_queue.stop()
+    if openai_client is not None:
+        await openai_client.aclose()
+    if embedding_cache is not None:
+        embedding_cache.close()
+    if parsed_resume_cache is not None:
+        parsed_resume_cache.close()
+    if llm_cache is not None:
+        llm_cache.close()
+    if job_artifacts is not None:
+        job_artifacts.close()
+    if cpu_pool is not None:
+        cpu_pool.shutdown()
 
 
-def extract_text_from_docx(file_content: bytes) -> str:
+async def run_in_cpu_pool(fn, *args):
     try:
-        doc = Document(io.BytesIO(file_content))
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
-    except Exception as e:
-        logger.error(f"Error extracting text from DOCX: {str(e)}")
+        return await cpu_pool.run(fn, *args)
+    except CPUPoolSaturated as e:
+        logger.warning(str(e))
         raise HTTPException(
-            status_code=400,
-            detail=f"Failed to extract text from DOCX: {str(e)}"
+            status_code=503,
+            detail="Service is busy processing other documents. Please retry shortly."
+        )
+    except CPUTaskTimeout as e:
+        raise HTTPException(
+            status_code=504,
+            detail=f"Processing timed out: {str(e)}"
         )
 
 
-def extract_text_from_resume(file: UploadFile, file_content: bytes) -> str:
-    content_type = file.content_type
-    filename = file.filename.lower() if file.filename else ""
+async def extract_text_from_resume(filename: Optional[str], content_type: Optional[str], file_content: bytes) -> str:
+    filename = filename.lower() if filename else ""
     logger.info(f"Processing resume file: {filename}, content_type: {content_type}")
     
     if content_type == "application/pdf" or filename.endswith(".pdf"):
-        return extract_text_from_pdf(file_content)
+        extractor = extract_text_from_pdf
     elif content_type in [
         "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         "application/msword"
     ] or filename.endswith((".docx", ".doc")):
-        return extract_text_from_docx(file_content)
+        extractor = extract_text_from_docx
     else:
         raise HTTPException(
             status_code=400,
             detail="Unsupported file type. Please upload a PDF or DOCX file."
         )
 
+    try:
+        with metrics.stage("parse"):
+            return await run_in_cpu_pool(
+                extractor, file_content, settings.RESUME_MAX_PAGES or None, settings.RESUME_MAX_CHARS or None
+            )
+    except TextExtractionError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
 
-def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
-    if nlp is None:
-        logger.warning("spaCy model not loaded, using fallback keyword extraction")
-        return extract_keywords_fallback(text, max_keywords)
-    
+
+def is_json_content(content: Optional[str]) -> bool:
+    """Whether a completion parses with ``parse_json_content``; only those are cached."""
     try:
-        doc = nlp(text)
-        keyword_scores = {}
-        seen = set()
-        
-        for chunk in doc.noun_chunks:
-            chunk_text = chunk.text.strip().lower()
-            if (len(chunk_text) >= 3 and 
-                chunk_text not in seen and
-                not any(char.isdigit() for char in chunk_text) and
-                len(chunk_text.split()) <= 4 and  
-                chunk_text not in COMMON_STOP_WORDS):
-                original_text = chunk.text.strip()
-                keyword_scores[original_text] = keyword_scores.get(original_text, 0) + 3
-                seen.add(chunk_text)
-        
-        for token in doc:
-            token_text = token.text.strip()
-            token_lower = token.text.lower().strip()
-            
-            if (token_lower in seen or 
-                len(token_text) < 2 or
-                token.is_stop or 
-                token.is_punct or
-                token.is_space or
-                token.like_num or
-                token_lower in COMMON_STOP_WORDS):
-                continue
-            
-            if token.pos_ == 'PROPN':
-                keyword_scores[token_text] = keyword_scores.get(token_text, 0) + 5
-                seen.add(token_lower)
-            elif token.pos_ == 'NOUN':
-                keyword_scores[token_text] = keyword_scores.get(token_text, 0) + 3
-                seen.add(token_lower)
-            elif token.pos_ == 'ADJ' and len(token_text) >= 3:
-                keyword_scores[token_text] = keyword_scores.get(token_text, 0) + 1
-                seen.add(token_lower)
-        
-        for ent in doc.ents:
-            ent_text = ent.text.strip()
-            ent_lower = ent.text.lower().strip()
-            if (len(ent_text) >= 2 and 
-                ent_lower not in seen and
-                ent.label_ in ['ORG', 'PRODUCT', 'TECHNOLOGY']):
-                keyword_scores[ent_text] = keyword_scores.get(ent_text, 0) + 4
-                seen.add(ent_lower)
-        
-        sorted_keywords = sorted(keyword_scores.items(), key=lambda x: x[1], reverse=True)
-        keywords = [kw for kw, score in sorted_keywords[:max_keywords]]
-        
-        if len(keywords) < max_keywords:
-            for token in doc:
-                if len(keywords) >= max_keywords:
-                    break
-                token_text = token.text.strip()
-                token_lower = token.text.lower().strip()
-                if (token_lower not in seen and
-                    len(token_text) >= 2 and
-                    not token.is_stop and
-                    not token.is_punct and
-                    not token.like_num and
-                    token_lower not in COMMON_STOP_WORDS and
-                    token.pos_ in ['NOUN', 'PROPN', 'VERB']):
-                    keywords.append(token_text)
-                    seen.add(token_lower)
-        
-        logger.info(f"Extracted {len(keywords)} keywords dynamically from text")
-        return keywords[:max_keywords]
-        
-    except Exception as e:
-        logger.error(f"Error extracting keywords with spaCy: {str(e)}")
-        return extract_keywords_fallback(text, max_keywords)
+        parse_json_content(content)
+    except (AttributeError, IndexError, ValueError):
+        return False
+    return True
 
 
-def extract_keywords_fallback(text: str, max_keywords: int = 10) -> List[str]:
-    keywords = []
-    seen = set()
-    capitalized_pattern = r'\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b'
-    capitalized_words = re.findall(capitalized_pattern, text)
-    
-    for word in capitalized_words:
-        word_lower = word.lower()
-        if (word_lower not in seen and 
-            len(word) >= 2 and 
-            word_lower not in COMMON_STOP_WORDS):
-            keywords.append(word)
-            seen.add(word_lower)
-            if len(keywords) >= max_keywords:
-                break
-    
-    tech_patterns = [
-        r'\b[A-Za-z]+\.(?:js|py|java|ts|jsx|tsx|net|core)\b',  
-        r'\b[A-Za-z]+\+{1,2}\b',  
-        r'\b[A-Z][a-z]+(?:\.[A-Z][a-z]+)+\b',  
-    ]
-    
-    for pattern in tech_patterns:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            match_lower = match.lower()
-            if match_lower not in seen:
-                keywords.append(match)
-                seen.add(match_lower)
-                if len(keywords) >= max_keywords:
-                    break
-        if len(keywords) >= max_keywords:
-            break
-    
-    phrase_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2}\b'
-    phrases = re.findall(phrase_pattern, text)
-    
-    for phrase in phrases:
-        phrase_lower = phrase.lower()
-        if (phrase_lower not in seen and
-            len(phrase.split()) >= 2 and
-            phrase_lower not in COMMON_STOP_WORDS):
-            keywords.append(phrase)
-            seen.add(phrase_lower)
-            if len(keywords) >= max_keywords:
-                break
+async def chat_completion_content(**request) -> str:
+    """
+    Message content of a chat completion, served from the response cache when the request repeats.
+    Every caller parses the content as JSON, so content that does not parse is returned but not cached.
+    """
+    async def create() -> str:
+        with metrics.stage("completion"):
+            response = await openai_client.create_chat_completion(**request)
+        return response.choices[0].message.content
     
-    return keywords[:max_keywords]
+    return await llm_cache.get_or_create(request, create, cacheable=is_json_content)
 
 
-async def generate_resume_suggestions(job_description: str, resume_text: str, missing_keywords: List[str], similarity_score: float) -> dict:
-    if openai_client is None:
-        return {
-            "suggestions": ["OpenAI service not available"],
-            "actionable_items": [],
-            "score_impact": "N/A"
-        }
-    
-    try:
-        prompt = f"""Analyze the following resume and job description. The current match score is {similarity_score}%.
+SUGGESTIONS_UNAVAILABLE = {
+    "suggestions": ["OpenAI service not available"],
+    "actionable_items": [],
+    "score_impact": "N/A"
+}
+
+
+def build_suggestions_request(job_description: str, resume_text: str, missing_keywords: List[str], similarity_score: float) -> dict:
+    prompt = f"""Analyze the following resume and job description. The current match score is {similarity_score}%.
 
 Job Description:
 {job_description[:2000]}
@@ -320,228 +491,930 @@ Format your response as JSON with this structure:
 
 Be specific and actionable. Focus on what can actually be added to the resume."""
 
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional resume optimization expert. Provide specific, actionable advice."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        
-        content = response.choices[0].message.content.strip()
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-        
-        return json.loads(content)
-        
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing OpenAI suggestions response: {str(e)}")
-        logger.error(f"Response content: {content if 'content' in locals() else 'N/A'}")
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You are a professional resume optimization expert. Provide specific, actionable advice."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1000
+    }
+
+
+def parse_json_content(content: str) -> dict:
+    content = content.strip()
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+    
+    return json.loads(content)
+
+
+def fallback_suggestions(missing_keywords: List[str], error: Exception, content: Optional[str] = None) -> dict:
+    if isinstance(error, json.JSONDecodeError):
+        logger.error(f"Error parsing OpenAI suggestions response: {str(error)}")
+        logger.error(f"Response content: {content if content is not None else 'N/A'}")
         # Fallback: return missing keywords as suggestions
-        return {
-            "suggestions": [f"Add the following keywords: {', '.join(missing_keywords[:5])}"],
-            "actionable_items": missing_keywords[:5],
-            "missing_skills": missing_keywords[:5],
-            "keywords_to_add": missing_keywords[:5],
-            "score_impact": "Expected +5-10%",
-            "priority_recommendations": missing_keywords[:3]
-        }
-    except Exception as e:
-        logger.error(f"Error generating resume suggestions: {str(e)}")
+        first_suggestion = f"Add the following keywords: {', '.join(missing_keywords[:5])}"
+    else:
+        logger.error(f"Error generating resume suggestions: {str(error)}")
         # Fallback: return basic suggestions based on missing keywords
-        return {
-            "suggestions": [f"Add missing keywords: {', '.join(missing_keywords[:5])}"],
-            "actionable_items": missing_keywords[:5],
-            "missing_skills": missing_keywords[:5],
-            "keywords_to_add": missing_keywords[:5],
-            "score_impact": "Expected +5-10%",
-            "priority_recommendations": missing_keywords[:3]
-        }
+        first_suggestion = f"Add missing keywords: {', '.join(missing_keywords[:5])}"
+    return {
+        "suggestions": [first_suggestion],
+        "actionable_items": missing_keywords[:5],
+        "missing_skills": missing_keywords[:5],
+        "keywords_to_add": missing_keywords[:5],
+        "score_impact": "Expected +5-10%",
+        "priority_recommendations": missing_keywords[:3]
+    }
+
+
+async def generate_resume_suggestions(job_description: str, resume_text: str, missing_keywords: List[str], similarity_score: float) -> dict:
+    if openai_client is None:
+        return dict(SUGGESTIONS_UNAVAILABLE)
+    
+    content = None
+    try:
+        content = await chat_completion_content(
+            **build_suggestions_request(job_description, resume_text, missing_keywords, similarity_score)
+        )
+        return parse_json_content(content)
+    except Exception as e:
+        return fallback_suggestions(missing_keywords, e, content)
+
+
+async def stream_resume_suggestions(
+    job_description: str,
+    resume_text: str,
+    missing_keywords: List[str],
+    similarity_score: float
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Yields ``("suggestions_delta", {"content": ...})`` events as completion tokens
+    arrive, then one ``("suggestions", {...})`` event with the parsed result.
+    """
+    if openai_client is None:
+        yield "suggestions", dict(SUGGESTIONS_UNAVAILABLE)
+        return
+    
+    request = build_suggestions_request(job_description, resume_text, missing_keywords, similarity_score)
+
+    async def stream() -> AsyncIterator[str]:
+        # Drained by the cache's own task, so this times the upstream call, not the client reading deltas
+        with metrics.stage("completion"):
+            async for delta in openai_client.stream_chat_completion(**request):
+                yield delta
+
+    content = None
+    try:
+        # Identical requests streamed at the same time share the upstream call; the
+        # ones that join it get the whole completion as a single delta
+        parts = []
+        async for delta in llm_cache.get_or_stream(request, stream, cacheable=is_json_content):
+            parts.append(delta)
+            yield "suggestions_delta", {"content": delta}
+        content = "".join(parts)
+        suggestions = parse_json_content(content)
+    except Exception as e:
+        suggestions = fallback_suggestions(missing_keywords, e, content)
+    yield "suggestions", suggestions
 
 
 def find_matched_and_missing_keywords(
     resume_keywords: List[str], 
     job_keywords: List[str]
-) -> Tuple[List[str], List[str]]:
-    resume_keywords_lower = {kw.lower() for kw in resume_keywords}
-    job_keywords_lower = {kw.lower() for kw in job_keywords}
+) -> Tuple[List[str], List[str], Dict[str, Dict[str, str]]]:
+    with metrics.stage("keyword_match"):
+        matched, missing, provenance = KeywordMatcher(resume_keywords, keyword_extraction.taxonomy).match(
+            job_keywords, limit=settings.KEYWORD_MATCH_LIMIT
+        )
     
-    matched = []
-    for job_kw in job_keywords:
-        job_kw_lower = job_kw.lower()
-        if job_kw_lower in resume_keywords_lower:
-            matched.append(job_kw)
-        else:
-            for resume_kw in resume_keywords:
-                resume_kw_lower = resume_kw.lower()
-                if (job_kw_lower in resume_kw_lower or 
-                    resume_kw_lower in job_kw_lower or
-                    job_kw_lower.split()[0] in resume_kw_lower.split() or
-                    resume_kw_lower.split()[0] in job_kw_lower.split()):
-                    matched.append(job_kw)
-                    break
+    logger.info(f"Found {len(matched)} matched keywords and {len(missing)} missing keywords")
     
-    matched_lower = {kw.lower() for kw in matched}
-    missing = [
-        kw for kw in job_keywords 
-        if kw.lower() not in matched_lower
-    ]
+    return matched, missing, provenance
+
+
+async def embed_with_provider(provider: EmbeddingProvider, texts: List[str]) -> np.ndarray:
+    model = provider.name
+    if embedding_cache is not None:
+        embeddings = await embedding_cache.get_many(texts, model)
+    else:
+        embeddings = [None] * len(texts)
+
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        computed = vectors.normalize(await provider.embed(missing_texts))
+        for i, embedding in zip(missing, computed):
+            embeddings[i] = embedding
+        if embedding_cache is not None:
+            await embedding_cache.set_many(missing_texts, computed, model)
+
+    return np.stack(embeddings)
+
+
+async def get_embeddings(texts: List[str]) -> Tuple[np.ndarray, EmbeddingProvider]:
+    """Returns a float32 matrix of L2-normalized embeddings, one row per text."""
+    # All texts of one call are embedded by the same provider so their vectors are comparable
+    last_error = None
+    for provider in embedding_providers:
+        if not provider.available():
+            continue
+        try:
+            with metrics.stage("embedding"):
+                return await embed_with_provider(provider, texts), provider
+        except Exception as e:
+            provider.failures += 1
+            last_error = e
+            logger.warning(f"Embedding provider {provider.name} failed, trying the next one: {str(e)}")
+    raise HTTPException(
+        status_code=503,
+        detail="No embedding provider is available" + (f": {str(last_error)}" if last_error else "")
+    )
+
+
+def chunk_document(text: str) -> List[chunking.Chunk]:
+    max_tokens = settings.EMBEDDING_MAX_TOKENS
+    if settings.CHUNK_MAX_TOKENS > 0:
+        return chunking.chunk_text(text, token_counter, min(settings.CHUNK_MAX_TOKENS, max_tokens))
+    text = token_counter.truncate(text, max_tokens)
+    return [chunking.Chunk(text, token_counter.count(text))]
+
+
+async def embed_chunked(texts: List[str]) -> Tuple[List[List[chunking.Chunk]], List[np.ndarray], EmbeddingProvider]:
+    """
+    Chunks every text and embeds all chunks in one call. Chunks go through the
+    embedding cache individually, so an edited document only re-embeds the
+    chunks whose text changed. Returns the chunks and a vector matrix per text.
+    """
+    with metrics.stage("chunking"):
+        chunked = [chunk_document(text) for text in texts]
+    matrix, provider = await get_embeddings([chunk.text for chunks in chunked for chunk in chunks])
+    groups = []
+    start = 0
+    for chunks in chunked:
+        groups.append(matrix[start:start + len(chunks)])
+        start += len(chunks)
+    return chunked, groups, provider
+
+
+async def embed_documents(texts: List[str]) -> Tuple[np.ndarray, EmbeddingProvider]:
+    """One normalized vector per document: the token-weighted mean of its chunk vectors."""
+    chunked, groups, provider = await embed_chunked(texts)
+    pooled = np.stack([
+        chunking.mean_pool(group, [chunk.tokens for chunk in chunks])
+        for chunks, group in zip(chunked, groups)
+    ])
+    return pooled, provider
+
+
+def chunking_settings() -> str:
+    # Stored chunk vectors are only reusable while texts are still cut the same way
+    return f"{settings.CHUNK_MAX_TOKENS}/{settings.EMBEDDING_MAX_TOKENS}"
+
+
+async def store_job_embedding(job: dict, chunks: List[chunking.Chunk], matrix: np.ndarray, provider: EmbeddingProvider) -> None:
+    await job_artifacts.set_embedding(
+        job,
+        provider.name,
+        chunking_settings(),
+        [{"text": chunk.text, "tokens": chunk.tokens, "section": chunk.section} for chunk in chunks],
+        matrix
+    )
+
+
+async def embed_with_job(
+    job: dict, resume_text: str
+) -> Tuple[List[chunking.Chunk], np.ndarray, List[chunking.Chunk], np.ndarray, EmbeddingProvider]:
+    """
+    Embeds the resume against an indexed job, reusing the job's stored chunk
+    vectors when they come from the provider that embedded the resume. Otherwise
+    both are embedded now and the job's vectors are stored for next time.
+    """
+    stored = job_artifacts.get_embedding(job, None, chunking_settings())
+    if stored is not None:
+        model, stored_chunks, job_vectors = stored
+        (resume_chunks,), (resume_vectors,), provider = await embed_chunked([resume_text])
+        if provider.name == model:
+            job_chunks = [chunking.Chunk(c["text"], c["tokens"], c["section"]) for c in stored_chunks]
+            return job_chunks, job_vectors, resume_chunks, resume_vectors, provider
+        logger.info(f"Job {job['job_id']} was indexed with '{model}', re-embedding it with '{provider.name}'")
+    (job_chunks, resume_chunks), (job_vectors, resume_vectors), provider = await embed_chunked([job["text"], resume_text])
+    await store_job_embedding(job, job_chunks, job_vectors, provider)
+    return job_chunks, job_vectors, resume_chunks, resume_vectors, provider
+
+
+async def compute_similarity(text1: str, text2: str, job: Optional[dict] = None) -> Tuple[float, str]:
+    """Similarity of ``text1`` (a job description, or the indexed ``job`` when given) and ``text2``."""
+    try:
+        if job is not None:
+            chunks1, vectors1, chunks2, vectors2, provider = await embed_with_job(job, text2)
+        else:
+            (chunks1, chunks2), (vectors1, vectors2), provider = await embed_chunked([text1, text2])
+        with metrics.stage("cosine"):
+            similarity_score = chunking.pooled_similarity(
+                vectors1, chunks1, vectors2, chunks2, settings.SIMILARITY_POOLING
+            )
+        
+        score = round(similarity_score * 100, 2)
+        
+        logger.info(
+            "Similarity score computed with %s embeddings (%d+%d chunks): %.2f",
+            provider.name, len(chunks1), len(chunks2), score
+        )
+        return score, provider.kind
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing similarity: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to compute similarity: {str(e)}"
+        )
+
+
+def cosine_scores(query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    # Embeddings come out of get_embeddings normalized, so cosine is a dot product
+    with metrics.stage("cosine"):
+        return vectors.cosine_scores(query, candidates)
+
+
+async def parse_resume_upload(resume_file: UploadFile) -> Tuple[str, str]:
+    file_content = await resume_file.read()
+    return await parse_resume_content(file_content, resume_file.filename, resume_file.content_type)
+
+
+async def parse_resume_content(file_content: bytes, filename: Optional[str], content_type: Optional[str]) -> Tuple[str, str]:
+    if len(file_content) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Uploaded file is empty"
+        )
     
-    matched_unique = []
-    seen_matched = set()
-    for kw in matched:
-        if kw.lower() not in seen_matched:
-            matched_unique.append(kw)
-            seen_matched.add(kw.lower())
+    resume_id = hashlib.sha256(file_content).hexdigest()
+    limits = [settings.RESUME_MAX_PAGES, settings.RESUME_MAX_CHARS]
+    cached = await parsed_resume_cache.get(resume_id)
+    # Text parsed under different extraction limits is stale
+    if cached is not None and cached.get("limits") == limits:
+        logger.info(f"Parsed resume cache hit for {resume_id[:12]}")
+        return resume_id, cached["text"]
     
-    missing_unique = []
-    seen_missing = set()
-    for kw in missing:
-        if kw.lower() not in seen_missing:
-            missing_unique.append(kw)
-            seen_missing.add(kw.lower())
+    resume_text = await extract_text_from_resume(filename, content_type, file_content)
     
-    logger.info(f"Found {len(matched_unique)} matched keywords and {len(missing_unique)} missing keywords")
+    if not resume_text or len(resume_text.strip()) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="No text could be extracted from the resume file"
+        )
     
-    return matched_unique[:10], missing_unique[:10]
+    await parsed_resume_cache.set(resume_id, resume_text, filename, limits)
+    return resume_id, resume_text
 
 
-async def compute_similarity(text1: str, text2: str) -> float:
+async def extract_keywords_async(text: str, max_keywords: int) -> List[str]:
+    with metrics.stage("keyword_extraction"):
+        return await run_in_cpu_pool(extract_keywords, text, max_keywords)
 
-    if openai_client is None:
+
+async def get_resume_keywords(resume_id: Optional[str], resume_text: str, max_keywords: int) -> List[str]:
+    version = taxonomy_version()
+    if resume_id is not None:
+        keywords = await parsed_resume_cache.get_keywords(resume_id, max_keywords, version)
+        if keywords is not None:
+            return keywords
+    keywords = await extract_keywords_async(resume_text, max_keywords)
+    if resume_id is not None:
+        await parsed_resume_cache.set_keywords(resume_id, max_keywords, keywords, version)
+    return keywords
+
+
+async def extract_keywords_in_pool(texts: List[str], max_keywords: int) -> List[List[str]]:
+    """Runs texts through spaCy in ``nlp.pipe`` batches spread over the CPU pool."""
+    batch_size = max(1, settings.SPACY_BATCH_SIZE)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    with metrics.stage("keyword_extraction"):
+        extracted = await asyncio.gather(*(
+            run_in_cpu_pool(extract_keywords_batch, batch, max_keywords, batch_size, spacy_n_process)
+            for batch in batches
+        ))
+    return [keywords for batch_keywords in extracted for keywords in batch_keywords]
+
+
+async def get_resume_keywords_batch(candidates: List[dict], max_keywords: int) -> List[List[str]]:
+    """Keywords for many resumes; uncached texts go through spaCy in batches spread over the CPU pool."""
+    version = taxonomy_version()
+    results: List[Optional[List[str]]] = list(await asyncio.gather(*(
+        parsed_resume_cache.get_keywords(c["resume_id"], max_keywords, version) for c in candidates
+    )))
+    pending = [i for i, keywords in enumerate(results) if keywords is None]
+    extracted = await extract_keywords_in_pool([candidates[i]["text"] for i in pending], max_keywords)
+    for i, keywords in zip(pending, extracted):
+        results[i] = keywords
+        await parsed_resume_cache.set_keywords(candidates[i]["resume_id"], max_keywords, keywords, version)
+    return results
+
+
+async def get_job_keywords_batch(
+    texts: List[str], max_keywords: int, jobs: Optional[List[Optional[dict]]] = None
+) -> List[List[str]]:
+    """
+    Keywords for many job descriptions. Indexed jobs (``jobs[i]`` holding their
+    artifact record) use and fill their stored keywords; other texts are cached
+    in memory by text, keyword limit and taxonomy version.
+    """
+    version = taxonomy_version()
+    jobs = jobs or [None] * len(texts)
+    keys = [(content_key(text, "job-keywords"), max_keywords, version) for text in texts]
+    results: List[Optional[List[str]]] = [
+        job_artifacts.get_keywords(job, max_keywords, version) if job is not None else job_keyword_cache.get(key)
+        for job, key in zip(jobs, keys)
+    ]
+    pending = [i for i, keywords in enumerate(results) if keywords is None]
+    extracted = await extract_keywords_in_pool([texts[i] for i in pending], max_keywords)
+    for i, keywords in zip(pending, extracted):
+        results[i] = keywords
+        if jobs[i] is not None:
+            await job_artifacts.set_keywords(jobs[i], max_keywords, keywords, version)
+        else:
+            job_keyword_cache.set(keys[i], keywords)
+    return results
+
+
+async def get_indexed_job_keywords(job: dict, max_keywords: int) -> List[str]:
+    (keywords,) = await get_job_keywords_batch([job["text"]], max_keywords, [job])
+    return keywords
+
+
+async def resolve_job(job_id: Optional[str], job_description: Optional[str]) -> Tuple[str, Optional[dict]]:
+    """
+    The job text to match against and, when ``job_id`` names an indexed job, its
+    artifact record. A description sent along with the ID wins when the artifact
+    store is disabled, the job is not indexed or its indexed text differs, and the
+    stored artifacts are not used.
+    """
+    if not job_id:
+        if not job_description or len(job_description.strip()) == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Job description cannot be empty"
+            )
+        return job_description, None
+    has_description = bool(job_description and job_description.strip())
+    if job_artifacts is None:
+        if has_description:
+            return job_description, None
+        raise HTTPException(status_code=404, detail="Job artifact store is not enabled")
+    job = await job_artifacts.get(job_id)
+    if job is None:
+        if has_description:
+            logger.info(f"Job {job_id} is not indexed, matching against the description sent")
+            return job_description, None
         raise HTTPException(
-            status_code=503,
-            detail="OpenAI service is not available. Please check OPENAI_API_KEY configuration."
+            status_code=404,
+            detail=f"Unknown job ID (index it with POST /jobs/{{job_id}}/index): {job_id}"
+        )
+    if has_description and job_artifacts.content_hash(job_description) != job["content_hash"]:
+        logger.info(f"Job {job_id} description differs from indexed version {job['version']}, not using its artifacts")
+        return job_description, None
+    return job["text"], job
+
+
+def parse_id_list(value: Optional[str]) -> List[str]:
+    if not value or not value.strip():
+        return []
+    value = value.strip()
+    if value.startswith("["):
+        try:
+            items = json.loads(value)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid JSON list of IDs")
+        return [str(item).strip() for item in items if str(item).strip()]
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+async def run_match_pipeline(
+    job_description: str,
+    resume_text: str,
+    max_keywords: int,
+    name: str = "match",
+    resume_id: Optional[str] = None,
+    include_suggestions: bool = True,
+    job: Optional[dict] = None
+) -> dict:
+    # Embedding (network) and both keyword passes (CPU) are independent, so they overlap.
+    # With an indexed job, its embedding and keywords usually come from the artifact store.
+    pipeline = StagePipeline(name)
+    pipeline.add("similarity", lambda: compute_similarity(job_description, resume_text, job))
+    if job is not None:
+        pipeline.add("job_keywords", lambda: get_indexed_job_keywords(job, max_keywords))
+    else:
+        pipeline.add("job_keywords", lambda: extract_keywords_async(job_description, max_keywords))
+    pipeline.add("resume_keywords", lambda: get_resume_keywords(resume_id, resume_text, max_keywords))
+    pipeline.add(
+        "keyword_match",
+        lambda job_keywords, resume_keywords: find_matched_and_missing_keywords(resume_keywords, job_keywords),
+        depends_on=["job_keywords", "resume_keywords"]
+    )
+    if include_suggestions:
+        pipeline.add(
+            "suggestions",
+            lambda similarity, keyword_match: generate_resume_suggestions(
+                job_description, resume_text, keyword_match[1], similarity[0]
+            ),
+            depends_on=["similarity", "keyword_match"]
         )
+    results = await pipeline.run()
+    matched_keywords, missing_keywords, keyword_matches = results["keyword_match"]
+    similarity_score, model_used = results["similarity"]
+    return {
+        "similarity_score": similarity_score,
+        "model_used": model_used,
+        "matched_keywords": matched_keywords,
+        "missing_keywords": missing_keywords,
+        "keyword_matches": keyword_matches,
+        "improvement_suggestions": results.get("suggestions"),
+        "timings": pipeline.timings
+    }
+
+
+def encode_stream_event(event: str, data: dict, sse: bool) -> str:
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+async def stream_analysis(
+    job_description: str,
+    resume_text: str,
+    resume_id: str,
+    result: dict,
+    sse: bool
+) -> AsyncIterator[str]:
+    yield encode_stream_event("score", {
+        "similarity_score": result["similarity_score"],
+        "matched_keywords": result["matched_keywords"],
+        "missing_keywords": result["missing_keywords"],
+        "keyword_matches": result["keyword_matches"],
+        "model_used": result["model_used"],
+        "resume_id": resume_id
+    }, sse)
     
+    start = time.perf_counter()
+    try:
+        async for event, data in stream_resume_suggestions(
+            job_description, resume_text, result["missing_keywords"], result["similarity_score"]
+        ):
+            yield encode_stream_event(event, data, sse)
+    except Exception as e:
+        logger.error(f"Error streaming analyze response: {str(e)}")
+        yield encode_stream_event("error", {"detail": str(e)}, sse)
+        return
+    timings = dict(result["timings"], suggestions=round((time.perf_counter() - start) * 1000, 2))
+    yield encode_stream_event("done", {"timings": timings}, sse)
+
+
+@app.post("/analyze")
+async def analyze_resume(
+    request: Request,
+    resume_file: Annotated[UploadFile, File(description="Resume file (PDF or DOCX)")],
+    job_description: Annotated[Optional[str], Form(description="Job description text (optional with job_id)")] = None,
+    job_id: Annotated[Optional[str], Form(description="ID of a job indexed with POST /jobs/{job_id}/index")] = None,
+    stream: Annotated[bool, Form(description="Stream the score first, then suggestions (NDJSON, or SSE with Accept: text/event-stream)")] = False
+):
     try:
-        logger.info("Computing similarity using OpenAI embeddings...")
+        logger.info(f"Received analyze request for file: {resume_file.filename}")
         
-        response1 = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text1
-        )
-        response2 = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text2
-        )
+        resume_id, resume_text = await parse_resume_upload(resume_file)
+        
+        logger.info("Resume text length: %d characters", len(resume_text))
         
-        embedding1 = np.array(response1.data[0].embedding)
-        embedding2 = np.array(response2.data[0].embedding)
+        job_description, job = await resolve_job(job_id, job_description)
         
-        similarity_matrix = cosine_similarity([embedding1], [embedding2])
-        similarity_score = float(similarity_matrix[0][0])
+        result = await run_match_pipeline(
+            job_description, resume_text, max_keywords=10, name="analyze", resume_id=resume_id,
+            include_suggestions=not stream, job=job
+        )
         
-        score = round(similarity_score * 100, 2)
+        if stream:
+            sse = "text/event-stream" in request.headers.get("accept", "")
+            return StreamingResponse(
+                stream_analysis(job_description, resume_text, resume_id, result, sse),
+                media_type="text/event-stream" if sse else "application/x-ndjson",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
         
-        logger.info("OpenAI similarity score computed: %.2f", score)
-        return score
+        return analysis_response(result, resume_id)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error computing similarity with OpenAI: {str(e)}")
+        logger.error(f"Unexpected error in analyze endpoint: {str(e)}")
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to compute similarity with OpenAI: {str(e)}"
+            detail=f"Internal server error: {str(e)}"
         )
 
 
-@app.post("/analyze")
-async def analyze_resume(
-    job_description: Annotated[str, Form(description="Job description text")],
-    resume_file: Annotated[UploadFile, File(description="Resume file (PDF or DOCX)")]
+def analysis_response(result: dict, resume_id: str) -> dict:
+    return {
+        "similarity_score": result["similarity_score"],
+        "matched_keywords": result["matched_keywords"],
+        "missing_keywords": result["missing_keywords"],
+        "keyword_matches": result["keyword_matches"],
+        "model_used": result["model_used"],
+        "improvement_suggestions": result["improvement_suggestions"],
+        "resume_id": resume_id
+    }
+
+
+async def run_analysis_job(payload: dict, file_content: Optional[bytes]) -> dict:
+    """Queued /analyze: same pipeline and response, run by a job queue worker."""
+    try:
+        resume_id, resume_text = await parse_resume_content(
+            file_content or b"", payload.get("filename"), payload.get("content_type")
+        )
+        job_description, job = await resolve_job(payload.get("job_id"), payload.get("job_description"))
+        result = await run_match_pipeline(
+            job_description, resume_text, max_keywords=10, name="analysis_job", resume_id=resume_id, job=job
+        )
+        return analysis_response(result, resume_id)
+    except HTTPException as e:
+        if e.status_code == 503:
+            # CPU pool is saturated; wait for capacity instead of failing the job
+            raise JobRetry(e.detail)
+        raise JobFailed(e.detail, e.status_code)
+
+
+@app.post("/analyses", status_code=202)
+async def submit_analysis(
+    resume_file: Annotated[UploadFile, File(description="Resume file (PDF or DOCX)")],
+    job_description: Annotated[Optional[str], Form(description="Job description text (optional with job_id)")] = None,
+    job_id: Annotated[Optional[str], Form(description="ID of a job indexed with POST /jobs/{job_id}/index")] = None,
+    priority: Annotated[int, Form(description="Higher runs first", ge=0, le=9)] = 5,
+    callback_url: Annotated[Optional[str], Form(description="URL that receives the finished job as a JSON POST")] = None
 ):
+    """
+    Queue an analysis instead of running it inside the request.
+    
+    Returns a job ID immediately; poll GET /analyses/{job_id} (or pass a
+    callback_url) for the result, which has the same shape as /analyze.
+    Resubmitting the same resume and job description (or indexed job version)
+    returns the existing job.
+    """
+    if job_queue is None:
+        raise HTTPException(status_code=404, detail="Job queue is not enabled")
     try:
-        logger.info(f"Received analyze request for file: {resume_file.filename}")
-        
-        if openai_client is None:
-            raise HTTPException(
-                status_code=503,
-                detail="OpenAI service is not available. Please check OPENAI_API_KEY configuration."
-            )
+        # Fail fast on an unknown job; the worker resolves it again when the job runs
+        _, job = await resolve_job(job_id, job_description)
         
         file_content = await resume_file.read()
-        
         if len(file_content) == 0:
             raise HTTPException(
                 status_code=400,
                 detail="Uploaded file is empty"
             )
         
-        resume_text = extract_text_from_resume(resume_file, file_content)
+        job, deduplicated = await job_queue.submit(
+            "analyze",
+            {
+                "job_description": job_description,
+                "job_id": job_id,
+                # Part of the deduplication key, so a re-indexed job is not answered from an old result
+                "job_version": job["content_hash"] if job is not None else None,
+                "filename": resume_file.filename,
+                "content_type": resume_file.content_type
+            },
+            attachment=file_content,
+            priority=priority,
+            callback_url=callback_url or None
+        )
+        logger.info(f"Queued analysis job {job['job_id']} (priority {priority}, deduplicated: {deduplicated})")
+        return {**job, "deduplicated": deduplicated}
         
-        if not resume_text or len(resume_text.strip()) == 0:
+    except CallbackNotAllowed as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis queue is full. Please retry shortly.",
+            headers={"Retry-After": str(max(1, int(settings.JOB_RETRY_DELAY_SECONDS)))}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in submit analysis endpoint: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+@app.get("/analyses/{job_id}")
+async def get_analysis(job_id: str):
+    if job_queue is None:
+        raise HTTPException(status_code=404, detail="Job queue is not enabled")
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Analysis job {job_id} not found or expired")
+    return job
+
+
+@app.post("/rank")
+async def rank_resumes(
+    job_description: Annotated[str, Form(description="Job description text")],
+    resume_files: Annotated[List[UploadFile], File(description="Resume files (PDF or DOCX)")] = [],
+    resume_ids: Annotated[Optional[str], Form(description="Comma-separated or JSON list of previously uploaded resume IDs")] = None,
+    top_k: Annotated[int, Form(description="Number of candidates to return", ge=1)] = 10,
+    include_suggestions: Annotated[bool, Form(description="Generate LLM suggestions for the top candidates")] = False,
+    suggestions_top_k: Annotated[int, Form(description="Number of top candidates to generate suggestions for", ge=0)] = 3,
+    max_keywords: Annotated[int, Form(description="Keywords extracted per document", ge=1, le=50)] = 10
+):
+    """
+    Rank many resumes against one job description.
+    
+    The job description is embedded and keyword-extracted once, all resumes are
+    embedded in a single batch and scored with one matrix product. Keywords are only
+    extracted for the shortlist, and LLM suggestions only when requested.
+    
+    Returns:
+        JSON response with the shortlist sorted by similarity score
+    """
+    try:
+        if not job_description or len(job_description.strip()) == 0:
             raise HTTPException(
                 status_code=400,
-                detail="No text could be extracted from the resume file"
+                detail="Job description cannot be empty"
             )
         
-        logger.info("Resume text length: %d characters", len(resume_text))
+        candidates = []
+        parsed = await asyncio.gather(*(parse_resume_upload(f) for f in resume_files))
+        for resume_file, (resume_id, resume_text) in zip(resume_files, parsed):
+            candidates.append({"resume_id": resume_id, "filename": resume_file.filename, "text": resume_text})
         
-        if not job_description or len(job_description.strip()) == 0:
+        unknown_ids = []
+        for resume_id in parse_id_list(resume_ids):
+            stored = await parsed_resume_cache.get(resume_id)
+            if stored is None:
+                unknown_ids.append(resume_id)
+            else:
+                candidates.append({"resume_id": resume_id, "filename": stored["filename"], "text": stored["text"]})
+        if unknown_ids:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Unknown resume IDs (upload the files again): {', '.join(unknown_ids)}"
+            )
+        
+        # The same file may be sent twice (as an upload and by ID)
+        candidates = list({c["resume_id"]: c for c in candidates}.values())
+        if not candidates:
             raise HTTPException(
                 status_code=400,
-                detail="Job description cannot be empty"
+                detail="Provide at least one resume file or resume ID"
             )
         
-        similarity_score = await compute_similarity(job_description, resume_text)
+        logger.info(f"Ranking {len(candidates)} resumes against job description")
         
-        job_keywords = extract_keywords(job_description, max_keywords=10)
-        resume_keywords = extract_keywords(resume_text, max_keywords=10)
-        matched_keywords, missing_keywords = find_matched_and_missing_keywords(
-            resume_keywords, job_keywords
-        )
+        job_keywords_task = asyncio.ensure_future(extract_keywords_async(job_description, max_keywords))
+        try:
+            embeddings, provider = await embed_documents([job_description] + [c["text"] for c in candidates])
+        except Exception:
+            job_keywords_task.cancel()
+            raise
+        scores = cosine_scores(embeddings[0], embeddings[1:])
         
-        suggestions = await generate_resume_suggestions(
-            job_description, resume_text, missing_keywords, similarity_score
-        )
+        k = min(top_k, len(candidates))
+        order = np.argsort(-scores)[:k]
+        shortlist = [candidates[i] for i in order]
+        
+        job_keywords = await job_keywords_task
+        resume_keywords = await get_resume_keywords_batch(shortlist, max_keywords)
+        
+        results = []
+        for rank, (i, candidate, keywords) in enumerate(zip(order, shortlist, resume_keywords), start=1):
+            matched_keywords, missing_keywords, keyword_matches = find_matched_and_missing_keywords(
+                keywords, job_keywords
+            )
+            results.append({
+                "rank": rank,
+                "resume_id": candidate["resume_id"],
+                "filename": candidate["filename"],
+                "similarity_score": round(float(scores[i]) * 100, 2),
+                "matched_keywords": matched_keywords,
+                "missing_keywords": missing_keywords,
+                "keyword_matches": keyword_matches
+            })
+        
+        if include_suggestions and suggestions_top_k > 0:
+            top = results[:suggestions_top_k]
+            suggestions = await asyncio.gather(*(
+                generate_resume_suggestions(
+                    job_description, candidate["text"], result["missing_keywords"], result["similarity_score"]
+                )
+                for result, candidate in zip(top, shortlist)
+            ))
+            for result, suggestion in zip(top, suggestions):
+                result["improvement_suggestions"] = suggestion
         
         return {
-            "similarity_score": similarity_score,
-            "matched_keywords": matched_keywords,
-            "missing_keywords": missing_keywords,
-            "model_used": "openai",
-            "improvement_suggestions": suggestions
+            "total_candidates": len(candidates),
+            "job_keywords": job_keywords,
+            "results": results,
+            "model_used": provider.kind
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in analyze endpoint: {str(e)}")
+        logger.error(f"Unexpected error in rank endpoint: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
 
-@app.post("/summarize")
-async def summarize_text(
-    text: Annotated[str, Form(description="Text to summarize")],
-    text_type: Annotated[str, Form(description="Type of text: 'job_description' or 'resume'")] = "job_description"
-):
+def parse_job_list(value: Optional[str]) -> List[dict]:
+    """Parses a JSON list of job description strings or ``{"id", "description"}`` objects."""
+    if not value or not value.strip():
+        return []
     try:
-        if openai_client is None:
+        items = json.loads(value)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="job_descriptions must be a JSON list")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="job_descriptions must be a JSON list")
+    jobs = []
+    for position, item in enumerate(items):
+        if isinstance(item, str):
+            job_id, text = str(position), item
+        elif isinstance(item, dict) and isinstance(item.get("description"), str):
+            job_id, text = str(item.get("id", position)), item["description"]
+        else:
             raise HTTPException(
-                status_code=503,
-                detail="OpenAI service is not available. Please check OPENAI_API_KEY configuration."
+                status_code=400,
+                detail="Each job description must be a string or an object with 'id' and 'description'"
             )
+        if not text.strip():
+            raise HTTPException(status_code=400, detail=f"Job description {job_id} is empty")
+        jobs.append({"job_id": job_id, "text": text, "metadata": None, "artifacts": None})
+    return jobs
+
+
+@app.post("/match-jobs")
+async def match_jobs(
+    resume_file: Annotated[Optional[UploadFile], File(description="Resume file (PDF or DOCX)")] = None,
+    resume_id: Annotated[Optional[str], Form(description="ID of a previously uploaded resume")] = None,
+    resume_text: Annotated[Optional[str], Form(description="Resume text")] = None,
+    job_descriptions: Annotated[Optional[str], Form(description="JSON list of job description strings or objects with 'id' and 'description'")] = None,
+    job_ids: Annotated[Optional[str], Form(description="Comma-separated or JSON list of job IDs in the jobs index")] = None,
+    top_k: Annotated[int, Form(description="Number of jobs to return", ge=1)] = 10,
+    include_suggestions: Annotated[bool, Form(description="Generate LLM suggestions for the top jobs")] = False,
+    suggestions_top_k: Annotated[int, Form(description="Number of top jobs to generate suggestions for", ge=0)] = 3,
+    max_keywords: Annotated[int, Form(description="Keywords extracted per document", ge=1, le=50)] = 10
+):
+    """
+    Score one resume against many jobs.
+    
+    The resume is parsed, embedded and keyword-extracted once. Supplied job
+    descriptions are embedded in the same batch, and jobs given by ID reuse their
+    vectors from the jobs index; all jobs are scored with one matrix product. Job
+    keywords are only extracted for the top-k and are cached, and LLM suggestions
+    are only generated when requested.
+    
+    Returns:
+        JSON response with the best-matching jobs sorted by similarity score
+    """
+    try:
+        if resume_file is not None:
+            resume_id, resume_text = await parse_resume_upload(resume_file)
+        elif resume_id:
+            stored = await parsed_resume_cache.get(resume_id)
+            if stored is None:
+                raise HTTPException(status_code=404, detail=f"Unknown resume ID (upload the file again): {resume_id}")
+            resume_text = stored["text"]
+        if not resume_text or len(resume_text.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Provide resume_file, resume_id or resume_text")
         
-        if not text or len(text.strip()) == 0:
+        # Supplied descriptions win over index entries with the same ID
+        jobs = list({job["job_id"]: job for job in parse_job_list(job_descriptions)}.values())
+        supplied_ids = {job["job_id"] for job in jobs}
+        requested_ids = list(dict.fromkeys(i for i in parse_id_list(job_ids) if i not in supplied_ids))
+        index = vector_indexes["jobs"]
+        indexed_ids, indexed_vectors, indexed_metadata = index.get_items(requested_ids)
+        found_ids = set(indexed_ids)
+        unknown_ids = [job_id for job_id in requested_ids if job_id not in found_ids]
+        if unknown_ids:
             raise HTTPException(
-                status_code=400,
-                detail="Text cannot be empty"
+                status_code=404,
+                detail=f"Unknown job IDs (add them with POST /index/jobs): {', '.join(unknown_ids)}"
+            )
+        jobs += [
+            {"job_id": job_id, "text": None, "metadata": metadata, "artifacts": None}
+            for job_id, metadata in zip(indexed_ids, indexed_metadata)
+        ]
+        if not jobs:
+            raise HTTPException(status_code=400, detail="Provide job_descriptions or job_ids")
+        
+        logger.info(f"Matching resume against {len(jobs)} jobs ({len(indexed_ids)} from the index)")
+        
+        resume_keywords_task = asyncio.ensure_future(get_resume_keywords(resume_id, resume_text, max_keywords))
+        try:
+            supplied_texts = [job["text"] for job in jobs if job["text"] is not None]
+            embeddings, provider = await embed_documents([resume_text] + supplied_texts)
+            if indexed_ids and index.model != provider.name:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"The jobs index holds '{index.model}' vectors but the resume was embedded with '{provider.name}'"
+                )
+        except Exception:
+            resume_keywords_task.cancel()
+            raise
+        job_matrix = np.vstack([embeddings[1:], indexed_vectors]) if indexed_ids else embeddings[1:]
+        scores = cosine_scores(embeddings[0], job_matrix)
+        
+        k = min(top_k, len(jobs))
+        order = np.argsort(-scores)[:k]
+        shortlist = [jobs[i] for i in order]
+        
+        # Indexed jobs are scored by vector alone; their texts and stored keywords are only read for the shortlist
+        for job in shortlist:
+            if job["text"] is None and job_artifacts is not None:
+                job["artifacts"] = await job_artifacts.get(job["job_id"])
+                job["text"] = job["artifacts"]["text"] if job["artifacts"] is not None else None
+        with_text = [job for job in shortlist if job["text"] is not None]
+        job_keywords = dict(zip(
+            (job["job_id"] for job in with_text),
+            await get_job_keywords_batch(
+                [job["text"] for job in with_text], max_keywords, [job.get("artifacts") for job in with_text]
             )
+        ))
+        resume_keywords = await resume_keywords_task
+        
+        results = []
+        for rank, (i, job) in enumerate(zip(order, shortlist), start=1):
+            result = {
+                "rank": rank,
+                "job_id": job["job_id"],
+                "similarity_score": round(float(scores[i]) * 100, 2),
+                "matched_keywords": None,
+                "missing_keywords": None,
+                "keyword_matches": None
+            }
+            if job["job_id"] in job_keywords:
+                matched_keywords, missing_keywords, keyword_matches = find_matched_and_missing_keywords(
+                    resume_keywords, job_keywords[job["job_id"]]
+                )
+                result.update(
+                    matched_keywords=matched_keywords,
+                    missing_keywords=missing_keywords,
+                    keyword_matches=keyword_matches
+                )
+            if job["metadata"] is not None:
+                result["metadata"] = job["metadata"]
+            results.append(result)
         
-        text_to_summarize = text[:3000]
+        if include_suggestions and suggestions_top_k > 0:
+            top = [
+                (result, job) for result, job in zip(results[:suggestions_top_k], shortlist)
+                if result["missing_keywords"] is not None
+            ]
+            suggestions = await asyncio.gather(*(
+                generate_resume_suggestions(
+                    job["text"], resume_text, result["missing_keywords"], result["similarity_score"]
+                )
+                for result, job in top
+            ))
+            for (result, _), suggestion in zip(top, suggestions):
+                result["improvement_suggestions"] = suggestion
         
-        if text_type == "job_description":
-            prompt = f"""Summarize the following job description. Extract the key requirements, responsibilities, and qualifications.
+        return {
+            "resume_id": resume_id,
+            "total_jobs": len(jobs),
+            "resume_keywords": resume_keywords,
+            "results": results,
+            "model_used": provider.kind
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in match-jobs endpoint: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+def build_summary_request(text: str, text_type: str) -> dict:
+    if text_type == "job_description":
+        prompt = f"""Summarize the following job description. Extract the key requirements, responsibilities, and qualifications.
 
 Job Description:
-{text_to_summarize}
+{text[:3000]}
 
 Provide a concise summary (2-3 sentences) and list the key points:
 - Required skills/technologies
@@ -555,11 +1428,11 @@ Format as JSON:
     "key_responsibilities": ["responsibility1", "responsibility2", ...],
     "qualifications": ["qualification1", "qualification2", ...]
 }}"""
-        else:  # resume
-            prompt = f"""Summarize the following resume. Extract key information about the candidate.
+    else:  # resume
+        prompt = f"""Summarize the following resume. Extract key information about the candidate.
 
 Resume:
-{text_to_summarize}
+{text[:3000]}
 
 Provide a concise summary (2-3 sentences) and list the key points:
 - Key skills
@@ -573,24 +1446,58 @@ Format as JSON:
     "experience_highlights": ["highlight1", "highlight2", ...],
     "education": "Education summary"
 }}"""
+    
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You are a helpful assistant that summarizes job descriptions and resumes concisely and accurately."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.3,
+        "max_tokens": 500
+    }
+
+
+async def summarize_job(job: dict) -> dict:
+    """The indexed job's stored summary, generated and stored on first use."""
+    if job["summary"] is None:
+        content = await chat_completion_content(**build_summary_request(job["text"], "job_description"))
+        await job_artifacts.set_summary(job, parse_json_content(content))
+    return job["summary"]
+
+
+@app.post("/summarize")
+async def summarize_text(
+    text: Annotated[Optional[str], Form(description="Text to summarize (optional with job_id)")] = None,
+    text_type: Annotated[str, Form(description="Type of text: 'job_description' or 'resume'")] = "job_description",
+    job_id: Annotated[Optional[str], Form(description="ID of an indexed job; returns its stored summary")] = None
+):
+    try:
+        if openai_client is None:
+            raise HTTPException(
+                status_code=503,
+                detail="OpenAI service is not available. Please check OPENAI_API_KEY configuration."
+            )
         
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that summarizes job descriptions and resumes concisely and accurately."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=500
-        )
+        if job_id:
+            text, job = await resolve_job(job_id, text)
+            if job is not None:
+                return {
+                    "text_type": "job_description",
+                    "original_length": len(text),
+                    "summary": await summarize_job(job),
+                    "model_used": "openai"
+                }
+        
+        if not text or len(text.strip()) == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Text cannot be empty"
+            )
         
-        content = response.choices[0].message.content.strip()
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
+        content = await chat_completion_content(**build_summary_request(text, text_type))
         
-        summary_data = json.loads(content)
+        summary_data = parse_json_content(content)
         
         return {
             "text_type": text_type,
@@ -605,7 +1512,7 @@ Format as JSON:
         return {
             "text_type": text_type,
             "summary": {
-                "summary": response.choices[0].message.content if 'response' in locals() else "Unable to generate summary",
+                "summary": content if 'content' in locals() else "Unable to generate summary",
                 "key_skills": [],
                 "key_responsibilities": [] if text_type == "job_description" else [],
                 "qualifications": [] if text_type == "job_description" else []
@@ -624,93 +1531,468 @@ Format as JSON:
 
 @app.post("/suggest-improvements")
 async def suggest_resume_improvements(
-    job_description: Annotated[str, Form(description="Job description text")],
-    resume_file: Annotated[UploadFile, File(description="Resume file (PDF or DOCX)")]
+    resume_file: Annotated[UploadFile, File(description="Resume file (PDF or DOCX)")],
+    job_description: Annotated[Optional[str], Form(description="Job description text (optional with job_id)")] = None,
+    job_id: Annotated[Optional[str], Form(description="ID of a job indexed with POST /jobs/{job_id}/index")] = None
 ):
     """
     Get detailed suggestions to improve resume match score.
     
     Args:
-        job_description: Job description text
         resume_file: Resume file (PDF or DOCX)
+        job_description: Job description text
+        job_id: Indexed job to use instead of, or to verify, the job description
         
     Returns:
         JSON response with improvement suggestions, actionable items, and score impact
     """
     try:
-        if openai_client is None:
-            raise HTTPException(
-                status_code=503,
-                detail="OpenAI service is not available. Please check OPENAI_API_KEY configuration."
-            )
+        resume_id, resume_text = await parse_resume_upload(resume_file)
         
-        file_content = await resume_file.read()
+        job_description, job = await resolve_job(job_id, job_description)
         
-        if len(file_content) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="Uploaded file is empty"
-            )
+        # Similarity, keyword extraction and suggestions run as a stage pipeline
+        logger.info("Generating detailed resume improvement suggestions...")
+        result = await run_match_pipeline(
+            job_description, resume_text, max_keywords=15, name="suggest-improvements", resume_id=resume_id,
+            job=job
+        )
         
-        resume_text = extract_text_from_resume(resume_file, file_content)
+        return {
+            "current_score": result["similarity_score"],
+            "matched_keywords": result["matched_keywords"],
+            "missing_keywords": result["missing_keywords"],
+            "keyword_matches": result["keyword_matches"],
+            "improvement_suggestions": result["improvement_suggestions"],
+            "model_used": result["model_used"],
+            "resume_id": resume_id
+        }
         
-        if not resume_text or len(resume_text.strip()) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="No text could be extracted from the resume file"
-            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in suggest-improvements endpoint: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+IndexKind = Literal["resumes", "jobs"]
+
+
+def parse_metadata(value: Optional[str]) -> dict:
+    if not value or not value.strip():
+        return {}
+    try:
+        metadata = json.loads(value)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="metadata must be a JSON object")
+    if not isinstance(metadata, dict):
+        raise HTTPException(status_code=400, detail="metadata must be a JSON object")
+    return metadata
+
+
+def search_index(
+    kind: str,
+    query_vector,
+    top_k: int,
+    approximate: Optional[bool],
+    model: Optional[str] = None,
+    exclude: List[str] = None
+) -> List[dict]:
+    if approximate is None:
+        approximate = settings.VECTOR_INDEX_APPROXIMATE
+    index = vector_indexes[kind]
+    if model is not None and index.model is not None and index.model != model:
+        raise HTTPException(
+            status_code=409,
+            detail=f"The {kind} index holds '{index.model}' vectors but the query was embedded with '{model}'"
+        )
+    try:
+        with metrics.stage("vector_search"):
+            hits = vector_indexes[kind].search(query_vector, top_k=top_k, approximate=approximate, exclude=exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return [
+        {"id": item_id, "similarity_score": round(score * 100, 2), "metadata": metadata}
+        for item_id, score, metadata in hits
+    ]
+
+
+@app.post("/index/{kind}")
+async def add_to_index(
+    kind: IndexKind,
+    item_id: Annotated[Optional[str], Form(description="ID of the resume or job (defaults to the file hash for resume uploads)")] = None,
+    text: Annotated[Optional[str], Form(description="Text to embed")] = None,
+    resume_file: Annotated[Optional[UploadFile], File(description="Resume file (PDF or DOCX), resumes only")] = None,
+    metadata: Annotated[Optional[str], Form(description="JSON object stored alongside the vector")] = None
+):
+    """
+    Add or replace a resume or job in the local vector index.
+    
+    Returns:
+        JSON response with the indexed ID and the index size
+    """
+    try:
+        if resume_file is not None:
+            if kind != "resumes":
+                raise HTTPException(status_code=400, detail="File uploads can only be indexed as resumes")
+            resume_id, text = await parse_resume_upload(resume_file)
+            item_id = item_id or resume_id
         
-        if not job_description or len(job_description.strip()) == 0:
+        if not text or len(text.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Provide non-empty text or a resume file to index")
+        if not item_id:
+            raise HTTPException(status_code=400, detail="item_id is required when indexing text")
+        
+        item_metadata = parse_metadata(metadata)
+        (embedding,), provider = await embed_documents([text])
+        try:
+            vector_indexes[kind].add([(item_id, embedding, item_metadata)], model=provider.name)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if kind == "jobs" and job_artifacts is not None:
+            # Embeddings and keywords are filled in on first use; POST /jobs/{job_id}/index computes them up front
+            await job_artifacts.put_text(item_id, text)
+        
+        return {"kind": kind, "id": item_id, "indexed": len(vector_indexes[kind])}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in index endpoint: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+@app.delete("/index/{kind}/{item_id}")
+async def remove_from_index(kind: IndexKind, item_id: str):
+    if not vector_indexes[kind].delete(item_id):
+        raise HTTPException(status_code=404, detail=f"{item_id} is not in the {kind} index")
+    if kind == "jobs" and job_artifacts is not None:
+        await job_artifacts.delete(item_id)
+    return {"kind": kind, "id": item_id, "deleted": True, "indexed": len(vector_indexes[kind])}
+
+
+@app.post("/search/candidates")
+async def search_candidates(
+    job_id: Annotated[Optional[str], Form(description="ID of an indexed job")] = None,
+    job_description: Annotated[Optional[str], Form(description="Job description text")] = None,
+    top_k: Annotated[int, Form(description="Number of candidates to return", ge=1, le=1000)] = 50,
+    approximate: Annotated[Optional[bool], Form(description="Use the IVF layout instead of exact search")] = None
+):
+    """
+    Find the best indexed resumes for a job, by indexed job ID or job description text.
+    """
+    model = None
+    if job_id:
+        model = vector_indexes["jobs"].model
+        query_vector = vector_indexes["jobs"].get_vector(job_id)
+        if query_vector is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} is not in the jobs index")
+    elif job_description and job_description.strip():
+        (query_vector,), provider = await embed_documents([job_description])
+        model = provider.name
+    else:
+        raise HTTPException(status_code=400, detail="Provide job_id or job_description")
+    
+    return {"job_id": job_id, "results": search_index("resumes", query_vector, top_k, approximate, model)}
+
+
+@app.post("/search/jobs")
+async def search_jobs(
+    resume_id: Annotated[Optional[str], Form(description="ID of an indexed resume")] = None,
+    resume_file: Annotated[Optional[UploadFile], File(description="Resume file (PDF or DOCX)")] = None,
+    resume_text: Annotated[Optional[str], Form(description="Resume text")] = None,
+    top_k: Annotated[int, Form(description="Number of jobs to return", ge=1, le=1000)] = 50,
+    approximate: Annotated[Optional[bool], Form(description="Use the IVF layout instead of exact search")] = None
+):
+    """
+    Find the best indexed jobs for a candidate, by indexed resume ID, upload or text.
+    """
+    query_vector = None
+    model = vector_indexes["resumes"].model
+    if resume_id:
+        query_vector = vector_indexes["resumes"].get_vector(resume_id)
+        if query_vector is None:
+            stored = await parsed_resume_cache.get(resume_id)
+            if stored is None:
+                raise HTTPException(status_code=404, detail=f"Resume {resume_id} is not in the resumes index")
+            resume_text = stored["text"]
+    elif resume_file is not None:
+        resume_id, resume_text = await parse_resume_upload(resume_file)
+    
+    if query_vector is None:
+        if not resume_text or not resume_text.strip():
+            raise HTTPException(status_code=400, detail="Provide resume_id, resume_file or resume_text")
+        (query_vector,), provider = await embed_documents([resume_text])
+        model = provider.name
+    
+    return {"resume_id": resume_id, "results": search_index("jobs", query_vector, top_k, approximate, model)}
+
+
+async def index_job_embedding(job: dict, metadata: dict) -> dict:
+    """Stores the job's chunk vectors (reused if current) and puts its pooled vector in the jobs index."""
+    stored = job_artifacts.get_embedding(job, embedding_providers[0].name, chunking_settings())
+    if stored is not None:
+        model, chunks, matrix = stored
+        weights = [chunk["tokens"] for chunk in chunks]
+    else:
+        (chunks,), (matrix,), provider = await embed_chunked([job["text"]])
+        await store_job_embedding(job, chunks, matrix, provider)
+        model, weights = provider.name, [chunk.tokens for chunk in chunks]
+    try:
+        vector_indexes["jobs"].add([(job["job_id"], chunking.mean_pool(matrix, weights), metadata)], model=model)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"model": model, "chunks": len(weights), "reused": stored is not None}
+
+
+async def index_job_summary(job: dict) -> Optional[dict]:
+    if not settings.JOB_INDEX_SUMMARIZE or openai_client is None:
+        return job["summary"]
+    try:
+        return await summarize_job(job)
+    except Exception as e:
+        # The summary is optional; matching does not depend on it
+        logger.warning(f"Could not summarize job {job['job_id']}: {str(e)}")
+        return None
+
+
+def job_artifacts_response(job: dict) -> dict:
+    embedding = job["embedding"]
+    return {
+        "job_id": job["job_id"],
+        "version": job["version"],
+        "content_hash": job["content_hash"],
+        "updated_at": job["updated_at"],
+        "embedding": {
+            "model": embedding["model"],
+            "chunking": embedding["chunking"],
+            "chunks": len(embedding["chunks"])
+        } if embedding is not None else None,
+        "keywords": job["keywords"],
+        "summary": job["summary"]
+    }
+
+
+@app.post("/jobs/{job_id}/index")
+async def index_job(
+    job_id: str,
+    description: Annotated[str, Form(description="Job description text")],
+    metadata: Annotated[Optional[str], Form(description="JSON object stored alongside the job vector")] = None
+):
+    """
+    Precompute and store the job-side work of matching when a job is posted or edited.
+    
+    Embeds the description's chunks (and adds the job to the jobs vector index),
+    extracts its keywords for the limits match requests use, and summarizes it.
+    Artifacts are versioned by content hash: posting the same description again
+    reuses them, a changed description replaces them. Match requests that pass
+    job_id then only do resume-side work.
+    
+    Returns:
+        JSON response with the job's version, content hash and artifacts
+    """
+    if job_artifacts is None:
+        raise HTTPException(status_code=404, detail="Job artifact store is not enabled")
+    try:
+        if not description or len(description.strip()) == 0:
             raise HTTPException(
                 status_code=400,
                 detail="Job description cannot be empty"
             )
+        item_metadata = parse_metadata(metadata)
         
-        # Compute similarity
-        similarity_score = await compute_similarity(job_description, resume_text)
-        
-        # Extract keywords
-        job_keywords = extract_keywords(job_description, max_keywords=15)
-        resume_keywords = extract_keywords(resume_text, max_keywords=15)
-        
-        # Find missing keywords
-        matched_keywords, missing_keywords = find_matched_and_missing_keywords(
-            resume_keywords, job_keywords
-        )
+        job, changed = await job_artifacts.put_text(job_id, description)
+        logger.info(f"Indexing job {job_id} version {job['version']} (changed: {changed})")
         
-        # Generate detailed suggestions
-        logger.info("Generating detailed resume improvement suggestions...")
-        suggestions = await generate_resume_suggestions(
-            job_description, resume_text, missing_keywords, similarity_score
-        )
+        pipeline = StagePipeline("index_job")
+        pipeline.add("embedding", lambda: index_job_embedding(job, item_metadata))
+        pipeline.add("keywords", lambda: asyncio.gather(*(
+            get_indexed_job_keywords(job, limit) for limit in settings.JOB_INDEX_KEYWORD_LIMITS
+        )))
+        pipeline.add("summary", lambda: index_job_summary(job))
+        results = await pipeline.run()
         
         return {
-            "current_score": similarity_score,
-            "matched_keywords": matched_keywords,
-            "missing_keywords": missing_keywords,
-            "improvement_suggestions": suggestions,
-            "model_used": "openai"
+            **job_artifacts_response(job),
+            "changed": changed,
+            "embedding_reused": results["embedding"]["reused"],
+            "indexed": len(vector_indexes["jobs"]),
+            "timings": pipeline.timings
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in suggest-improvements endpoint: {str(e)}")
+        logger.error(f"Unexpected error in index job endpoint: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
 
+@app.get("/jobs/{job_id}")
+async def get_job_artifacts(job_id: str):
+    if job_artifacts is None:
+        raise HTTPException(status_code=404, detail="Job artifact store is not enabled")
+    job = await job_artifacts.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} is not indexed")
+    return job_artifacts_response(job)
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job_artifacts(job_id: str):
+    deleted = await job_artifacts.delete(job_id) if job_artifacts is not None else False
+    deleted = vector_indexes["jobs"].delete(job_id) or deleted
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} is not indexed")
+    return {"job_id": job_id, "deleted": True, "indexed": len(vector_indexes["jobs"])}
+
+
+@app.post("/taxonomy/reload")
+async def reload_taxonomy():
+    """
+    Re-read the skill taxonomy file now. CPU pool workers pick up the change on
+    their next mtime check (every SKILL_TAXONOMY_CHECK_SECONDS).
+    """
+    taxonomy = keyword_extraction.taxonomy
+    if taxonomy is None:
+        raise HTTPException(status_code=404, detail="Skill taxonomy is not enabled")
+    try:
+        changed = taxonomy.reload()
+    except (OSError, ValueError) as e:
+        logger.error(f"Skill taxonomy reload failed: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Failed to reload skill taxonomy: {str(e)}")
+    return {"changed": changed, **taxonomy.stats()}
+
+
+def collect_component_metrics() -> List[metrics.Family]:
+    """Pool, cache and queue gauges and counters read from component stats() at scrape time."""
+    caches = {
+        "embedding": embedding_cache,
+        "parsed_resume": parsed_resume_cache,
+        "llm_response": llm_cache,
+    }
+    cache_stats = {name: cache.stats() for name, cache in caches.items() if cache is not None}
+    families: List[metrics.Family] = [
+        ("resume_match_cache_hits_total", "counter", "Cache hits by tier", [
+            ({"cache": name, "tier": tier}, stats[f"{tier}_hits"])
+            for name, stats in cache_stats.items() for tier in ("memory", "disk")
+        ]),
+        ("resume_match_cache_misses_total", "counter", "Cache lookups that missed every tier", [
+            ({"cache": name}, stats["misses"]) for name, stats in cache_stats.items()
+        ]),
+        ("resume_match_cache_hit_ratio", "gauge", "Cache hit ratio since startup", [
+            ({"cache": name}, stats["hit_ratio"]) for name, stats in cache_stats.items()
+        ]),
+        ("resume_match_embedding_provider_failures_total", "counter", "Embedding calls that fell through to the next provider", [
+            ({"provider": provider.name}, provider.failures) for provider in embedding_providers
+        ]),
+    ]
+    if "llm_response" in cache_stats:
+        families.append(("resume_match_llm_requests_in_flight", "gauge", "Distinct LLM completions in flight", [
+            ({}, cache_stats["llm_response"]["inflight"])
+        ]))
+        families.append(("resume_match_llm_coalesced_total", "counter", "LLM requests that joined an identical in-flight call", [
+            ({}, cache_stats["llm_response"]["coalesced"])
+        ]))
+    if openai_client is not None:
+        pool_stats = openai_client.stats()
+        families.append(("resume_match_openai_requests_in_flight", "gauge", "OpenAI calls in flight", [
+            ({}, pool_stats["in_flight"])
+        ]))
+        families.append(("resume_match_openai_retries_total", "counter", "OpenAI calls retried after a transient error", [
+            ({}, pool_stats["retries"])
+        ]))
+    if cpu_pool is not None:
+        pool_stats = cpu_pool.stats()
+        families.append(("resume_match_cpu_pool_tasks", "gauge", "CPU pool tasks by state", [
+            ({"state": state}, pool_stats[state]) for state in ("running", "waiting")
+        ]))
+        families.append(("resume_match_cpu_pool_events_total", "counter", "CPU pool task outcomes", [
+            ({"event": event}, pool_stats[event]) for event in ("completed", "rejected", "timeouts", "recycles")
+        ]))
+    if job_queue is not None:
+        queue_stats = job_queue.stats()
+        families.append(("resume_match_job_queue_jobs", "gauge", "Analysis jobs by status", [
+            ({"status": status}, queue_stats[status]) for status in ("queued", "running", "completed", "failed")
+        ]))
+        families.append(("resume_match_job_queue_rejected_total", "counter", "Submissions rejected because the queue was full", [
+            ({}, queue_stats["rejected"])
+        ]))
+    if admission_limiters:
+        route_stats = {path: limiter.stats() for path, limiter in admission_limiters.items()}
+        families.append(("resume_match_admission_requests", "gauge", "Requests holding or waiting for a route slot", [
+            ({"route": path, "state": state}, stats[key])
+            for path, stats in route_stats.items() for state, key in (("running", "in_flight"), ("waiting", "queued"))
+        ]))
+    return families
+
+
+metrics.REGISTRY.add_collector(collect_component_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics for this worker process."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health/live")
+async def liveness():
+    """The process is up and its event loop responds; says nothing about models or upstreams."""
+    return {"status": "alive"}
+
+
+def model_status() -> dict:
+    return {
+        "openai": openai_client is not None,
+        "spacy": nlp_ready
+    }
+
+
+@app.get("/health/ready")
+async def readiness():
+    """200 once models are loaded and warmed up, 503 while starting or shutting down."""
+    body = {
+        "ready": ready,
+        "models": model_status(),
+        "warmup_seconds": round(warmup_seconds, 3) if warmup_seconds is not None else None,
+        "warmup_error": warmup_error
+    }
+    if not ready:
+        return JSONResponse(body, status_code=503, headers={"Retry-After": "2"})
+    return body
+
+
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
-        "models": {
-            "openai": openai_client is not None,
-            "spacy": nlp is not None
-        },
-        "model": "openai"
+        "ready": ready,
+        # Kept for clients that check it before sending work; true once warm-up has finished
+        "model_loaded": ready,
+        "models": model_status(),
+        "warmup_seconds": warmup_seconds,
+        "model": "openai",
+        "embedding_cache": embedding_cache.stats() if embedding_cache is not None else None,
+        "parsed_resume_cache": parsed_resume_cache.stats() if parsed_resume_cache is not None else None,
+        "llm_cache": llm_cache.stats() if llm_cache is not None else None,
+        "job_queue": job_queue.stats() if job_queue is not None else None,
+        "admission": {path: limiter.stats() for path, limiter in admission_limiters.items()},
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None,
+        "embedding_providers": [provider.stats() for provider in embedding_providers],
+        "openai_pool": openai_client.stats() if openai_client is not None else None,
+        "cpu_pool": cpu_pool.stats() if cpu_pool is not None else None,
+        "vector_indexes": {kind: index.stats() for kind, index in vector_indexes.items()},
+        "job_artifacts": job_artifacts.stats() if job_artifacts is not None else None,
+        "skill_taxonomy": keyword_extraction.taxonomy.stats() if keyword_extraction.taxonomy is not None else None
     }
 
 
@@ -721,9 +2003,24 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /analyze": "Analyze resume-job description similarity with improvement suggestions",
+            "POST /analyses": "Queue an analysis and return a job ID to poll",
+            "GET /analyses/{job_id}": "Status and result of a queued analysis",
             "POST /suggest-improvements": "Get detailed suggestions to improve resume match score",
+            "POST /rank": "Rank many resumes against one job description",
+            "POST /match-jobs": "Score one resume against many job descriptions or indexed jobs",
+            "POST /index/{kind}": "Add a resume or job to the local vector index",
+            "DELETE /index/{kind}/{item_id}": "Remove a resume or job from the vector index",
+            "POST /jobs/{job_id}/index": "Precompute and store a job's embedding, keywords and summary",
+            "GET /jobs/{job_id}": "Version and stored artifacts of an indexed job",
+            "DELETE /jobs/{job_id}": "Remove a job's artifacts and its vector",
+            "POST /search/candidates": "Find the best indexed resumes for a job",
+            "POST /search/jobs": "Find the best indexed jobs for a resume",
             "POST /summarize": "Summarize job descriptions or resumes using AI",
+            "POST /taxonomy/reload": "Reload the skill taxonomy file",
             "GET /health": "Health check endpoint",
+            "GET /health/live": "Liveness probe",
+            "GET /health/ready": "Readiness probe (503 until models are warmed up)",
+            "GET /metrics": "Prometheus metrics",
             "GET /": "API information"
         },
         "usage": "uvicorn resume_match_service:app --reload --host 0.0.0.0 --port 8000"
@@ -0,0 +1,163 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_path(name: str, default: str) -> str:
+    # An explicitly empty value disables the feature backed by the path
+    value = os.getenv(name, default)
+    if value and not os.path.isabs(value):
+        value = os.path.join(SERVICE_DIR, value)
+    return value
+
+
+# OpenAI client pool
+OPENAI_MAX_CONCURRENCY = _env_int("OPENAI_MAX_CONCURRENCY", 32)
+OPENAI_MAX_CONNECTIONS = _env_int("OPENAI_MAX_CONNECTIONS", 64)
+OPENAI_TIMEOUT_SECONDS = _env_float("OPENAI_TIMEOUT_SECONDS", 30.0)
+OPENAI_MAX_RETRIES = _env_int("OPENAI_MAX_RETRIES", 3)
+OPENAI_BACKOFF_BASE_SECONDS = _env_float("OPENAI_BACKOFF_BASE_SECONDS", 0.5)
+OPENAI_BACKOFF_MAX_SECONDS = _env_float("OPENAI_BACKOFF_MAX_SECONDS", 8.0)
+
+# CPU-bound work (document parsing, spaCy)
+CPU_POOL_MODE = os.getenv("CPU_POOL_MODE", "process")
+CPU_POOL_START_METHOD = os.getenv("CPU_POOL_START_METHOD", "spawn")
+CPU_POOL_WORKERS = _env_int("CPU_POOL_WORKERS", os.cpu_count() or 2)
+CPU_POOL_MAX_PENDING = _env_int("CPU_POOL_MAX_PENDING", 64)
+CPU_TASK_TIMEOUT_SECONDS = _env_float("CPU_TASK_TIMEOUT_SECONDS", 30.0)
+
+CACHE_DIR = _env_path("CACHE_DIR", ".cache")
+
+# Embeddings, tried in order: "openai", "hashing" (local feature hashing), "spacy" (local word vectors)
+EMBEDDING_PROVIDERS = [p.strip() for p in os.getenv("EMBEDDING_PROVIDERS", "openai").split(",") if p.strip()]
+HASHING_EMBEDDING_DIM = _env_int("HASHING_EMBEDDING_DIM", 1024)
+SPACY_VECTORS_MODEL = os.getenv("SPACY_VECTORS_MODEL", "en_core_web_md")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_CACHE_MEMORY_ITEMS = _env_int("EMBEDDING_CACHE_MEMORY_ITEMS", 2048)
+EMBEDDING_CACHE_PATH = _env_path("EMBEDDING_CACHE_PATH", os.path.join(CACHE_DIR, "embeddings.sqlite3"))
+EMBEDDING_CACHE_DISK_ITEMS = _env_int("EMBEDDING_CACHE_DISK_ITEMS", 100000)
+# Cached vectors are stored normalized as "float32" (4 bytes/dim) or "int8" (1 byte/dim, ~0.001 cosine error)
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")
+EMBEDDING_BATCH_SIZE = _env_int("EMBEDDING_BATCH_SIZE", 64)
+EMBEDDING_BATCH_WINDOW_MS = _env_float("EMBEDDING_BATCH_WINDOW_MS", 5.0)
+
+# Long documents are split into section-aware chunks of at most CHUNK_MAX_TOKENS
+# tokens, embedded (and cached) chunk by chunk and pooled: "mean" averages the chunk
+# vectors, "max_sim" scores each job chunk by its best resume chunk. 0 sends every
+# text whole, cut to EMBEDDING_MAX_TOKENS. Counts are exact when tiktoken is installed.
+CHUNK_MAX_TOKENS = _env_int("CHUNK_MAX_TOKENS", 512)
+EMBEDDING_MAX_TOKENS = _env_int("EMBEDDING_MAX_TOKENS", 8191)
+SIMILARITY_POOLING = os.getenv("SIMILARITY_POOLING", "mean")
+
+# Text extraction stops after this many pages / characters (0 = no limit)
+RESUME_MAX_PAGES = _env_int("RESUME_MAX_PAGES", 20)
+RESUME_MAX_CHARS = _env_int("RESUME_MAX_CHARS", 30000)
+
+# Bulk keyword extraction: texts per nlp.pipe batch (one CPU pool task each) and
+# spaCy processes per batch. Values above 1 need CPU_POOL_MODE=thread; in process
+# mode the pool workers are daemonic, so it is reset to 1 with a warning.
+SPACY_BATCH_SIZE = _env_int("SPACY_BATCH_SIZE", 32)
+SPACY_N_PROCESS = _env_int("SPACY_N_PROCESS", 1)
+
+# Startup. Models load and warm up in the background after the server starts
+# listening; /health/ready reports 503 until that finishes. A missing spaCy model
+# is only downloaded when SPACY_AUTO_DOWNLOAD is set. PRELOAD_MODELS loads it at
+# import time so processes forked afterwards (gunicorn --preload, or the CPU pool
+# with CPU_POOL_START_METHOD=fork) share it instead of each loading a copy.
+SPACY_AUTO_DOWNLOAD = _env_bool("SPACY_AUTO_DOWNLOAD", False)
+PRELOAD_MODELS = _env_bool("PRELOAD_MODELS", False)
+MODEL_LOAD_TIMEOUT_SECONDS = _env_float("MODEL_LOAD_TIMEOUT_SECONDS", 300.0)
+WARMUP_EMBEDDINGS = _env_bool("WARMUP_EMBEDDINGS", True)
+
+# Skill taxonomy (canonical skill -> aliases); empty disables it. The file is
+# re-read when it changes, checked at most every SKILL_TAXONOMY_CHECK_SECONDS.
+SKILL_TAXONOMY_PATH = _env_path("SKILL_TAXONOMY_PATH", "skills_taxonomy.json")
+SKILL_TAXONOMY_CHECK_SECONDS = _env_float("SKILL_TAXONOMY_CHECK_SECONDS", 5.0)
+
+# Matched/missing keywords returned per response (0 = no limit)
+KEYWORD_MATCH_LIMIT = _env_int("KEYWORD_MATCH_LIMIT", 10)
+
+# Parsed resumes (text and keywords) keyed by SHA-256 of the file bytes; disk tier is off unless a path is set
+PARSED_RESUME_CACHE_ITEMS = _env_int("PARSED_RESUME_CACHE_ITEMS", 1000)
+PARSED_RESUME_CACHE_PATH = _env_path("PARSED_RESUME_CACHE_PATH", "")
+PARSED_RESUME_CACHE_DISK_ITEMS = _env_int("PARSED_RESUME_CACHE_DISK_ITEMS", 10000)
+
+# LLM completion cache keyed by the full request; set a path to share it across workers
+LLM_CACHE_ITEMS = _env_int("LLM_CACHE_ITEMS", 1000)
+LLM_CACHE_TTL_SECONDS = _env_float("LLM_CACHE_TTL_SECONDS", 86400.0)
+LLM_CACHE_PATH = _env_path("LLM_CACHE_PATH", "")
+LLM_CACHE_DISK_ITEMS = _env_int("LLM_CACHE_DISK_ITEMS", 10000)
+
+# Background analysis queue (POST /analyses); workers 0 disables it, an empty path keeps jobs in memory
+JOB_QUEUE_PATH = _env_path("JOB_QUEUE_PATH", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+JOB_QUEUE_WORKERS = _env_int("JOB_QUEUE_WORKERS", 4)
+JOB_QUEUE_MAX_QUEUED = _env_int("JOB_QUEUE_MAX_QUEUED", 1000)
+JOB_RESULT_TTL_SECONDS = _env_float("JOB_RESULT_TTL_SECONDS", 3600.0)
+JOB_MAX_ATTEMPTS = _env_int("JOB_MAX_ATTEMPTS", 3)
+JOB_RETRY_DELAY_SECONDS = _env_float("JOB_RETRY_DELAY_SECONDS", 2.0)
+JOB_LEASE_SECONDS = _env_float("JOB_LEASE_SECONDS", 300.0)
+JOB_POLL_SECONDS = _env_float("JOB_POLL_SECONDS", 1.0)
+JOB_WEBHOOK_TIMEOUT_SECONDS = _env_float("JOB_WEBHOOK_TIMEOUT_SECONDS", 10.0)
+# Hosts callback_url may point to ("*" = any, ".example.com" = domain and subdomains; empty disables
+# callbacks). Hosts resolving to private, loopback or link-local addresses are refused unless allowed.
+JOB_WEBHOOK_ALLOWED_HOSTS = [h.strip() for h in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+JOB_WEBHOOK_ALLOW_PRIVATE = _env_bool("JOB_WEBHOOK_ALLOW_PRIVATE", False)
+
+# Add a Server-Timing header with per-stage durations to every response
+SERVER_TIMING_ENABLED = _env_bool("SERVER_TIMING_ENABLED", False)
+
+# Local vector index
+VECTOR_INDEX_DIR = _env_path("VECTOR_INDEX_DIR", os.path.join("data", "vector_index"))
+VECTOR_INDEX_APPROXIMATE = _env_bool("VECTOR_INDEX_APPROXIMATE", False)
+VECTOR_INDEX_IVF_LISTS = _env_int("VECTOR_INDEX_IVF_LISTS", 0)
+VECTOR_INDEX_IVF_PROBES = _env_int("VECTOR_INDEX_IVF_PROBES", 8)
+VECTOR_INDEX_IVF_MIN_ROWS = _env_int("VECTOR_INDEX_IVF_MIN_ROWS", 2048)
+
+# Job texts and precomputed job artifacts (embeddings, keywords, summary) written by
+# POST /jobs/{job_id}/index and POST /index/jobs (empty disables job IDs in match requests),
+# and keyword lists of job descriptions sent as text, kept in memory
+JOB_ARTIFACT_STORE_PATH = _env_path("JOB_ARTIFACT_STORE_PATH", os.path.join(VECTOR_INDEX_DIR, "jobs.artifacts.sqlite3"))
+JOB_KEYWORD_CACHE_ITEMS = _env_int("JOB_KEYWORD_CACHE_ITEMS", 5000)
+# Keyword limits precomputed when a job is indexed: /analyze uses 10, /suggest-improvements 15
+JOB_INDEX_KEYWORD_LIMITS = [int(n) for n in os.getenv("JOB_INDEX_KEYWORD_LIMITS", "10,15").split(",") if n.strip()]
+# Generate the LLM summary of a job when it is indexed (needs OPENAI_API_KEY)
+JOB_INDEX_SUMMARIZE = _env_bool("JOB_INDEX_SUMMARIZE", True)
+
+# Per-route in-flight limits and wait queues as <path>=<max_in_flight>:<max_queued>, comma separated
+# (empty disables them); requests beyond the queue, or queued longer than the timeout, get a 503
+ADMISSION_LIMITS = os.getenv(
+    "ADMISSION_LIMITS",
+    "/analyze=16:64,/suggest-improvements=16:64,/summarize=16:64,/rank=4:16,/match-jobs=8:32"
+)
+ADMISSION_QUEUE_TIMEOUT_SECONDS = _env_float("ADMISSION_QUEUE_TIMEOUT_SECONDS", 10.0)
+
+# Token-bucket rate limit on POST requests per API key header, or client address without one (0 disables it)
+RATE_LIMIT_PER_MINUTE = _env_float("RATE_LIMIT_PER_MINUTE", 0.0)
+RATE_LIMIT_BURST = _env_int("RATE_LIMIT_BURST", 20)
+RATE_LIMIT_KEY_HEADER = os.getenv("RATE_LIMIT_KEY_HEADER", "X-API-Key")
+RATE_LIMIT_MAX_CLIENTS = _env_int("RATE_LIMIT_MAX_CLIENTS", 10000)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keeps dotted and symbol names whole (node.js, .net, c++, c#) and drops trailing punctuation
+_SKILL_TOKEN_PATTERN = re.compile(r"\.?[a-z0-9](?:[a-z0-9.+#]*[a-z0-9+#])?")
+
+_END = ""
+
+
+def tokenize_skill_text(text: str) -> List[str]:
+    return _SKILL_TOKEN_PATTERN.findall(text.lower())
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills and their aliases, compiled into a token trie and a hashed alias map.
+
+    The taxonomy file is a JSON object mapping each canonical skill to a list of
+    aliases, e.g. ``{"JavaScript": ["js", "ecmascript"]}``. ``canonicalize`` accepts
+    the canonical name and every alias, but ``find_skills`` only searches free text
+    for the listed aliases, so ambiguous names (Go, C, Swift) can stay out of text
+    scans by not being listed as their own alias. ``find_skills`` walks the
+    trie once over the text's tokens (longest alias wins), so the cost is linear in
+    the text length whatever the taxonomy size. ``canonicalize`` resolves a single
+    keyword with one dict lookup. The file is re-read when its mtime changes, checked
+    at most every ``check_interval`` seconds, so edits apply without a restart.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.version: Optional[str] = None
+        self.reloads = 0
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._aliases: Dict[str, str] = {}
+        self._trie: Dict[str, Any] = {}
+        self._max_alias_tokens = 0
+        self.reload()
+
+    def reload(self) -> bool:
+        """Re-reads the file. Returns True when the taxonomy changed."""
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            version = hashlib.sha256(raw).hexdigest()[:12]
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            if version == self.version:
+                return False
+
+            skills = json.loads(raw)
+            if not isinstance(skills, dict):
+                raise ValueError("Skill taxonomy must be a JSON object of canonical skill -> aliases")
+            aliases, trie, max_tokens = self._compile(skills)
+            # Swap whole structures so concurrent readers never see a half-built index
+            self._aliases, self._trie, self._max_alias_tokens = aliases, trie, max_tokens
+            self.version = version
+            self.reloads += 1
+            logger.info(f"Loaded skill taxonomy {version} with {len(skills)} skills and {len(aliases)} aliases")
+            return True
+
+    @staticmethod
+    def _compile(skills: Dict[str, List[str]]) -> Tuple[Dict[str, str], Dict[str, Any], int]:
+        aliases: Dict[str, str] = {}
+        trie: Dict[str, Any] = {}
+        max_tokens = 0
+        for canonical, names in skills.items():
+            canonical_tokens = tokenize_skill_text(canonical)
+            if canonical_tokens:
+                aliases.setdefault(" ".join(canonical_tokens), canonical)
+            for name in names:
+                tokens = tokenize_skill_text(name)
+                if not tokens:
+                    continue
+                aliases.setdefault(" ".join(tokens), canonical)
+                node = trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(_END, canonical)
+                max_tokens = max(max_tokens, len(tokens))
+        return aliases, trie, max_tokens
+
+    def maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            if os.stat(self.path).st_mtime_ns != self._mtime:
+                self.reload()
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to reload skill taxonomy, keeping version {self.version}: {str(e)}")
+
+    def canonicalize(self, keyword: str) -> Optional[str]:
+        return self._aliases.get(" ".join(tokenize_skill_text(keyword)))
+
+    def find_skills(self, text: str) -> List[str]:
+        """Canonical skills mentioned in the text, most frequent first, ties by first mention."""
+        trie = self._trie
+        tokens = tokenize_skill_text(text)
+        counts: Counter = Counter()
+        i = 0
+        while i < len(tokens):
+            node = trie.get(tokens[i])
+            found, length = None, 0
+            j = i
+            while node is not None:
+                j += 1
+                if _END in node:
+                    found, length = node[_END], j - i
+                if j >= len(tokens) or j - i >= self._max_alias_tokens:
+                    break
+                node = node.get(tokens[j])
+            if found is None:
+                i += 1
+            else:
+                counts[found] += 1
+                i += length
+        # Counter keeps first-insertion order, and sorted() is stable
+        return [skill for skill, _ in sorted(counts.items(), key=lambda item: item[1], reverse=True)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "aliases": len(self._aliases),
+            "reloads": self.reloads,
+        }
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import admission
+from admission import AdmissionMiddleware, RateLimiter, RouteLimiter, parse_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(admission.time, "monotonic", fake)
+    return fake
+
+
+def test_bucket_allows_burst_then_rejects(clock):
+    limiter = RateLimiter(per_minute=60, burst=3)
+    assert [limiter.check("a") for _ in range(3)] == [None, None, None]
+    assert limiter.check("a") == pytest.approx(1.0)
+    assert (limiter.allowed, limiter.rejected) == (3, 1)
+
+
+def test_bucket_refills_at_the_configured_rate(clock):
+    limiter = RateLimiter(per_minute=30, burst=2)
+    limiter.check("a")
+    limiter.check("a")
+    # 30 per minute is one token every 2 seconds
+    clock.now += 1.0
+    assert limiter.check("a") == pytest.approx(1.0)
+    clock.now += 1.0
+    assert limiter.check("a") is None
+    assert limiter.check("a") == pytest.approx(2.0)
+
+
+def test_bucket_refill_is_capped_at_burst(clock):
+    limiter = RateLimiter(per_minute=60, burst=2)
+    limiter.check("a")
+    clock.now += 3600
+    assert [limiter.check("a") for _ in range(3)] == [None, None, pytest.approx(1.0)]
+
+
+def test_clients_have_separate_buckets(clock):
+    limiter = RateLimiter(per_minute=60, burst=1)
+    assert limiter.check("a") is None
+    assert limiter.check("a") is not None
+    assert limiter.check("b") is None
+
+
+def test_least_recently_seen_clients_are_dropped(clock):
+    limiter = RateLimiter(per_minute=60, burst=1, max_clients=2)
+    for client in ("a", "b", "c"):
+        assert limiter.check(client) is None
+    assert limiter.stats()["clients"] == 2
+    # "a" was dropped, so it starts with a full bucket again; "c" is still empty
+    assert limiter.check("a") is None
+    assert limiter.check("c") is not None
+
+
+def test_parse_limits():
+    assert parse_limits("/analyze=16:64, /rank=4") == {"/analyze": (16, 64), "/rank": (4, 0)}
+    with pytest.raises(ValueError):
+        parse_limits("/analyze")
+
+
+def test_route_limiter_queues_then_rejects():
+    async def scenario():
+        limiter = RouteLimiter("/analyze", max_in_flight=1, max_queued=1, queue_timeout=5.0)
+        assert await limiter.acquire() is None
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.stats()["queued"] == 1
+        # The queue is full
+        assert await limiter.acquire() is not None
+        limiter.release(0.5)
+        assert await waiter is None
+        assert limiter.stats()["in_flight"] == 1
+        limiter.release(0.5)
+        assert limiter.stats()["in_flight"] == 0
+        assert (limiter.admitted, limiter.rejected) == (2, 1)
+
+    asyncio.run(scenario())
+
+
+def test_route_limiter_times_out_queued_requests():
+    async def scenario():
+        limiter = RouteLimiter("/analyze", max_in_flight=1, max_queued=4, queue_timeout=0.05)
+        assert await limiter.acquire() is None
+        assert await limiter.acquire() is not None
+        assert limiter.timeouts == 1
+        assert limiter.stats()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_middleware_returns_429_with_retry_after():
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/analyze", ok, methods=["GET", "POST"])])
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiters={"/analyze": RouteLimiter("/analyze", 4, 4, 1.0)},
+        rate_limiter=RateLimiter(per_minute=6, burst=1),
+    )
+    with TestClient(app) as client:
+        assert client.post("/analyze", headers={"X-API-Key": "one"}).status_code == 200
+        rejected = client.post("/analyze", headers={"X-API-Key": "one"})
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == "10"
+        assert rejected.json() == {"detail": "Rate limit exceeded. Please retry later."}
+        # Other keys and non-POST requests are not limited by this client's bucket
+        assert client.post("/analyze", headers={"X-API-Key": "two"}).status_code == 200
+        assert client.get("/analyze", headers={"X-API-Key": "one"}).status_code == 200
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from benchmarks import corpus
+from chunking import TokenCounter, chunk_text, split_sections
+
+
+@pytest.fixture(scope="module")
+def counter():
+    return TokenCounter("text-embedding-3-small")
+
+
+def resume_text(seed, pages=3):
+    rng = random.Random(seed)
+    lines = corpus.resume_lines(rng, pages, corpus._skills()[:12])
+    # A run-on paragraph and an unbroken blob exercise the sentence and character splits
+    lines.insert(5, " ".join(["Owned the release process end to end and mentored new engineers."] * 40))
+    lines.insert(9, "x" * 5000)
+    return "\n".join(lines)
+
+
+def body(chunk):
+    # The section heading is repeated at the top of each of its chunks
+    if chunk.section and chunk.text.startswith(chunk.section + "\n"):
+        return chunk.text[len(chunk.section) + 1:]
+    return chunk.text
+
+
+def squeeze(text):
+    return "".join(text.split())
+
+
+def test_short_text_is_one_unchanged_chunk(counter):
+    text = "EXPERIENCE\nBuilt APIs in Python.\n"
+    chunks = chunk_text(text, counter, 512)
+    assert len(chunks) == 1
+    assert chunks[0].text == text
+    assert chunks[0].tokens == counter.count(text)
+
+
+@pytest.mark.parametrize("max_tokens", [16, 64, 256, 512])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_chunks_respect_the_token_limit(counter, max_tokens, seed):
+    chunks = chunk_text(resume_text(seed), counter, max_tokens)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert 0 < chunk.tokens <= max_tokens
+        assert chunk.tokens == counter.count(chunk.text)
+
+
+@pytest.mark.parametrize("max_tokens", [16, 64, 512])
+def test_chunks_cover_the_text_once_in_order(counter, max_tokens):
+    text = resume_text(4)
+    chunks = chunk_text(text, counter, max_tokens)
+    # Chunks do not overlap: apart from repeated headings, every character appears exactly once
+    expected = "".join(squeeze("\n".join(lines)) for _, lines in split_sections(text))
+    assert "".join(squeeze(body(chunk)) for chunk in chunks) == expected
+
+
+def test_chunks_repeat_their_section_heading(counter):
+    text = "SKILLS\n" + "\n".join(f"Skill line {i} with Python, SQL and Docker." for i in range(80))
+    chunks = chunk_text(text, counter, 64)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.section == "SKILLS"
+        assert chunk.text.startswith("SKILLS\n")
+
+
+def test_editing_one_section_keeps_other_chunks(counter):
+    text = resume_text(5)
+    sections = split_sections(text)
+    edited_heading = next(heading for heading, _ in sections if heading)
+    edited = text.replace(f"{edited_heading}\n", f"{edited_heading}\nAdded one more line to this section.\n", 1)
+
+    before = chunk_text(text, counter, 128)
+    after = chunk_text(edited, counter, 128)
+    unchanged = [chunk.text for chunk in before if chunk.section != edited_heading]
+    assert unchanged
+    assert [chunk.text for chunk in after if chunk.section != edited_heading] == unchanged
+
+
+@pytest.mark.parametrize("max_tokens", [1, 8, 100])
+def test_split_pieces_respect_the_token_limit(counter, max_tokens):
+    text = "Designed a billing pipeline. " * 50 + "y" * 3000 + " " + "日本語のテキスト" * 20
+    pieces = counter.split(text, max_tokens)
+    assert all(counter.count(piece) <= max_tokens for piece in pieces)
+    assert squeeze("".join(pieces)) == squeeze(text)
+    assert counter.truncate(text, max_tokens) == pieces[0]
@@ -0,0 +1,88 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from cpu_pool import CPUPool, CPUPoolSaturated, CPUTaskTimeout
+
+
+def test_rejects_once_workers_and_queue_are_full():
+    release = threading.Event()
+
+    async def scenario():
+        pool = CPUPool(max_workers=1, max_pending=1, task_timeout=5.0, mode="thread")
+        try:
+            running = asyncio.ensure_future(pool.run(release.wait))
+            queued = asyncio.ensure_future(pool.run(math.sqrt, 16))
+            await asyncio.sleep(0.05)
+            assert (pool.running, pool.waiting) == (1, 1)
+            with pytest.raises(CPUPoolSaturated):
+                await pool.run(math.sqrt, 9)
+
+            release.set()
+            assert await running is True
+            assert await queued == 4.0
+            assert pool.stats()["completed"] == 2
+            assert pool.stats()["rejected"] == 1
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_thread_task_times_out_without_recycling():
+    release = threading.Event()
+
+    async def scenario():
+        pool = CPUPool(max_workers=1, task_timeout=0.05, mode="thread")
+        try:
+            with pytest.raises(CPUTaskTimeout):
+                await pool.run(release.wait)
+            # The slot is freed even though the thread is still busy
+            assert pool.running == 0
+            assert (pool.timeouts, pool.recycles) == (1, 0)
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_process_task_timeout_recycles_the_pool():
+    async def scenario():
+        pool = CPUPool(max_workers=1, task_timeout=1.0, mode="process")
+        try:
+            old_executor = pool._executor
+            start = time.monotonic()
+            with pytest.raises(CPUTaskTimeout):
+                await pool.run(time.sleep, 30)
+            assert time.monotonic() - start < 10
+            assert (pool.timeouts, pool.recycles) == (1, 1)
+            assert pool._executor is not old_executor
+            # The replacement pool serves new tasks
+            assert await pool.run(math.sqrt, 16, timeout=30.0) == 4.0
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_broken_process_pool_is_retried_once_on_a_fresh_pool():
+    async def scenario():
+        pool = CPUPool(max_workers=1, task_timeout=30.0, mode="process")
+        try:
+            # The worker exits on both attempts, so the second failure is raised
+            with pytest.raises(BrokenProcessPool):
+                await pool.run(os._exit, 1)
+            assert pool.recycles == 2
+            # A pool broken by the retry is replaced too
+            assert await pool.run(math.sqrt, 16) == 4.0
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
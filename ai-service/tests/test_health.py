@@ -0,0 +1,62 @@
+import asyncio
+import importlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    # Settings are read at import, so the service is imported once the environment points at scratch storage
+    directory = str(tmp_path_factory.mktemp("service"))
+    environment = {
+        "EMBEDDING_PROVIDERS": "hashing",
+        "CPU_POOL_MODE": "thread",
+        "CPU_POOL_WORKERS": "1",
+        "JOB_QUEUE_WORKERS": "0",
+        "CACHE_DIR": directory,
+        "VECTOR_INDEX_DIR": os.path.join(directory, "vector_index"),
+        "OPENAI_API_KEY": "",
+    }
+    saved = {name: os.environ.get(name) for name in environment}
+    os.environ.update(environment)
+    try:
+        yield importlib.import_module("resume_match_service")
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_ready_only_after_warm_up(service, monkeypatch):
+    release = None
+    real_warm_up = service.warm_up_models
+
+    async def gated_warm_up():
+        nonlocal release
+        release = asyncio.Event()
+        await release.wait()
+        await real_warm_up()
+
+    monkeypatch.setattr(service, "warm_up_models", gated_warm_up)
+    with TestClient(service.app) as client:
+        # Live while the models load, but not ready
+        assert client.get("/health/live").json() == {"status": "alive"}
+        starting = client.get("/health/ready")
+        assert starting.status_code == 503
+        assert starting.headers["Retry-After"] == "2"
+        assert starting.json()["ready"] is False
+        assert client.get("/health").json()["model_loaded"] is False
+
+        client.portal.call(release.set)
+        client.portal.call(asyncio.wait_for, service.warmup_task, 30)
+        ready = client.get("/health/ready")
+        assert ready.status_code == 200
+        assert ready.json()["ready"] is True
+        assert client.get("/health").json()["model_loaded"] is True
+
+    # Shutdown turns readiness off again
+    assert service.ready is False
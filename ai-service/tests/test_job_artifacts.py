@@ -0,0 +1,52 @@
+import asyncio
+import os
+
+import numpy as np
+
+from caching import JobArtifactStore
+
+
+def test_concurrent_artifact_writes_keep_each_other(tmp_path):
+    async def scenario():
+        path = os.path.join(str(tmp_path), "jobs.sqlite3")
+        # Two workers on the same file, each holding the record as first read
+        first, second = JobArtifactStore(path), JobArtifactStore(path)
+        try:
+            record, changed = await first.put_text("job-1", "Senior Python engineer")
+            assert changed
+            other = await second.get("job-1")
+            await asyncio.gather(
+                first.set_summary(record, {"title": "Senior Python engineer"}),
+                second.set_keywords(other, 10, ["Python"]),
+                second.set_keywords(other, 20, ["Python", "engineer"]),
+                first.set_embedding(record, "hashing", "512/8191", [{"text": "t", "tokens": 1, "section": None}],
+                                    np.ones((1, 4), dtype=np.float32)),
+            )
+            stored = await first.get("job-1")
+            assert stored["summary"] == {"title": "Senior Python engineer"}
+            assert stored["keywords"] == {"10": ["Python"], "20": ["Python", "engineer"]}
+            assert JobArtifactStore.get_embedding(stored, "hashing", "512/8191")[0] == "hashing"
+        finally:
+            first.close()
+            second.close()
+
+    asyncio.run(scenario())
+
+
+def test_writes_for_an_old_text_are_dropped(tmp_path):
+    async def scenario():
+        store = JobArtifactStore(os.path.join(str(tmp_path), "jobs.sqlite3"))
+        try:
+            old, _ = await store.put_text("job-1", "Senior Python engineer")
+            same, changed = await store.put_text("job-1", "Senior   Python engineer")
+            assert not changed and same["version"] == 1
+            new, changed = await store.put_text("job-1", "Staff Go engineer")
+            assert changed and new["version"] == 2
+
+            await store.set_summary(old, {"title": "stale"})
+            assert old["summary"] is None
+            assert (await store.get("job-1"))["summary"] is None
+        finally:
+            store.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,256 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from job_queue import COMPLETED, FAILED, QUEUED, RUNNING, CallbackNotAllowed, JobQueue, JobRetry, check_callback_url
+
+
+async def noop(payload, attachment):
+    return {"ok": True}
+
+
+def make_queue(path, **kwargs):
+    options = {"workers": 1, "poll_interval": 0.02, "retry_delay": 0.01}
+    options.update(kwargs)
+    queue = JobQueue(os.path.join(path, "jobs.sqlite3"), **options)
+    queue.register("test", noop)
+    return queue
+
+
+async def wait_for_status(queue, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await queue.get(job_id)
+        if job["status"] in statuses or time.monotonic() > deadline:
+            return job
+        await asyncio.sleep(0.02)
+
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    async def scenario():
+        queue = make_queue(str(tmp_path), lease_seconds=0.2)
+        job, _ = await queue.submit("test", {"n": 1})
+
+        # A worker claims the job and dies without finishing it
+        claimed = queue._claim()
+        assert claimed[0] == job["job_id"] and claimed[4] == 1
+        assert (await queue.get(job["job_id"]))["status"] == RUNNING
+        assert queue._claim() is None
+
+        await asyncio.sleep(0.3)
+        reclaimed = queue._claim()
+        assert reclaimed[0] == job["job_id"] and reclaimed[4] == 2
+        queue._close()
+
+    asyncio.run(scenario())
+
+
+def test_lease_is_renewed_while_the_handler_runs(tmp_path):
+    calls = []
+
+    async def slow(payload, attachment):
+        calls.append(payload)
+        await asyncio.sleep(0.5)
+        return {"ok": True}
+
+    async def scenario():
+        queue = make_queue(str(tmp_path), lease_seconds=0.15)
+        queue.register("test", slow)
+        await queue.start()
+        try:
+            job, _ = await queue.submit("test", {"n": 1})
+            await asyncio.sleep(0.3)
+            # Well past the first lease, but the job is still held by its worker
+            assert await queue._db_call(queue._claim) is None
+            finished = await wait_for_status(queue, job["job_id"], {COMPLETED, FAILED})
+        finally:
+            await queue.stop()
+        assert finished["status"] == COMPLETED
+        assert finished["attempts"] == 1
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_stale_claim_cannot_finish_or_requeue_the_job(tmp_path):
+    async def scenario():
+        queue = make_queue(str(tmp_path), lease_seconds=0.05)
+        job, _ = await queue.submit("test", {"n": 1})
+        job_id = queue._claim()[0]
+        await asyncio.sleep(0.1)
+        assert queue._claim()[4] == 2
+
+        # The first worker comes back after its lease was taken over
+        assert not queue._renew(job_id, 1)
+        assert not queue._finish(job_id, 1, COMPLETED, {"stale": True})
+        assert not queue._requeue(job_id, 1, 0.0)
+        current = await queue.get(job["job_id"])
+        assert current["status"] == RUNNING and "result" not in current
+
+        assert queue._finish(job_id, 2, COMPLETED, {"ok": True})
+        assert (await queue.get(job["job_id"]))["result"] == {"ok": True}
+        queue._close()
+
+    asyncio.run(scenario())
+
+
+def test_stale_outcome_sends_no_webhook(tmp_path):
+    notified = []
+
+    async def scenario():
+        queue = make_queue(str(tmp_path), lease_seconds=0.05)
+
+        async def notify(job_id):
+            notified.append(job_id)
+
+        queue._notify = notify
+        job, _ = await queue.submit("test", {"n": 1})
+        claimed = queue._claim()
+        await asyncio.sleep(0.1)
+        queue._claim()
+        await queue._run(*claimed)
+        assert notified == []
+        assert queue.stale_completions == 1
+        assert (await queue.get(job["job_id"]))["status"] == RUNNING
+        queue._close()
+
+    asyncio.run(scenario())
+
+
+def test_job_fails_after_max_attempts_of_expired_leases(tmp_path):
+    async def scenario():
+        queue = make_queue(str(tmp_path), lease_seconds=0.05, max_attempts=2)
+        job, _ = await queue.submit("test", {"n": 1})
+        for _ in range(2):
+            assert queue._claim() is not None
+            await asyncio.sleep(0.1)
+
+        await queue.start()
+        try:
+            finished = await wait_for_status(queue, job["job_id"], {COMPLETED, FAILED})
+        finally:
+            await queue.stop()
+        assert finished["status"] == FAILED
+        assert finished["error"]["detail"] == "Job was interrupted too many times"
+
+    asyncio.run(scenario())
+
+
+def test_retry_requeues_until_handler_succeeds(tmp_path):
+    calls = []
+
+    async def flaky(payload, attachment):
+        calls.append(payload)
+        if len(calls) == 1:
+            raise JobRetry("pool saturated")
+        return {"ok": True}
+
+    async def scenario():
+        queue = make_queue(str(tmp_path), max_attempts=3)
+        queue.register("test", flaky)
+        await queue.start()
+        try:
+            job, _ = await queue.submit("test", {"n": 1})
+            finished = await wait_for_status(queue, job["job_id"], {COMPLETED, FAILED})
+        finally:
+            await queue.stop()
+        assert finished["status"] == COMPLETED
+        assert finished["attempts"] == 2
+        assert finished["result"] == {"ok": True}
+        assert queue.retries == 1
+
+    asyncio.run(scenario())
+
+
+def test_retry_fails_once_attempts_are_used_up(tmp_path):
+    async def always_busy(payload, attachment):
+        raise JobRetry("pool saturated")
+
+    async def scenario():
+        queue = make_queue(str(tmp_path), max_attempts=2)
+        queue.register("test", always_busy)
+        await queue.start()
+        try:
+            job, _ = await queue.submit("test", {"n": 1})
+            finished = await wait_for_status(queue, job["job_id"], {COMPLETED, FAILED})
+        finally:
+            await queue.stop()
+        assert finished["status"] == FAILED
+        assert finished["error"] == {"status_code": 503, "detail": "pool saturated"}
+        assert finished["attempts"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_stop_puts_running_jobs_back_without_using_an_attempt(tmp_path):
+    started = None
+
+    async def blocking(payload, attachment):
+        started.set()
+        await asyncio.Event().wait()
+
+    async def scenario():
+        nonlocal started
+        started = asyncio.Event()
+        queue = make_queue(str(tmp_path))
+        queue.register("test", blocking)
+        await queue.start()
+        job, _ = await queue.submit("test", {"n": 1})
+        await asyncio.wait_for(started.wait(), 5.0)
+        await queue.stop()
+
+        reopened = make_queue(str(tmp_path))
+        requeued = await reopened.get(job["job_id"])
+        assert requeued["status"] == QUEUED
+        assert requeued["attempts"] == 0
+        assert reopened._claim()[4] == 1
+        reopened._close()
+
+    asyncio.run(scenario())
+
+
+def test_duplicate_submission_returns_queued_job(tmp_path):
+    async def scenario():
+        queue = make_queue(str(tmp_path))
+        first, first_deduplicated = await queue.submit("test", {"n": 1}, b"resume", priority=1)
+        second, second_deduplicated = await queue.submit("test", {"n": 1}, b"resume", priority=5)
+        other, _ = await queue.submit("test", {"n": 1}, b"other resume")
+        assert not first_deduplicated and second_deduplicated
+        assert second["job_id"] == first["job_id"]
+        assert second["priority"] == 5
+        assert other["job_id"] != first["job_id"]
+        queue._close()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://10.0.0.5/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/hook",
+    "ftp://8.8.8.8/hook",
+])
+def test_callback_to_private_address_or_other_scheme_is_rejected(url):
+    with pytest.raises(CallbackNotAllowed):
+        asyncio.run(check_callback_url(url, ["*"]))
+
+
+def test_callback_host_must_be_allow_listed():
+    asyncio.run(check_callback_url("https://8.8.8.8/hook", ["8.8.8.8"]))
+    with pytest.raises(CallbackNotAllowed):
+        asyncio.run(check_callback_url("https://8.8.4.4/hook", ["8.8.8.8", ".example.com"]))
+
+
+def test_callback_url_needs_an_allow_list(tmp_path):
+    async def scenario():
+        queue = make_queue(str(tmp_path))
+        try:
+            with pytest.raises(CallbackNotAllowed):
+                await queue.submit("test", {"n": 1}, callback_url="https://8.8.8.8/hook")
+        finally:
+            queue._close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,42 @@
+import pytest
+
+from keyword_extraction import extract_keywords_fallback
+
+RESUME = """Jane Doe
+Senior Software Engineer
+
+Built REST services in Node.js and Express, deployed with docker and kubernetes.
+Wrote C++ and C# tooling; migrated a .NET Framework app to ASP.NET Core.
+Led the Machine Learning Platform team. Used python, pandas and terraform daily."""
+
+LOWERCASE_RESUME = """experience: maintained a vue.js front end and a django api on aws.
+skills: postgresql, redis, graphql, typescript."""
+
+
+def test_capitalized_words_then_tech_names_then_phrases():
+    assert extract_keywords_fallback(RESUME, max_keywords=25) == [
+        "Jane Doe\nSenior Software Engineer\n\nBuilt REST", "Node", "Express", "Wrote", "NET Framework",
+        "ASP", "NET Core", "Led", "Machine Learning Platform", "Used",
+        "Node.js", "docker", "kubernetes", "C++", "C#", ".NET", "ASP.NET", "python", "pandas", "terraform",
+        "Jane Doe\nSenior", "Software Engineer\n\nBuilt",
+    ]
+
+
+@pytest.mark.parametrize("max_keywords,expected", [
+    (4, ["Jane Doe\nSenior Software Engineer\n\nBuilt REST", "Node", "Express", "Wrote"]),
+    (12, ["Jane Doe\nSenior Software Engineer\n\nBuilt REST", "Node", "Express", "Wrote", "NET Framework",
+          "ASP", "NET Core", "Led", "Machine Learning Platform", "Used", "Node.js", "docker"]),
+])
+def test_stops_at_max_keywords(max_keywords, expected):
+    assert extract_keywords_fallback(RESUME, max_keywords=max_keywords) == expected
+
+
+def test_lowercase_tech_names_in_order_of_appearance():
+    assert extract_keywords_fallback(LOWERCASE_RESUME) == [
+        "vue.js", "django", "api", "aws", "postgresql", "redis", "graphql", "typescript",
+    ]
+
+
+def test_trailing_punctuation_and_case_duplicates():
+    text = "shipped on docker. Then moved from Docker to kubernetes-"
+    assert extract_keywords_fallback(text) == ["Then", "Docker", "kubernetes"]
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from keyword_matcher import RULE_EXACT, KeywordMatcher
+
+
+def pairwise_match(resume_keywords, job_keywords):
+    """The pairwise loop KeywordMatcher replaced, also reporting the credited resume keyword."""
+    resume_lower = {kw.lower() for kw in resume_keywords}
+    matched, missing, credited = [], [], {}
+    seen = set()
+    for job_kw in job_keywords:
+        job_lower = job_kw.lower()
+        if job_lower in seen:
+            continue
+        seen.add(job_lower)
+        if job_lower in resume_lower:
+            matched.append(job_kw)
+            credited[job_kw] = next(kw for kw in resume_keywords if kw.lower() == job_lower)
+            continue
+        for resume_kw in resume_keywords:
+            resume_kw_lower = resume_kw.lower()
+            if (job_lower in resume_kw_lower or
+                resume_kw_lower in job_lower or
+                job_lower.split()[0] in resume_kw_lower.split() or
+                resume_kw_lower.split()[0] in job_lower.split()):
+                matched.append(job_kw)
+                credited[job_kw] = resume_kw
+                break
+        else:
+            missing.append(job_kw)
+    return matched, missing, credited
+
+
+VOCABULARY = [
+    "python", "java", "javascript", "react", "react native", "node.js", "sql", "postgresql",
+    "docker", "kubernetes", "aws", "machine learning", "data", "data engineering", "api",
+    "rest api", "go", "c++", "senior python developer", "team lead", "lead", "scala",
+]
+
+
+def random_keywords(rng, count):
+    keywords = []
+    for _ in range(count):
+        words = rng.sample(VOCABULARY, rng.randint(1, 2))
+        keyword = " ".join(words)
+        keywords.append(keyword.title() if rng.random() < 0.3 else keyword)
+    return keywords
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_pairwise_loop(seed):
+    rng = random.Random(seed)
+    resume_keywords = random_keywords(rng, rng.randint(0, 15))
+    job_keywords = random_keywords(rng, rng.randint(1, 15))
+
+    matched, missing, provenance = KeywordMatcher(resume_keywords).match(job_keywords)
+    expected_matched, expected_missing, credited = pairwise_match(resume_keywords, job_keywords)
+
+    assert matched == expected_matched
+    assert missing == expected_missing
+    for keyword in matched:
+        assert provenance[keyword]["resume_keyword"].lower() == credited[keyword].lower()
+
+
+def test_reports_rule_and_applies_limit():
+    matcher = KeywordMatcher(["Python", "React Native", "AWS"])
+
+    matched, missing, provenance = matcher.match(["python", "React", "Docker", "Kubernetes"], limit=1)
+
+    assert matched == ["python"]
+    assert missing == ["Docker"]
+    assert provenance == {"python": {"resume_keyword": "Python", "rule": RULE_EXACT}}
+
+
+def test_empty_resume_vocabulary_matches_nothing():
+    matched, missing, provenance = KeywordMatcher([]).match(["Python", "python"])
+
+    assert matched == []
+    assert missing == ["Python"]
+    assert provenance == {}
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+
+from caching import LLMResponseCache
+
+REQUEST = {"model": "test", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def is_json(content):
+    try:
+        json.loads(content)
+    except ValueError:
+        return False
+    return True
+
+
+def test_content_that_fails_the_check_is_not_cached():
+    async def scenario():
+        cache = LLMResponseCache(max_items=8, ttl_seconds=60)
+        replies = iter(["not json", '{"ok": true}'])
+
+        async def create():
+            return next(replies)
+
+        assert await cache.get_or_create(REQUEST, create, cacheable=is_json) == "not json"
+        assert await cache.get_or_create(REQUEST, create, cacheable=is_json) == '{"ok": true}'
+        assert await cache.get_or_create(REQUEST, create, cacheable=is_json) == '{"ok": true}'
+        assert cache.upstream_calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_identical_streams_share_one_upstream_call():
+    async def scenario():
+        cache = LLMResponseCache(max_items=8, ttl_seconds=60)
+        release = asyncio.Event()
+
+        async def stream():
+            yield '{"ok": '
+            await release.wait()
+            yield "true}"
+
+        async def collect():
+            return [piece async for piece in cache.get_or_stream(REQUEST, stream, cacheable=is_json)]
+
+        leader = asyncio.ensure_future(collect())
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(collect()), asyncio.ensure_future(cache.get_or_create(REQUEST, None))]
+        await asyncio.sleep(0)
+        release.set()
+        # The first caller sees the pieces as they arrive; the others get the whole completion
+        assert await leader == ['{"ok": ', "true}"]
+        assert await followers[0] == ['{"ok": true}']
+        assert await followers[1] == '{"ok": true}'
+        assert (cache.upstream_calls, cache.coalesced) == (1, 2)
+        # Cached afterwards
+        assert [piece async for piece in cache.get_or_stream(REQUEST, stream)] == ['{"ok": true}']
+        assert cache.upstream_calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_stream_error_reaches_every_caller_and_is_not_cached():
+    async def scenario():
+        cache = LLMResponseCache(max_items=8, ttl_seconds=60)
+
+        async def broken():
+            yield "partial"
+            raise RuntimeError("upstream closed")
+
+        pieces = []
+        with pytest.raises(RuntimeError, match="upstream closed"):
+            async for piece in cache.get_or_stream(REQUEST, broken):
+                pieces.append(piece)
+        await asyncio.sleep(0)
+        assert pieces == ["partial"]
+        assert cache.stats()["memory_items"] == 0
+        assert cache.stats()["inflight"] == 0
+
+    asyncio.run(scenario())
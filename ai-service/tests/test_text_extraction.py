@@ -0,0 +1,62 @@
+import pytest
+
+from benchmarks import corpus
+from text_extraction import TextExtractionError, _join_limited, extract_text_from_docx, extract_text_from_pdf
+
+PAGES = 5
+LINES = [f"Page {page} line {i} of the sample resume" for page in range(1, PAGES + 1) for i in range(corpus.LINES_PER_PAGE)]
+
+
+@pytest.fixture(scope="module")
+def pdf():
+    return corpus.make_pdf(LINES)
+
+
+@pytest.fixture(scope="module")
+def docx():
+    return corpus.make_docx(LINES)
+
+
+def pages_in(text):
+    return sorted({int(line.split()[1]) for line in text.splitlines()})
+
+
+def test_pdf_without_limits_reads_every_page(pdf):
+    assert extract_text_from_pdf(pdf) == "\n".join(LINES)
+
+
+@pytest.mark.parametrize("max_pages,expected", [(1, [1]), (2, [1, 2]), (PAGES + 3, list(range(1, PAGES + 1)))])
+def test_pdf_page_limit(pdf, max_pages, expected):
+    assert pages_in(extract_text_from_pdf(pdf, max_pages)) == expected
+
+
+@pytest.mark.parametrize("extract,document", [(extract_text_from_pdf, "pdf"), (extract_text_from_docx, "docx")])
+def test_character_limit_keeps_a_prefix(request, extract, document):
+    content = request.getfixturevalue(document)
+    full = extract(content)
+    limited = extract(content, None, 500)
+    assert len(limited) == 500
+    assert full.startswith(limited)
+
+
+def test_docx_ignores_the_page_limit(docx):
+    assert extract_text_from_docx(docx, 1) == "\n".join(LINES)
+
+
+def test_reading_stops_once_the_character_limit_is_reached():
+    consumed = []
+
+    def parts():
+        for i in range(100):
+            consumed.append(i)
+            yield "x" * 99
+
+    assert len(_join_limited(parts(), 250)) == 250
+    # Three 100-character parts reach the limit; nothing after them is read
+    assert consumed == [0, 1, 2]
+
+
+@pytest.mark.parametrize("extract", [extract_text_from_pdf, extract_text_from_docx])
+def test_unreadable_document_raises_extraction_error(extract):
+    with pytest.raises(TextExtractionError):
+        extract(b"not a document")
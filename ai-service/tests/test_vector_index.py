@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import vectors
+from vector_index import VectorIndex
+
+DIM = 32
+
+
+def clustered_vectors(rng, count, clusters=40):
+    # Embeddings of real documents cluster by topic; uniform random vectors have no structure for IVF to use
+    centers = rng.normal(size=(clusters, DIM))
+    return vectors.normalize(centers[rng.integers(0, clusters, count)] + 0.35 * rng.normal(size=(count, DIM)))
+
+
+def brute_force(matrix, query, top_k):
+    scores = matrix @ vectors.normalize(query)
+    return list(np.argsort(-scores)[:top_k])
+
+
+@pytest.fixture(scope="module")
+def populated(tmp_path_factory):
+    rng = np.random.default_rng(7)
+    matrix = clustered_vectors(rng, 3000)
+    index = VectorIndex(str(tmp_path_factory.mktemp("index")), "test", ivf_probes=8, ivf_min_rows=1000)
+    index.add([(f"item-{i}", vector, {"row": i}) for i, vector in enumerate(matrix)], model="test-model")
+    queries = clustered_vectors(rng, 50)
+    return index, matrix, queries
+
+
+def test_ivf_is_trained_once_enough_rows_exist(populated):
+    index, matrix, _ = populated
+    stats = index.stats()
+    assert stats["ivf_trained_rows"] == len(matrix)
+    assert stats["ivf_lists"] == int(np.sqrt(len(matrix)))
+
+
+def test_exact_search_matches_brute_force(populated):
+    index, matrix, queries = populated
+    for query in queries:
+        expected = [f"item-{i}" for i in brute_force(matrix, query, 10)]
+        assert [item_id for item_id, _, _ in index.search(query, top_k=10)] == expected
+
+
+def test_ivf_recall_against_brute_force(populated):
+    index, matrix, queries = populated
+    found = 0
+    for query in queries:
+        expected = {f"item-{i}" for i in brute_force(matrix, query, 10)}
+        results = index.search(query, top_k=10, approximate=True)
+        assert len(results) == 10
+        assert [score for _, score, _ in results] == sorted((score for _, score, _ in results), reverse=True)
+        found += len(expected & {item_id for item_id, _, _ in results})
+    assert found / (10 * len(queries)) >= 0.9
+
+
+def test_ivf_search_sees_rows_added_after_training(populated):
+    index, _, queries = populated
+    index.add([("late", queries[0], {"late": True})], model="test-model")
+    try:
+        item_id, score, metadata = index.search(queries[0], top_k=1, approximate=True)[0]
+        assert item_id == "late" and score == pytest.approx(1.0, abs=1e-5)
+        assert metadata == {"late": True}
+    finally:
+        index.delete("late")
+    assert "late" not in [item_id for item_id, _, _ in index.search(queries[0], top_k=5, approximate=True)]
+
+
+def test_rejects_vectors_from_another_model(populated):
+    index, matrix, _ = populated
+    with pytest.raises(ValueError):
+        index.add([("other", matrix[0], None)], model="other-model")
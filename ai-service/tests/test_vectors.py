@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pytest
+
+import vectors
+from caching import EmbeddingCache, content_key
+
+DIM = 384
+
+
+@pytest.fixture(scope="module")
+def matrix():
+    return vectors.normalize(np.random.default_rng(3).normal(size=(200, DIM)))
+
+
+def test_float32_round_trip_is_exact(matrix):
+    for vector in matrix:
+        data = vectors.encode(vector)
+        assert len(data) == 1 + 4 * DIM
+        decoded = vectors.decode(data)
+        assert decoded.dtype == np.float32
+        assert np.array_equal(decoded, vector)
+
+
+def test_int8_round_trip_stays_close(matrix):
+    data = vectors.encode(matrix[0], vectors.INT8)
+    assert len(data) == 1 + 4 + DIM
+    decoded = np.stack([vectors.decode(vectors.encode(vector, vectors.INT8)) for vector in matrix])
+    assert decoded.dtype == np.float32
+    assert np.allclose(np.linalg.norm(decoded, axis=1), 1.0, atol=1e-5)
+    # Quantization error is at most half a step of peak / 127 per dimension, before renormalizing
+    assert np.abs(decoded - matrix).max() < 0.5 * np.abs(matrix).max() / 127 + 1e-3
+    # Cosine scores move by about 0.001
+    assert np.abs(decoded @ matrix[0] - matrix @ matrix[0]).max() < 0.005
+
+
+def test_zero_vector_round_trips(matrix):
+    zero = np.zeros(DIM, dtype=np.float32)
+    assert not vectors.decode(vectors.encode(zero)).any()
+    assert not vectors.decode(vectors.encode(zero, vectors.INT8)).any()
+
+
+def test_unknown_tag_is_rejected():
+    with pytest.raises(ValueError):
+        vectors.decode(b"x" + bytes(8))
+
+
+@pytest.mark.parametrize("dtype", vectors.STORAGE_DTYPES)
+def test_legacy_json_rows_are_read(tmp_path, matrix, dtype):
+    path = os.path.join(str(tmp_path), "embeddings.sqlite3")
+    EmbeddingCache(16, path, dtype=dtype).close()
+    # Rows written before vectors were packed hold an unnormalized JSON list
+    legacy = (matrix[1] * 3.0).tolist()
+    db = sqlite3.connect(path)
+    db.execute(
+        "INSERT INTO embeddings (key, model, vector, last_access) VALUES (?, ?, ?, ?)",
+        (content_key("old resume", "m"), "m", json.dumps(legacy), time.time())
+    )
+    db.commit()
+    db.close()
+
+    async def scenario():
+        cache = EmbeddingCache(16, path, dtype=dtype)
+        try:
+            (vector,) = await cache.get_many(["old resume"], "m")
+            assert cache.disk_hits == 1
+            # Served from memory, already packed, on the next lookup
+            packed = cache.memory.get(content_key("old resume", "m"))
+            assert packed[:1] == (vectors._INT8_TAG if dtype == vectors.INT8 else vectors._FLOAT32_TAG)
+            return vector
+        finally:
+            cache.close()
+
+    vector = asyncio.run(scenario())
+    assert vector.dtype == np.float32
+    assert np.allclose(vector, matrix[1], atol=0.01 if dtype == vectors.INT8 else 1e-6)
@@ -0,0 +1,53 @@
+import io
+import logging
+from typing import Iterator, Optional
+
+import pdfplumber
+from docx import Document
+
+logger = logging.getLogger(__name__)
+
+
+class TextExtractionError(ValueError):
+    """Raised when a resume document cannot be parsed."""
+
+
+def iter_pdf_pages(file_content: bytes, max_pages: Optional[int] = None) -> Iterator[str]:
+    # Only the requested pages are turned into page objects, and each is released after use
+    pages = list(range(1, max_pages + 1)) if max_pages else None
+    with pdfplumber.open(io.BytesIO(file_content), pages=pages) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            page.close()
+            if page_text:
+                yield page_text
+
+
+def _join_limited(parts: Iterator[str], max_chars: Optional[int]) -> str:
+    buffer = []
+    length = 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part) + 1
+        if max_chars and length >= max_chars:
+            break
+    text = "\n".join(buffer).strip()
+    return text[:max_chars] if max_chars else text
+
+
+def extract_text_from_pdf(file_content: bytes, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    try:
+        return _join_limited(iter_pdf_pages(file_content, max_pages), max_chars)
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {str(e)}")
+        raise TextExtractionError(f"Failed to extract text from PDF: {str(e)}")
+
+
+def extract_text_from_docx(file_content: bytes, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    # DOCX has no fixed pagination, so only the character limit applies
+    try:
+        doc = Document(io.BytesIO(file_content))
+        return _join_limited((paragraph.text for paragraph in doc.paragraphs), max_chars)
+    except Exception as e:
+        logger.error(f"Error extracting text from DOCX: {str(e)}")
+        raise TextExtractionError(f"Failed to extract text from DOCX: {str(e)}")
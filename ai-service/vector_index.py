@@ -0,0 +1,323 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import vectors
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """
+    Persistent, memory-mapped index of L2-normalized float32 embeddings.
+
+    Vectors live in ``<name>.vectors.npy`` (opened with ``mmap_mode``) and ids and
+    metadata in ``<name>.meta.json``. Exact search is a single matrix-vector product
+    followed by ``argpartition``. Once the index holds ``ivf_min_rows`` vectors an
+    inverted-file (IVF) layout is trained with spherical k-means, and approximate
+    searches only score the ``ivf_probes`` lists closest to the query.
+
+    Deletes are tombstones that are compacted away once they exceed a quarter of
+    the rows. Writers take an exclusive file lock and readers reload when another
+    process has changed the files, so all workers on a host can share one index.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        ivf_lists: int = 0,
+        ivf_probes: int = 8,
+        ivf_min_rows: int = 2048,
+    ):
+        self.directory = directory
+        self.name = name
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = max(1, ivf_probes)
+        self.ivf_min_rows = ivf_min_rows
+        self._vectors_path = os.path.join(directory, f"{name}.vectors.npy")
+        self._meta_path = os.path.join(directory, f"{name}.meta.json")
+        self._ivf_path = os.path.join(directory, f"{name}.ivf.npz")
+        self._lock_path = os.path.join(directory, f"{name}.lock")
+        self._lock = threading.RLock()
+        self._meta_mtime: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+        self._reset()
+        self._load()
+
+    def _reset(self) -> None:
+        self.model: Optional[str] = None
+        self.dim: Optional[int] = None
+        self.ids: List[Optional[str]] = []
+        self.id_to_row: Dict[str, int] = {}
+        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self.deleted = 0
+        self._vectors: Optional[np.memmap] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments: Optional[np.ndarray] = None
+        self.trained_rows = 0
+
+    # Persistence
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._reload_if_changed()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self._meta_mtime = os.stat(self._meta_path).st_mtime_ns
+        self.model = meta.get("model")
+        self.dim = meta.get("dim")
+        self.ids = meta.get("ids", [])
+        self.metadata = meta.get("metadata", {})
+        self.id_to_row = {item_id: row for row, item_id in enumerate(self.ids) if item_id is not None}
+        self.deleted = len(self.ids) - len(self.id_to_row)
+        self._alive = np.array([item_id is not None for item_id in self.ids], dtype=bool)
+        if os.path.exists(self._vectors_path):
+            self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        if os.path.exists(self._ivf_path):
+            ivf = np.load(self._ivf_path)
+            if len(ivf["assignments"]) == len(self.ids):
+                self.centroids = ivf["centroids"]
+                self.assignments = ivf["assignments"]
+                self.trained_rows = int(ivf["trained_rows"])
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = os.stat(self._meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._meta_mtime:
+            self._reset()
+            self._load()
+
+    def _save(self) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+        if self.centroids is not None:
+            np.savez(
+                self._ivf_path + ".tmp.npz",
+                centroids=self.centroids,
+                assignments=self.assignments,
+                trained_rows=self.trained_rows
+            )
+            os.replace(self._ivf_path + ".tmp.npz", self._ivf_path)
+        elif os.path.exists(self._ivf_path):
+            os.remove(self._ivf_path)
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model, "dim": self.dim, "ids": self.ids, "metadata": self.metadata}, f)
+        os.replace(tmp_path, self._meta_path)
+        self._meta_mtime = os.stat(self._meta_path).st_mtime_ns
+
+    def _write_vectors(self, matrix: np.ndarray, capacity: int) -> None:
+        tmp_path = self._vectors_path + ".tmp"
+        vectors = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+        vectors[:len(matrix)] = matrix
+        vectors.flush()
+        del vectors
+        self._vectors = None
+        os.replace(tmp_path, self._vectors_path)
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        current = np.asarray(self._vectors[:len(self.ids)]) if self._vectors is not None else np.zeros((0, self.dim), np.float32)
+        self._write_vectors(current, max(rows, capacity * 2, 256))
+
+    # Mutation
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        return vectors.normalize(matrix)
+
+    def add(
+        self,
+        items: Sequence[Tuple[str, Sequence[float], Optional[Dict[str, Any]]]],
+        model: str,
+    ) -> int:
+        """Insert or replace ``(id, vector, metadata)`` items. Returns the number of new ids."""
+        if not items:
+            return 0
+        matrix = self._normalize([vector for _, vector, _ in items])
+        with self._write_lock():
+            if self.model is not None and (self.model != model or self.dim != matrix.shape[1]):
+                raise ValueError(
+                    f"Index '{self.name}' holds {self.dim}-dim '{self.model}' vectors, "
+                    f"got {matrix.shape[1]}-dim '{model}' vectors"
+                )
+            self.model = model
+            self.dim = matrix.shape[1]
+
+            new_ids = [item_id for item_id, _, _ in items if item_id not in self.id_to_row]
+            self._ensure_capacity(len(self.ids) + len(new_ids))
+
+            rows = []
+            for (item_id, _, metadata), vector in zip(items, matrix):
+                row = self.id_to_row.get(item_id)
+                if row is None:
+                    row = len(self.ids)
+                    self.ids.append(item_id)
+                    self.id_to_row[item_id] = row
+                self._vectors[row] = vector
+                self.metadata[item_id] = metadata or {}
+                rows.append(row)
+
+            self._alive = np.concatenate([self._alive, np.ones(len(self.ids) - len(self._alive), dtype=bool)])
+            self._alive[rows] = True
+            if self.centroids is not None:
+                grown = np.full(len(self.ids) - len(self.assignments), -1, dtype=np.int32)
+                self.assignments = np.concatenate([self.assignments, grown])
+                self.assignments[rows] = np.argmax(matrix @ self.centroids.T, axis=1)
+
+            if self._should_train():
+                self._train_ivf()
+            self._save()
+            return len(new_ids)
+
+    def delete(self, item_id: str) -> bool:
+        with self._write_lock():
+            row = self.id_to_row.pop(item_id, None)
+            if row is None:
+                return False
+            self.ids[row] = None
+            self.metadata.pop(item_id, None)
+            self._alive[row] = False
+            self._vectors[row] = 0.0
+            if self.assignments is not None:
+                self.assignments[row] = -1
+            self.deleted += 1
+            if self.deleted > 64 and self.deleted * 4 > len(self.ids):
+                self._compact()
+            self._save()
+            return True
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._alive)
+        logger.info(f"Compacting vector index '{self.name}': {len(self.ids)} -> {len(keep)} rows")
+        matrix = np.asarray(self._vectors[keep])
+        self.ids = [self.ids[row] for row in keep]
+        self.id_to_row = {item_id: row for row, item_id in enumerate(self.ids)}
+        self._alive = np.ones(len(self.ids), dtype=bool)
+        if self.assignments is not None:
+            self.assignments = self.assignments[keep]
+        self.deleted = 0
+        self._write_vectors(matrix, max(len(matrix), 256))
+
+    # IVF
+
+    def _should_train(self) -> bool:
+        alive = len(self.id_to_row)
+        return alive >= self.ivf_min_rows and alive >= 2 * self.trained_rows
+
+    def _train_ivf(self, iterations: int = 10) -> None:
+        rows = np.flatnonzero(self._alive)
+        data = np.asarray(self._vectors[rows])
+        n_lists = self.ivf_lists or int(np.sqrt(len(rows)))
+        n_lists = max(1, min(n_lists, len(rows)))
+        rng = np.random.default_rng(0)
+        centroids = data[rng.choice(len(rows), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, data)
+            empty = ~np.bincount(assign, minlength=n_lists).astype(bool)
+            sums[empty] = centroids[empty]
+            centroids = self._normalize(sums)
+        self.centroids = centroids
+        self.assignments = np.full(len(self.ids), -1, dtype=np.int32)
+        self.assignments[rows] = np.argmax(data @ centroids.T, axis=1)
+        self.trained_rows = len(rows)
+        logger.info(f"Trained IVF layout for vector index '{self.name}' with {n_lists} lists over {len(rows)} vectors")
+
+    # Queries
+
+    def __len__(self) -> int:
+        return len(self.id_to_row)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.id_to_row
+
+    def get_vector(self, item_id: str) -> Optional[np.ndarray]:
+        with self._lock:
+            self._reload_if_changed()
+            row = self.id_to_row.get(item_id)
+            return None if row is None else np.array(self._vectors[row])
+
+    def get_items(self, item_ids: Sequence[str]) -> Tuple[List[str], np.ndarray, List[Dict[str, Any]]]:
+        """Ids found among ``item_ids``, their vectors as one matrix and their metadata, read under one lock."""
+        with self._lock:
+            self._reload_if_changed()
+            found = [item_id for item_id in item_ids if item_id in self.id_to_row]
+            if not found:
+                return [], np.zeros((0, self.dim or 0), np.float32), []
+            matrix = np.asarray(self._vectors[[self.id_to_row[item_id] for item_id in found]])
+            return found, matrix, [self.metadata.get(item_id, {}) for item_id in found]
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int = 10,
+        approximate: bool = False,
+        exclude: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        with self._lock:
+            self._reload_if_changed()
+            if not self.id_to_row:
+                return []
+            query_vector = self._normalize(query)
+            if query_vector.shape[-1] != self.dim:
+                raise ValueError(f"Query has {query_vector.shape[-1]} dims, index '{self.name}' has {self.dim}")
+
+            n = len(self.ids)
+            if approximate and self.centroids is not None:
+                probes = min(self.ivf_probes, len(self.centroids))
+                nearest = np.argpartition(-(self.centroids @ query_vector), probes - 1)[:probes]
+                rows = np.flatnonzero(np.isin(self.assignments, nearest))
+                scores = np.asarray(self._vectors[rows]) @ query_vector
+            else:
+                rows = np.arange(n)
+                scores = np.asarray(self._vectors[:n]) @ query_vector
+                scores[~self._alive[:n]] = -np.inf
+            if exclude:
+                excluded = np.isin(rows, [self.id_to_row[i] for i in exclude if i in self.id_to_row])
+                scores[excluded] = -np.inf
+
+            k = min(top_k, int(np.isfinite(scores).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (self.ids[rows[i]], float(scores[i]), self.metadata.get(self.ids[rows[i]], {}))
+                for i in top
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": len(self.id_to_row),
+            "rows": len(self.ids),
+            "deleted": self.deleted,
+            "dim": self.dim,
+            "model": self.model,
+            "ivf_lists": 0 if self.centroids is None else len(self.centroids),
+            "ivf_trained_rows": self.trained_rows,
+        }
@@ -0,0 +1,54 @@
+import struct
+from typing import Sequence, Union
+
+import numpy as np
+
+FLOAT32 = "float32"
+INT8 = "int8"
+STORAGE_DTYPES = (FLOAT32, INT8)
+
+# First byte of an encoded vector
+_FLOAT32_TAG = b"f"
+_INT8_TAG = b"q"
+_SCALE = struct.Struct("<f")
+
+ArrayLike = Union[np.ndarray, Sequence[Sequence[float]], Sequence[float]]
+
+
+def normalize(vectors: ArrayLike) -> np.ndarray:
+    """L2-normalizes float32 vectors along the last axis; zero vectors stay zero."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def encode(vector: np.ndarray, dtype: str = FLOAT32) -> bytes:
+    """
+    Packs a normalized vector for the embedding cache: 4 bytes per dimension as
+    float32, or 1 byte per dimension plus a scale as symmetric int8.
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    if dtype == INT8:
+        peak = float(np.abs(vector).max()) if vector.size else 0.0
+        scale = peak / 127.0 if peak else 1.0
+        quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        return _INT8_TAG + _SCALE.pack(scale) + quantized.tobytes()
+    return _FLOAT32_TAG + vector.tobytes()
+
+
+def decode(data: bytes) -> np.ndarray:
+    """Inverse of ``encode``; int8 vectors are rescaled and normalized again."""
+    tag = data[:1]
+    if tag == _FLOAT32_TAG:
+        return np.frombuffer(data, dtype=np.float32, offset=1)
+    if tag == _INT8_TAG:
+        (scale,) = _SCALE.unpack_from(data, 1)
+        quantized = np.frombuffer(data, dtype=np.int8, offset=1 + _SCALE.size)
+        return normalize(quantized.astype(np.float32) * scale)
+    raise ValueError(f"Unknown vector encoding tag {tag!r}")
+
+
+def cosine_scores(query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Cosine similarity of one normalized query against the rows of a normalized matrix."""
+    return np.asarray(candidates, dtype=np.float32) @ np.asarray(query, dtype=np.float32)
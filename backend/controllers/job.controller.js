@@ -4,6 +4,27 @@ const path = require('path');
 const { sendEmail, emailTemplates } = require('../utils/emailService');
 const { createNotification } = require('./notification.controller');
 const axios = require('axios');
+const { indexJob, removeJob } = require('../utils/aiClient');
+
+// The text resume matching runs against; built the same way as the job description
+// the resume match page sends, so the AI service can use the job's precomputed artifacts
+const jobMatchText = (job) => {
+    let text = job.description || '';
+    if (job.requirements?.length) {
+        text += '\n\nRequirements: ' + (Array.isArray(job.requirements) ? job.requirements.join(', ') : job.requirements);
+    }
+    if (job.skills?.length) {
+        text += '\n\nSkills: ' + (Array.isArray(job.skills) ? job.skills.join(', ') : job.skills);
+    }
+    return text;
+};
+
+// Indexing runs in the background: a job is saved even if the AI service is down,
+// and analyses fall back to sending the description
+const indexJobInBackground = (job) => {
+    indexJob(job.id, jobMatchText(job), { title: job.title, company: job.company, location: job.location })
+        .catch(error => console.error(`Failed to index job ${job.id} in the AI service:`, error.message));
+};
 
 const getAllJobPosts = async(req, res) => {
     try {
@@ -78,6 +99,7 @@ const createJob = async (req, res) => {
         const job = await prisma.job.create({
             data: jobData
         });
+        indexJobInBackground(job);
 
         // Get all connections of the recruiter
         const connections = await prisma.connection.findMany({
@@ -330,6 +352,7 @@ const updateJob = async (req, res) => {
       });
 
       console.log('Successfully updated job:', updatedJob);
+      indexJobInBackground(updatedJob);
 
       res.status(200).json({
         message: 'Job updated successfully',
@@ -400,6 +423,9 @@ const deleteJob = async (req, res) => {
       })
     ]);
 
+    removeJob(jobId)
+      .catch(error => console.error(`Failed to remove job ${jobId} from the AI service:`, error.message));
+
     res.status(200).json({
       message: 'Job and all related records deleted successfully'
     });
@@ -1,4 +1,8 @@
-const { analyzeResume } = require('../utils/aiClient');
+const { analyzeResumeQueued } = require('../utils/aiClient');
+
+// The browser waits on this request, so queued analyses get no longer than a direct
+// /analyze call did before the queue was added
+const ANALYZE_TIMEOUT_MS = 60000;
 
 const analyzeResumeMatch = async (req, res) => {
     try {
@@ -9,7 +13,7 @@ const analyzeResumeMatch = async (req, res) => {
             });
         }
 
-        const { jobDescription } = req.body;
+        const { jobDescription, jobId } = req.body;
         if (!jobDescription?.trim()) {
             return res.status(400).json({
                 success: false,
@@ -17,7 +21,10 @@ const analyzeResumeMatch = async (req, res) => {
             });
         }
 
-        const result = await analyzeResume(req.file.path, jobDescription);
+        const result = await analyzeResumeQueued(req.file.path, jobDescription, {
+            jobId: jobId || undefined,
+            timeoutMs: ANALYZE_TIMEOUT_MS
+        });
 
         res.status(200).json({
             success: true,
@@ -36,6 +43,12 @@ const analyzeResumeMatch = async (req, res) => {
                 error: process.env.NODE_ENV === 'development' ? error.message : undefined
             });
         }
+        if (error.message.includes('Timed out waiting')) {
+            return res.status(504).json({
+                success: false,
+                message: 'The analysis is taking longer than expected. Please try again shortly.'
+            });
+        }
         if (error.message.includes('not found')) {
             return res.status(404).json({
                 success: false,
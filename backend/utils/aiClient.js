@@ -6,7 +6,7 @@ const path = require('path');
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || 'http://localhost:8000';
 const AI_SERVICE_ENDPOINT = `${AI_SERVICE_URL}/analyze`;
 
-async function analyzeResume(resumePath, jobDescription) {
+async function analyzeResume(resumePath, jobDescription, options = {}) {
     try {
         if (!resumePath || typeof resumePath !== 'string') {
             throw new Error('Resume path is required and must be a string');
@@ -31,6 +31,10 @@ async function analyzeResume(resumePath, jobDescription) {
 
         const formData = new FormData();
         formData.append('job_description', jobDescription.trim());
+        if (options.jobId !== undefined) {
+            // Lets the service use the job's precomputed artifacts when the description matches them
+            formData.append('job_id', String(options.jobId));
+        }
         
         const fileStream = fs.createReadStream(absolutePath);
         const fileName = path.basename(absolutePath);
@@ -83,10 +87,171 @@ async function analyzeResume(resumePath, jobDescription) {
     }
 }
 
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Submits to the AI service's job queue and polls for the result, so load spikes wait in
+// the queue instead of timing out. Falls back to /analyze if the queue is disabled.
+async function analyzeResumeQueued(resumePath, jobDescription, options = {}) {
+    const { priority = 5, pollIntervalMs = 500, maxPollIntervalMs = 5000, timeoutMs = 10 * 60 * 1000, jobId } = options;
+    const deadline = Date.now() + timeoutMs;
+    try {
+        if (!resumePath || typeof resumePath !== 'string') {
+            throw new Error('Resume path is required and must be a string');
+        }
+
+        if (!jobDescription?.trim()) {
+            throw new Error('Job description is required and cannot be empty');
+        }
+
+        const absolutePath = path.isAbsolute(resumePath)
+            ? resumePath
+            : path.resolve(process.cwd(), resumePath);
+
+        if (!fs.existsSync(absolutePath)) {
+            throw new Error(`Resume file not found: ${absolutePath}`);
+        }
+
+        const fileExt = path.extname(absolutePath).toLowerCase();
+        if (!['.pdf', '.docx', '.doc'].includes(fileExt)) {
+            throw new Error(`Unsupported file type: ${fileExt}. Only PDF and DOCX files are supported`);
+        }
+
+        let job;
+        while (!job) {
+            const formData = new FormData();
+            formData.append('job_description', jobDescription.trim());
+            formData.append('priority', String(priority));
+            if (jobId !== undefined) {
+                formData.append('job_id', String(jobId));
+            }
+            formData.append('resume_file', fs.createReadStream(absolutePath), {
+                filename: path.basename(absolutePath),
+                contentType: fileExt === '.pdf'
+                    ? 'application/pdf'
+                    : 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            });
+            try {
+                const response = await axios.post(`${AI_SERVICE_URL}/analyses`, formData, {
+                    headers: formData.getHeaders(),
+                    timeout: 30000,
+                    maxContentLength: Infinity,
+                    maxBodyLength: Infinity,
+                });
+                job = response.data;
+            } catch (error) {
+                if (error.response?.status === 404) {
+                    return analyzeResume(resumePath, jobDescription, { jobId });
+                }
+                // Queue is full (503) or this client is rate limited (429): wait as long
+                // as the service asks, then submit again
+                if ([429, 503].includes(error.response?.status) && Date.now() < deadline) {
+                    const retryAfter = Number(error.response.headers?.['retry-after']) || 1;
+                    await sleep(retryAfter * 1000);
+                    continue;
+                }
+                throw error;
+            }
+        }
+
+        let interval = pollIntervalMs;
+        while (job.status !== 'completed' && job.status !== 'failed') {
+            if (Date.now() >= deadline) {
+                throw new Error(`Timed out waiting for analysis job ${job.job_id}`);
+            }
+            await sleep(interval);
+            interval = Math.min(interval * 1.5, maxPollIntervalMs);
+            const response = await axios.get(`${AI_SERVICE_URL}/analyses/${job.job_id}`, { timeout: 10000 });
+            job = response.data;
+        }
+
+        if (job.status === 'failed') {
+            const status = job.error?.status_code || 500;
+            throw new Error(`AI service error (${status}): ${job.error?.detail || 'analysis failed'}`);
+        }
+
+        const result = job.result || {};
+        if (typeof result.similarity_score !== 'number') {
+            throw new Error('Invalid response from AI service: missing similarity_score');
+        }
+
+        return {
+            similarity_score: result.similarity_score,
+            matched_keywords: result.matched_keywords || [],
+            missing_keywords: result.missing_keywords || [],
+            model_used: result.model_used || 'openai',
+            improvement_suggestions: result.improvement_suggestions || null
+        };
+
+    } catch (error) {
+        if (error.response) {
+            const msg = error.response.data?.detail || error.response.data?.message || 'AI service error';
+            throw new Error(`AI service error (${error.response.status}): ${msg}`);
+        }
+        if (error.request) {
+            throw new Error(`AI service is not responding. Please ensure the service is running on ${AI_SERVICE_URL}`);
+        }
+        if (error.message.startsWith('AI service error')) {
+            throw error;
+        }
+        throw new Error(`Error analyzing resume: ${error.message}`);
+    }
+}
+
+// Precomputes a job's embedding, keywords and summary in the AI service, so analyses
+// that pass its ID only do resume-side work. Call it when a job is posted or edited;
+// posting an unchanged description again is cheap.
+async function indexJob(jobId, description, metadata = {}) {
+    try {
+        if (!description?.trim()) {
+            throw new Error('Job description is required and cannot be empty');
+        }
+
+        const formData = new FormData();
+        formData.append('description', description.trim());
+        formData.append('metadata', JSON.stringify(metadata));
+
+        const response = await axios.post(`${AI_SERVICE_URL}/jobs/${encodeURIComponent(jobId)}/index`, formData, {
+            headers: formData.getHeaders(),
+            timeout: 60000,
+        });
+        return response.data;
+
+    } catch (error) {
+        if (error.response) {
+            const msg = error.response.data?.detail || error.response.data?.message || 'AI service error';
+            throw new Error(`AI service error (${error.response.status}): ${msg}`);
+        }
+        if (error.request) {
+            throw new Error(`AI service is not responding. Please ensure the service is running on ${AI_SERVICE_URL}`);
+        }
+        throw new Error(`Error indexing job: ${error.message}`);
+    }
+}
+
+async function removeJob(jobId) {
+    try {
+        await axios.delete(`${AI_SERVICE_URL}/jobs/${encodeURIComponent(jobId)}`, { timeout: 10000 });
+    } catch (error) {
+        // Never indexed (or already removed)
+        if (error.response?.status === 404) {
+            return;
+        }
+        if (error.response) {
+            const msg = error.response.data?.detail || error.response.data?.message || 'AI service error';
+            throw new Error(`AI service error (${error.response.status}): ${msg}`);
+        }
+        if (error.request) {
+            throw new Error(`AI service is not responding. Please ensure the service is running on ${AI_SERVICE_URL}`);
+        }
+        throw new Error(`Error removing job: ${error.message}`);
+    }
+}
+
 async function isServiceHealthy() {
     try {
-        const res = await axios.get(`${AI_SERVICE_URL}/health`, { timeout: 5000 });
-        return res.data?.status === 'healthy' && res.data?.model_loaded === true;
+        // 503 (thrown by axios) until the service has loaded and warmed up its models
+        const res = await axios.get(`${AI_SERVICE_URL}/health/ready`, { timeout: 5000 });
+        return res.data?.ready === true;
     } catch (error) {
         return false;
     }
@@ -94,6 +259,9 @@ async function isServiceHealthy() {
 
 module.exports = {
     analyzeResume,
+    analyzeResumeQueued,
+    indexJob,
+    removeJob,
     isServiceHealthy,
     AI_SERVICE_URL,
 };
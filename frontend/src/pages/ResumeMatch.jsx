@@ -100,6 +100,9 @@ const ResumeMatch = () => {
       const formData = new FormData();
       formData.append('resumeFile', resumeFile);
       formData.append('jobDescription', jobDescription.trim());
+      if (jobDescriptionMode === 'select' && selectedJobId) {
+        formData.append('jobId', selectedJobId);
+      }
 
       const response = await axios.post(
         '/api/resume-match',